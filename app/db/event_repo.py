@@ -1,6 +1,11 @@
 import os
 from neo4j import GraphDatabase
 from dotenv import load_dotenv
+from app.services.feature.search_cache import get_semantic_cache
+from app.services.feature.context_cards import get_context_cards
+from app.services.feature.search_index import refresh_search_nodes
+from app.services.feature.text_folding import fold_name
+from app.db.search_repo import get_search_repo
 
 load_dotenv()
 
@@ -28,12 +33,49 @@ class EventRepo:
             """, {"limit": limit})
             return [dict(r) for r in res]
 
+    def find_event_by_name(self, name: str):
+        """
+        Find event by name (case/accent/punctuation-insensitive) via range index name_key.
+        Selama backfill belum selesai (SearchRepo.name_key_backfill_pending), node tanpa
+        name_key dicari dengan toLower(), lalu name_key-nya langsung ditulis supaya
+        lookup berikutnya kena index. Setelah backfill selesai tidak ada label scan.
+        """
+        with self.driver.session(database=self.db) as session:
+            res = session.run("""
+                MATCH (e:Event {name_key: $name_key})
+                RETURN e.name AS name, e.event_id AS event_id
+                LIMIT 1
+            """, {"name_key": fold_name(name)})
+            row = res.single()
+            if row:
+                return dict(row)
+
+            search_repo = get_search_repo()
+            if not search_repo.name_key_backfill_pending("event"):
+                return None
+            res = session.run("""
+                MATCH (e:Event)
+                WHERE e.name_key IS NULL AND toLower(e.name) = toLower($name)
+                RETURN elementId(e) AS element_id, e.name AS name, e.event_id AS event_id
+                LIMIT 1
+            """, {"name": name})
+            row = res.single()
+            if not row:
+                return None
+            session.run("""
+                MATCH (e:Event) WHERE elementId(e) = $element_id
+                SET e.name_key = $name_key
+            """, {"element_id": row["element_id"], "name_key": fold_name(row["name"])})
+            search_repo.mark_name_key_backfilled("event")
+            return {"name": row["name"], "event_id": row["event_id"]}
+
     def upsert_event_enrichment(
         self,
         event_id,
         qid,
         description=None,
-        image=None
+        image=None,
+        aliases=None
     ):
         with self.driver.session(database=self.db) as session:
 
@@ -42,14 +84,21 @@ class EventRepo:
                 MATCH (e:Event {event_id: $event_id})
                 SET e.wikidata_qid = $qid,
                     e.description = $description,
-                    e.image_url = $image
+                    e.image_url = $image,
+                    e.aliases = coalesce($aliases, e.aliases)
             """, {
                 "event_id": event_id,
                 "qid": qid,
                 "description": description,
-                "image": image
+                "image": image,
+                "aliases": aliases
             })
 
+        # Cached semantic search & context card event ini jadi stale
+        get_semantic_cache().invalidate_nodes([("event", event_id)])
+        get_context_cards().invalidate_nodes([("event", event_id)])
+        refresh_search_nodes("event", [event_id])
+
     def upsert_event_enrichment_optional(
         self,
         event_id,
@@ -148,6 +197,10 @@ class EventRepo:
                     "has_part_qids": has_part_qids,
                 })
 
+        get_semantic_cache().invalidate_nodes([("event", event_id)])
+        get_context_cards().invalidate_nodes([("event", event_id)])
+        refresh_search_nodes("event", [event_id])
+
 
 def get_event_repo():
     return EventRepo(driver)
\ No newline at end of file
@@ -1,6 +1,11 @@
 import os
 from neo4j import GraphDatabase
 from dotenv import load_dotenv
+from app.services.feature.search_cache import get_semantic_cache
+from app.services.feature.context_cards import get_context_cards
+from app.services.feature.search_index import refresh_search_nodes
+from app.services.feature.text_folding import fold_name
+from app.db.search_repo import get_search_repo
 
 load_dotenv()
 
@@ -38,16 +43,40 @@ class PersonRepo:
             return row["p"] if row else None
 
     def find_person_by_full_name(self, full_name: str):
-        """Find person by full_name (case-insensitive) - EFFICIENT single query"""
+        """
+        Find person by full_name (case/accent/punctuation-insensitive) via range index name_key.
+        Selama backfill belum selesai (SearchRepo.name_key_backfill_pending), node tanpa
+        name_key dicari dengan toLower(), lalu name_key-nya langsung ditulis supaya
+        lookup berikutnya kena index. Setelah backfill selesai tidak ada label scan.
+        """
         with self.driver.session(database=self.db) as session:
             res = session.run("""
-                MATCH (p:Person)
-                WHERE toLower(p.full_name) = toLower($full_name)
+                MATCH (p:Person {name_key: $name_key})
                 RETURN p.name AS name, p.article_id AS article_id, p.full_name AS full_name
                 LIMIT 1
+            """, {"name_key": fold_name(full_name)})
+            row = res.single()
+            if row:
+                return dict(row)
+
+            search_repo = get_search_repo()
+            if not search_repo.name_key_backfill_pending("person"):
+                return None
+            res = session.run("""
+                MATCH (p:Person)
+                WHERE p.name_key IS NULL AND toLower(p.full_name) = toLower($full_name)
+                RETURN elementId(p) AS element_id, p.name AS name, p.article_id AS article_id, p.full_name AS full_name
+                LIMIT 1
             """, {"full_name": full_name})
             row = res.single()
-            return dict(row) if row else None
+            if not row:
+                return None
+            session.run("""
+                MATCH (p:Person) WHERE elementId(p) = $element_id
+                SET p.name_key = $name_key
+            """, {"element_id": row["element_id"], "name_key": fold_name(row["full_name"])})
+            search_repo.mark_name_key_backfilled("person")
+            return {"name": row["name"], "article_id": row["article_id"], "full_name": row["full_name"]}
 
     def upsert_person_enrichment(
         self,
@@ -68,7 +97,8 @@ class PersonRepo:
         alliances=None,
         ranks=None,
         orders=None,
-        crimes=None
+        crimes=None,
+        aliases=None
     ):
         reigns = reigns or []
         dynasties = dynasties or []
@@ -91,7 +121,8 @@ class PersonRepo:
                     p.image_url = $image,
                     p.death_date = $death_date,
                     p.death_place = $death_place,
-                    p.cause_of_death = $cause
+                    p.cause_of_death = $cause,
+                    p.aliases = coalesce($aliases, p.aliases)
             """, {
                 "person_id": person_id,
                 "qid": qid,
@@ -99,7 +130,8 @@ class PersonRepo:
                 "image": image,
                 "death_date": death_date,
                 "death_place": death_place,
-                "cause": cause
+                "cause": cause,
+                "aliases": aliases
             })
 
             # Killer relationship
@@ -107,8 +139,9 @@ class PersonRepo:
                 session.run("""
                     MATCH (victim:Person {article_id: $person_id})
                     MERGE (k:Person {full_name: $killer})
+                    ON CREATE SET k.name_key = $killer_key
                     MERGE (victim)-[:KILLED_BY]->(k)
-                """, {"person_id": person_id, "killer": killer})
+                """, {"person_id": person_id, "killer": killer, "killer_key": fold_name(killer)})
 
             # Positions (P39)
             if reigns:
@@ -172,5 +205,10 @@ class PersonRepo:
                     SET r.start = al.start, r.end = al.end
                 """, {"person_id": person_id, "alliances": alliances})
 
+        # Cached semantic search & context card person ini jadi stale
+        get_semantic_cache().invalidate_nodes([("person", person_id)])
+        get_context_cards().invalidate_nodes([("person", person_id)])
+        refresh_search_nodes("person", [person_id])
+
 def get_person_repo():
     return PersonRepo(driver)
\ No newline at end of file
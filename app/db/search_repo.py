@@ -0,0 +1,508 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.db.neo4j_repo import driver, NEO4J_DB
+from app.db.vector_repo import FULLTEXT_INDEXES
+from app.services.feature.hybrid_fusion import escape_lucene
+from app.services.feature.text_folding import fold_name
+
+# Full-text indexes untuk /search: (nama index, label, properties).
+# Person[full_name, description] dipakai bersama hybrid search: Neo4j menolak
+# dua full-text index dengan schema sama (IF NOT EXISTS jadi no-op), jadi
+# definisinya cuma satu, di vector_repo.
+SEARCH_INDEXES = {
+    "person": FULLTEXT_INDEXES["person"],
+    "position": ("position_search_index", "Position", ["label", "name"]),
+    "event": ("event_search_index", "Event", ["name", "description", "impact"]),
+}
+
+# Range index untuk lookup exact by name_key (fold_name dari full_name / name):
+# kind -> (nama index, label, property nama sumber)
+NAME_KEY_INDEXES = {
+    "person": ("person_name_key_index", "Person", "full_name"),
+    "event": ("event_name_key_index", "Event", "name"),
+}
+
+# Index lama dengan schema yang sama dengan FULLTEXT_INDEXES["person"] (di-drop saat bootstrap)
+LEGACY_SEARCH_INDEXES = ["person_search_index"]
+PERSON_SEARCH_INDEX = SEARCH_INDEXES["person"][0]
+
+# kind -> jumlah node yang belum punya name_key (dihitung sekali per proses, di-refresh
+# oleh backfill). Selama > 0, lookup nama masih perlu fallback toLower() untuk node itu.
+_missing_name_keys: Dict[str, int] = {}
+_missing_name_keys_lock = threading.Lock()
+
+# Batas hitung total di jalur fallback (di atas ini dilaporkan sebagai lower bound)
+FULLTEXT_COUNT_CAP = 1000
+
+
+def build_prefix_query(query: str) -> str:
+    """
+    Query Lucene tanpa leading wildcard (leading wildcard = scan seluruh term
+    dictionary): term yang sudah lengkap jadi phrase exact (punctuation ikut
+    dianalisis sama seperti di index), term terakhir exact atau prefix (term*)
+    karena mungkin masih diketik. Semua term wajib ada.
+    Ini cuma penyaring kandidat; semantics CONTAINS (substring utuh) di-cek ulang
+    di hit (lihat _PERSON_HITS / _EVENT_HITS). Match di tengah kata cuma dilayani
+    index in-memory (search_index).
+    """
+    terms = [escape_lucene(t) for t in query.lower().split() if t]
+    if not terms:
+        return ""
+    clauses = [f'"{t}"' for t in terms[:-1]]
+    clauses.append(f'("{terms[-1]}" OR {terms[-1]}*)')
+    return " AND ".join(clauses)
+
+
+class SearchRepo:
+    # Hit full-text index + re-check CONTAINS (substring utuh, seperti /search lama)
+    # di hit saja, bukan di semua node. $needle = query lowercase.
+    _PERSON_HITS = """
+        CALL {
+            CALL db.index.fulltext.queryNodes($person_index, $fulltext_query)
+            YIELD node AS p
+            WHERE toLower(coalesce(p.full_name, '')) CONTAINS $needle
+               OR toLower(coalesce(p.description, '')) CONTAINS $needle
+            RETURN p
+            UNION
+            CALL db.index.fulltext.queryNodes('position_search_index', $fulltext_query)
+            YIELD node AS pos
+            WHERE toLower(coalesce(pos.label, '')) CONTAINS $needle
+               OR toLower(coalesce(pos.name, '')) CONTAINS $needle
+            MATCH (p:Person)-[:HELD_POSITION]->(pos)
+            RETURN p
+        }
+        WITH DISTINCT p
+    """
+
+    _EVENT_HITS = """
+        CALL db.index.fulltext.queryNodes('event_search_index', $fulltext_query)
+        YIELD node AS e
+        WHERE toLower(coalesce(e.name, '')) CONTAINS $needle
+           OR toLower(coalesce(e.description, '')) CONTAINS $needle
+           OR toLower(coalesce(e.impact, '')) CONTAINS $needle
+        WITH e
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.db = NEO4J_DB
+
+    def ensure_search_indexes(self) -> dict:
+        """Schema bootstrap: full-text index /search + range index name_key (idempotent)"""
+        with self.driver.session(database=self.db) as session:
+            for index_name in LEGACY_SEARCH_INDEXES:
+                session.run(f"DROP INDEX {index_name} IF EXISTS")
+            for index_name, label, props in SEARCH_INDEXES.values():
+                fields = ", ".join(f"n.{prop}" for prop in props)
+                session.run(f"""
+                    CREATE FULLTEXT INDEX {index_name} IF NOT EXISTS
+                    FOR (n:{label}) ON EACH [{fields}]
+                """)
+            for index_name, label, _ in NAME_KEY_INDEXES.values():
+                session.run(f"""
+                    CREATE INDEX {index_name} IF NOT EXISTS
+                    FOR (n:{label}) ON (n.name_key)
+                """)
+            names = [index[0] for index in SEARCH_INDEXES.values()] + [index[0] for index in NAME_KEY_INDEXES.values()]
+            result = session.run("""
+                SHOW INDEXES
+                YIELD name, state
+                WHERE name IN $names
+                RETURN name, state
+            """, {"names": names})
+            return {r["name"]: r["state"] for r in result}
+
+    @staticmethod
+    def _filter_clause(var: str, countries: Optional[List[str]], continents: Optional[List[str]], params: dict) -> str:
+        """Filter country/continent sebagai predicate satu node (field search_* hasil materialisasi)"""
+        conditions = []
+        if countries:
+            conditions.append(f"any(c IN coalesce({var}.search_countries, []) WHERE c IN $filter_countries)")
+            params["filter_countries"] = [c.lower() for c in countries]
+        if continents:
+            conditions.append(f"any(c IN coalesce({var}.search_continents, []) WHERE c IN $filter_continents)")
+            params["filter_continents"] = [c.lower() for c in continents]
+        return ("AND " + " AND ".join(conditions)) if conditions else ""
+
+    @staticmethod
+    def _ordering(var: str, name_property: str, sort: str) -> Tuple[str, str, str]:
+        """
+        (ekspresi sort_key, predicate seek setelah cursor, ORDER BY) untuk mode sort.
+        popularity: DESC + LIMIT -> planner pakai Top (heap sebesar limit), bukan sort penuh.
+        """
+        if sort == "popularity":
+            expr, comparison, order = f"coalesce({var}.historical_popularity_index, 0.0)", "<", "sort_key DESC, element_id"
+        else:
+            expr, comparison, order = f"coalesce({var}.{name_property}, '')", ">", "sort_key, element_id"
+        seek = (
+            f"($after_key IS NULL OR {expr} {comparison} $after_key"
+            f" OR ({expr} = $after_key AND elementId({var}) > $after_id))"
+        )
+        return expr, seek, order
+
+    def search_persons(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        countries: Optional[List[str]] = None,
+        continents: Optional[List[str]] = None,
+        after: Optional[Tuple] = None,
+        sort: str = "name"
+    ) -> List[dict]:
+        """
+        Person yang nama/deskripsinya match, atau yang memegang Position yang
+        label/namanya match. Kandidat dari full-text index, bukan label scan.
+        `after`: keyset (sort_key, element_id) dari cursor; kalau ada, offset diabaikan.
+        sort: "name" (A-Z) atau "popularity" (historical_popularity_index tertinggi dulu).
+        """
+        params = {
+            "fulltext_query": build_prefix_query(query),
+            "needle": query.lower(),
+            "person_index": PERSON_SEARCH_INDEX,
+            "limit": limit,
+            "offset": 0 if after else offset,
+            "after_key": after[0] if after else None,
+            "after_id": after[1] if after else None
+        }
+        filter_clause = self._filter_clause("p", countries, continents, params)
+        sort_key, seek, order_by = self._ordering("p", "full_name", sort)
+
+        with self.driver.session(database=self.db) as session:
+            result = session.run(self._PERSON_HITS + f"""
+                WHERE {seek}
+                {filter_clause}
+                RETURN
+                    elementId(p) AS element_id,
+                    p.full_name AS name,
+                    p.description AS description,
+                    p.image_url AS image,
+                    coalesce(p.search_positions, []) AS all_positions,
+                    p.search_country AS country,
+                    {sort_key} AS sort_key
+                ORDER BY {order_by}
+                SKIP $offset
+                LIMIT $limit
+            """, params)
+            return [dict(r) for r in result]
+
+    def search_events(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        countries: Optional[List[str]] = None,
+        continents: Optional[List[str]] = None,
+        after: Optional[Tuple] = None,
+        sort: str = "name"
+    ) -> List[dict]:
+        """Event yang nama/deskripsi/impact-nya match (full-text index). `after` / sort: lihat search_persons"""
+        params = {
+            "fulltext_query": build_prefix_query(query),
+            "needle": query.lower(),
+            "limit": limit,
+            "offset": 0 if after else offset,
+            "after_key": after[0] if after else None,
+            "after_id": after[1] if after else None
+        }
+        filter_clause = self._filter_clause("e", countries, continents, params)
+        sort_key, seek, order_by = self._ordering("e", "name", sort)
+
+        with self.driver.session(database=self.db) as session:
+            result = session.run(self._EVENT_HITS + f"""
+                WHERE {seek}
+                {filter_clause}
+                RETURN
+                    elementId(e) AS element_id,
+                    e.name AS name,
+                    e.description AS description,
+                    e.image_url AS image,
+                    e.impact AS impact,
+                    e.search_country AS country,
+                    {sort_key} AS sort_key
+                ORDER BY {order_by}
+                SKIP $offset
+                LIMIT $limit
+            """, params)
+            return [dict(r) for r in result]
+
+    def count_fulltext_hits(
+        self,
+        kind: str,
+        query: str,
+        countries: Optional[List[str]] = None,
+        continents: Optional[List[str]] = None,
+        cap: int = FULLTEXT_COUNT_CAP
+    ) -> int:
+        """
+        Jumlah hit full-text index dengan predicate yang sama dengan search_persons /
+        search_events (termasuk filter country-continent), dipakai sebagai perkiraan
+        total di jalur fallback. Berhenti di cap + 1 baris: hasil > cap berarti
+        "lebih dari cap" (lower bound), bukan total.
+        """
+        params = {
+            "fulltext_query": build_prefix_query(query),
+            "needle": query.lower(),
+            "person_index": PERSON_SEARCH_INDEX,
+            "cap": cap + 1
+        }
+        var = "p" if kind == "person" else "e"
+        filter_clause = self._filter_clause(var, countries, continents, params)
+        hits = self._PERSON_HITS if kind == "person" else self._EVENT_HITS
+        with self.driver.session(database=self.db) as session:
+            record = session.run(hits + f"""
+                WITH {var}
+                WHERE true {filter_clause}
+                LIMIT $cap
+                RETURN count({var}) AS total
+            """, params).single()
+            return record["total"]
+
+    # ==================== FILTER OPTIONS ====================
+
+    def get_filter_options(self) -> dict:
+        """Semua country & continent (untuk /search/filters)"""
+        with self.driver.session(database=self.db) as session:
+            countries = [r["name"] for r in session.run("""
+                MATCH (c:Country)
+                WHERE c.country IS NOT NULL
+                RETURN DISTINCT c.country AS name
+                ORDER BY name
+            """)]
+            continents = [r["name"] for r in session.run("""
+                MATCH (cont:Continent)
+                WHERE cont.continent IS NOT NULL
+                RETURN DISTINCT cont.continent AS name
+                ORDER BY name
+            """)]
+            return {"countries": countries, "continents": continents}
+
+    def get_filter_fingerprint(self) -> list:
+        """Change check murah: jumlah node dari count store, tanpa scan property"""
+        with self.driver.session(database=self.db) as session:
+            record = session.run("""
+                CALL { MATCH (c:Country) RETURN count(c) AS countries }
+                CALL { MATCH (k:Continent) RETURN count(k) AS continents }
+                RETURN countries, continents
+            """).single()
+            return [record["countries"], record["continents"]]
+
+    # ==================== NAME KEYS ====================
+
+    def backfill_name_keys(self, kind: str, full: bool = False, batch_size: int = 1000) -> int:
+        """
+        Isi property name_key = fold_name(nama) di node yang belum punya (atau semua
+        kalau full=True). Folding di Python (NFKD + strip aksen tidak ada di Cypher),
+        ditulis balik per batch. Return jumlah node yang di-update.
+        """
+        _, label, source = NAME_KEY_INDEXES[kind]
+        where = f"n.{source} IS NOT NULL" + ("" if full else " AND n.name_key IS NULL")
+        with self.driver.session(database=self.db) as session:
+            rows = [
+                {"element_id": r["element_id"], "name_key": fold_name(r["name"])}
+                for r in session.run(f"""
+                    MATCH (n:{label})
+                    WHERE {where}
+                    RETURN elementId(n) AS element_id, n.{source} AS name
+                """)
+            ]
+            for start in range(0, len(rows), batch_size):
+                session.run(f"""
+                    UNWIND $rows AS row
+                    MATCH (n:{label})
+                    WHERE elementId(n) = row.element_id
+                    SET n.name_key = row.name_key
+                """, {"rows": rows[start:start + batch_size]})
+        # Node yang dibuat selama backfill ikut terhitung di sini
+        with _missing_name_keys_lock:
+            _missing_name_keys[kind] = self.count_missing_name_keys(kind)
+        return len(rows)
+
+    def count_missing_name_keys(self, kind: str) -> int:
+        _, label, source = NAME_KEY_INDEXES[kind]
+        with self.driver.session(database=self.db) as session:
+            return session.run(f"""
+                MATCH (n:{label})
+                WHERE n.name_key IS NULL AND n.{source} IS NOT NULL
+                RETURN count(n) AS missing
+            """).single()["missing"]
+
+    def name_key_backfill_pending(self, kind: str) -> bool:
+        """
+        True selama masih ada node tanpa name_key. Count di-cache (cuma sekali scan
+        per proses); setelah 0, fallback toLower() di lookup nama tidak jalan lagi.
+        """
+        with _missing_name_keys_lock:
+            if kind not in _missing_name_keys:
+                _missing_name_keys[kind] = self.count_missing_name_keys(kind)
+            return _missing_name_keys[kind] > 0
+
+    @staticmethod
+    def mark_name_key_backfilled(kind: str, count: int = 1):
+        """Lookup yang menemukan node lewat fallback langsung menulis name_key-nya"""
+        with _missing_name_keys_lock:
+            if kind in _missing_name_keys:
+                _missing_name_keys[kind] = max(0, _missing_name_keys[kind] - count)
+
+    # ==================== DENORMALIZED SEARCH FIELDS ====================
+
+    # Field search_* di node: hasil flatten relasi position / country / continent,
+    # supaya /search dan filter country-continent cukup baca satu node.
+    # search_countries / search_continents lowercase (untuk filter),
+    # search_country = nama display (country pertama).
+    _PERSON_SEARCH_FIELDS = """
+        CALL {
+            WITH p
+            OPTIONAL MATCH (p)-[:HELD_POSITION]->(pos:Position)
+            WITH p, collect(DISTINCT coalesce(pos.label, pos.name)) AS positions
+            OPTIONAL MATCH (p)-[:BORN_IN]->(:City)-[:LOCATED_IN]->(country:Country)
+            OPTIONAL MATCH (country)-[:LOCATED_IN]->(continent:Continent)
+            WITH p, positions,
+                 collect(DISTINCT country.country) AS countries,
+                 collect(DISTINCT continent.continent) AS continents
+            SET p.search_positions = positions,
+                p.search_country = countries[0],
+                p.search_countries = [c IN countries | toLower(c)],
+                p.search_continents = [c IN continents | toLower(c)]
+        }
+    """
+
+    _EVENT_SEARCH_FIELDS = """
+        CALL {
+            WITH e
+            OPTIONAL MATCH (e)-[:HELD_IN]->(country:Country)
+            OPTIONAL MATCH (country)-[:LOCATED_IN]->(continent:Continent)
+            WITH e,
+                 collect(DISTINCT country.country) AS countries,
+                 collect(DISTINCT continent.continent) AS continents
+            SET e.search_country = countries[0],
+                e.search_countries = [c IN countries | toLower(c)],
+                e.search_continents = [c IN continents | toLower(c)]
+        }
+    """
+
+    def materialize_search_fields(self, kind: str, full: bool = False, batch_size: int = 1000) -> int:
+        """
+        Job materialisasi field search_* (batched, CALL ... IN TRANSACTIONS).
+        full=False: cuma node yang belum pernah di-materialisasi (search_countries
+        selalu ditulis, list kosong kalau tidak ada country); full=True: semua node
+        (misalnya setelah mapping country-continent berubah). Return jumlah node.
+        """
+        if kind == "person":
+            where = "" if full else "WHERE p.search_countries IS NULL AND p.full_name IS NOT NULL"
+            cypher = f"MATCH (p:Person) {where}" + self._PERSON_SEARCH_FIELDS
+            var = "p"
+        else:
+            where = "" if full else "WHERE e.search_countries IS NULL AND e.name IS NOT NULL"
+            cypher = f"MATCH (e:Event) {where}" + self._EVENT_SEARCH_FIELDS
+            var = "e"
+        cypher += f" IN TRANSACTIONS OF $batch_size ROWS RETURN count({var}) AS updated"
+        with self.driver.session(database=self.db) as session:
+            return session.run(cypher, {"batch_size": batch_size}).single()["updated"]
+
+    def sync_search_fields(self, kind: str, keys: List) -> int:
+        """Write path: materialisasi ulang field search_* untuk node tertentu (by article_id / event_id)"""
+        if kind == "person":
+            cypher = "UNWIND $keys AS key MATCH (p:Person {article_id: key})" + self._PERSON_SEARCH_FIELDS
+            cypher += " RETURN count(p) AS updated"
+        else:
+            cypher = "UNWIND $keys AS key MATCH (e:Event {event_id: key})" + self._EVENT_SEARCH_FIELDS
+            cypher += " RETURN count(e) AS updated"
+        with self.driver.session(database=self.db) as session:
+            return session.run(cypher, {"keys": list(keys)}).single()["updated"]
+
+    # ==================== IN-MEMORY INDEX SUPPORT ====================
+
+    _PERSON_DOCUMENT = """
+        RETURN
+            elementId(p) AS element_id,
+            p.article_id AS key,
+            p.full_name AS name,
+            p.description AS description,
+            coalesce(p.historical_popularity_index, 0.0) AS popularity,
+            coalesce(p.search_positions, []) AS extra,
+            coalesce(p.aliases, []) AS aliases,
+            coalesce(p.search_countries, []) AS countries,
+            coalesce(p.search_continents, []) AS continents
+    """
+
+    _EVENT_DOCUMENT = """
+        RETURN
+            elementId(e) AS element_id,
+            e.event_id AS key,
+            e.name AS name,
+            e.description AS description,
+            coalesce(e.historical_popularity_index, 0.0) AS popularity,
+            [x IN [e.impact] WHERE x IS NOT NULL] AS extra,
+            coalesce(e.aliases, []) AS aliases,
+            coalesce(e.search_countries, []) AS countries,
+            coalesce(e.search_continents, []) AS continents
+    """
+
+    def iter_search_documents(self, kind: str, fetch_size: int = 2000):
+        """
+        Stream dokumen search (teks yang di-match + country/continent) untuk
+        build index in-memory dari field search_* (satu node per row, tanpa expansion).
+        extra = position (person) / impact (event), aliases = label/alias Wikidata.
+        """
+        if kind == "person":
+            cypher = "MATCH (p:Person)" + self._PERSON_DOCUMENT
+        else:
+            cypher = "MATCH (e:Event)" + self._EVENT_DOCUMENT
+        with self.driver.session(database=self.db, fetch_size=fetch_size) as session:
+            for record in session.run(cypher):
+                yield dict(record)
+
+    def get_search_documents(self, kind: str, keys: List) -> List[dict]:
+        """Dokumen search untuk node tertentu (by article_id / event_id), untuk update incremental"""
+        if kind == "person":
+            cypher = "UNWIND $keys AS key MATCH (p:Person {article_id: key})" + self._PERSON_DOCUMENT
+        else:
+            cypher = "UNWIND $keys AS key MATCH (e:Event {event_id: key})" + self._EVENT_DOCUMENT
+        with self.driver.session(database=self.db) as session:
+            return [dict(r) for r in session.run(cypher, {"keys": list(keys)})]
+
+    def hydrate_persons(self, element_ids: List[str]) -> List[dict]:
+        """Data display Person untuk halaman hasil (urutan mengikuti element_ids)"""
+        if not element_ids:
+            return []
+        with self.driver.session(database=self.db) as session:
+            result = session.run("""
+                UNWIND range(0, size($element_ids) - 1) AS i
+                MATCH (p:Person)
+                WHERE elementId(p) = $element_ids[i]
+                RETURN
+                    elementId(p) AS element_id,
+                    p.full_name AS name,
+                    p.description AS description,
+                    p.image_url AS image,
+                    coalesce(p.search_positions, []) AS all_positions,
+                    p.search_country AS country
+                ORDER BY i
+            """, {"element_ids": element_ids})
+            return [dict(r) for r in result]
+
+    def hydrate_events(self, element_ids: List[str]) -> List[dict]:
+        """Data display Event untuk halaman hasil (urutan mengikuti element_ids)"""
+        if not element_ids:
+            return []
+        with self.driver.session(database=self.db) as session:
+            result = session.run("""
+                UNWIND range(0, size($element_ids) - 1) AS i
+                MATCH (e:Event)
+                WHERE elementId(e) = $element_ids[i]
+                RETURN
+                    elementId(e) AS element_id,
+                    e.name AS name,
+                    e.description AS description,
+                    e.image_url AS image,
+                    e.impact AS impact,
+                    e.search_country AS country
+                ORDER BY i
+            """, {"element_ids": element_ids})
+            return [dict(r) for r in result]
+
+
+def get_search_repo():
+    return SearchRepo(driver)
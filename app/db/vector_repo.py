@@ -1,12 +1,36 @@
 from neo4j import GraphDatabase
-from typing import List, Optional
+from typing import Callable, List, Optional
+import math
 import os
+from app.services.feature.search_cache import get_semantic_cache
+from app.services.feature.context_cards import get_context_cards
 
 # Dimension akan di-set dynamically dari model
 # Default 768 untuk model baru (BGE, E5, dll)
 # 384 untuk all-MiniLM-L6-v2
 VECTOR_DIMENSION = None  # Will be set from model
 
+# search_type -> label node yang punya embedding
+EMBEDDING_LABELS = {"person": "Person", "event": "Event"}
+
+# Adaptive candidate over-fetch untuk vector index query
+ADAPTIVE_GROWTH = 2            # candidate count dikali 2 tiap expansion
+ADAPTIVE_MAX_CANDIDATES = 1000 # budget maksimal kandidat per query
+# Filter yang lolos <= ini kandidat langsung di-score exact (tanpa vector index)
+FILTER_EXACT_THRESHOLD = 2000
+# Filter lebih lebar: budget kandidat index = limit / selectivity * slack, dibatasi ini
+FILTER_BUDGET_SLACK = 2
+FILTER_MAX_CANDIDATES = 10000
+# Budget habis tapi hasil kurang: exact fallback cuma kalau set filter <= ini,
+# di atasnya hasil parsial (stats "partial": true)
+FILTER_EXACT_FALLBACK_LIMIT = 10000
+
+# Full-text index untuk retriever keyword di hybrid search
+FULLTEXT_INDEXES = {
+    "person": ("person_fulltext_index", "Person", ["full_name", "description"]),
+    "event": ("event_fulltext_index", "Event", ["name", "description"]),
+}
+
 def get_vector_dimension():
     """Get dimension from loaded model"""
     global VECTOR_DIMENSION
@@ -72,7 +96,15 @@ class VectorRepository:
                 }
             """, {"dimensions": dim})
             
-            return {"status": "ok", "message": f"Vector indexes created with dimension {dim}"}
+            # Full-text indexes (retriever keyword untuk hybrid search)
+            for index_name, label, props in FULLTEXT_INDEXES.values():
+                fields = ", ".join(f"n.{prop}" for prop in props)
+                session.run(f"""
+                    CREATE FULLTEXT INDEX {index_name} IF NOT EXISTS
+                    FOR (n:{label}) ON EACH [{fields}]
+                """)
+            
+            return {"status": "ok", "message": f"Vector indexes created with dimension {dim} (+ full-text indexes)"}
     
     def check_vector_index_exists(self) -> dict:
         """Check apakah vector indexes sudah ada"""
@@ -83,36 +115,471 @@ class VectorRepository:
             """)
             indexes = [dict(r) for r in result]
             
+            fulltext = session.run("""
+                SHOW INDEXES
+                WHERE type = 'FULLTEXT'
+            """)
+            fulltext_names = {r["name"] for r in fulltext}
+            
             return {
                 "person_index": any(idx.get("name") == "person_embedding_index" for idx in indexes),
                 "event_index": any(idx.get("name") == "event_embedding_index" for idx in indexes),
+                "person_fulltext_index": FULLTEXT_INDEXES["person"][0] in fulltext_names,
+                "event_fulltext_index": FULLTEXT_INDEXES["event"][0] in fulltext_names,
                 "indexes": indexes
             }
     
     # ==================== NATIVE VECTOR SEARCH ====================
     
-    def vector_search_persons(self, query_embedding: List[float], limit: int = 10, min_score: float = 0.5) -> List[dict]:
+    @staticmethod
+    def _adaptive_stop(candidates: List[dict], hits: List[dict], k: int, limit: int, min_score: float, max_candidates: int) -> Optional[str]:
+        """Alasan berhenti expand (None = kandidat perlu ditambah)"""
+        if len(hits) >= limit:
+            return "enough"
+        if len(candidates) < k:
+            return "exhausted"
+        if candidates and candidates[-1]["score"] < min_score:
+            return "below_min_score"
+        if k >= max_candidates:
+            return "budget"
+        return None
+
+    def _adaptive_index_query(
+        self,
+        session,
+        index_name: str,
+        query_embedding: List[float],
+        limit: int,
+        min_score: float,
+        accept: Optional[Callable[[str], bool]] = None,
+        max_candidates: int = ADAPTIVE_MAX_CANDIDATES,
+        stats: Optional[dict] = None
+    ) -> List[dict]:
+        """
+        Adaptive over-fetch: mulai dari `limit` kandidat, kalau setelah filter
+        (min_score / accept) hasilnya kurang, candidate count dikali ADAPTIVE_GROWTH
+        sampai max_candidates. Return hits {element_id, score} urut desc.
+
+        Berhenti lebih awal kalau:
+        - hasil sudah cukup
+        - index sudah habis (kandidat yang balik < k)
+        - score kandidat terakhir < min_score (kandidat berikutnya pasti lebih rendah)
+        """
+        k = max(limit, 1)
+        expansions = 0
+
+        while True:
+            result = session.run("""
+                CALL db.index.vector.queryNodes($index_name, $k, $embedding)
+                YIELD node, score
+                RETURN elementId(node) AS element_id, score
+            """, {"index_name": index_name, "k": k, "embedding": query_embedding})
+            candidates = [dict(r) for r in result]
+
+            hits = [
+                c for c in candidates
+                if c["score"] >= min_score and (accept is None or accept(c["element_id"]))
+            ]
+
+            stop = self._adaptive_stop(candidates, hits, k, limit, min_score, max_candidates)
+            if stop:
+                break
+
+            k = min(k * ADAPTIVE_GROWTH, max_candidates)
+            expansions += 1
+
+        if stats is not None:
+            stats.update({
+                "candidates": k,
+                "expansions": expansions,
+                "returned": min(len(hits), limit),
+                "stop": stop
+            })
+
+        return hits[:limit]
+
+    def _exact_search_among(
+        self,
+        session,
+        kind: str,
+        element_ids,
+        query_embedding: List[float],
+        limit: int,
+        min_score: float
+    ) -> List[dict]:
+        """Exact cosine scoring (server-side) untuk sekumpulan node tertentu"""
+        label = EMBEDDING_LABELS[kind]
+        result = session.run(f"""
+            UNWIND $element_ids AS element_id
+            MATCH (n:{label})
+            WHERE elementId(n) = element_id AND n.embedding IS NOT NULL
+            WITH element_id, vector.similarity.cosine(n.embedding, $embedding) AS score
+            WHERE score >= $min_score
+            RETURN element_id, score
+            ORDER BY score DESC
+            LIMIT $limit
+        """, {
+            "element_ids": list(element_ids),
+            "embedding": query_embedding,
+            "min_score": min_score,
+            "limit": limit
+        })
+        return [dict(r) for r in result]
+
+    def _filtered_index_query(
+        self,
+        session,
+        kind: str,
+        query_embedding: List[float],
+        limit: int,
+        min_score: float,
+        allowed_ids=None,
+        stats: Optional[dict] = None,
+        exclude_ids=None
+    ) -> List[dict]:
+        """
+        Vector search dengan pre-filter (set element_id yang boleh lolos).
+        - allowed_ids None        -> adaptive index query biasa
+        - allowed_ids kecil       -> exact scoring langsung di set itu
+        - allowed_ids besar       -> adaptive index query + filter saat scoring,
+                                     budget kandidat dari selectivity filter;
+                                     kalau budget habis: exact fallback kalau set
+                                     <= FILTER_EXACT_FALLBACK_LIMIT, selain itu hasil
+                                     parsial ("partial": true di stats)
+        `exclude_ids`: node yang tidak boleh muncul (misal seed / source node).
+        """
+        index_name = f"{kind}_embedding_index"
+        local_stats = {} if stats is None else stats
+        exclude = set(exclude_ids or ())
+
+        if allowed_ids is None:
+            return self._adaptive_index_query(
+                session, index_name, query_embedding, limit, min_score,
+                accept=(lambda element_id: element_id not in exclude) if exclude else None,
+                stats=local_stats
+            )
+
+        allowed = set(allowed_ids) - exclude if exclude else allowed_ids
+
+        if len(allowed) <= FILTER_EXACT_THRESHOLD:
+            hits = self._exact_search_among(session, kind, allowed, query_embedding, limit, min_score)
+            local_stats.update({
+                "strategy": "exact_prefilter",
+                "candidates": len(allowed),
+                "expansions": 0,
+                "returned": len(hits)
+            })
+            return hits
+
+        # Pre-selectivity dari count store (bukan scan): perkiraan kandidat index
+        # yang dibutuhkan supaya ~limit hit lolos filter
+        total = session.run(
+            f"MATCH (n:{EMBEDDING_LABELS[kind]}) RETURN count(n) AS total"
+        ).single()["total"]
+        selectivity = len(allowed) / max(total, len(allowed), 1)
+        budget = min(
+            max(ADAPTIVE_MAX_CANDIDATES, math.ceil(limit / selectivity * FILTER_BUDGET_SLACK)),
+            FILTER_MAX_CANDIDATES
+        )
+
+        hits = self._adaptive_index_query(
+            session, index_name, query_embedding, limit, min_score,
+            accept=lambda element_id: element_id in allowed,
+            max_candidates=budget,
+            stats=local_stats
+        )
+        local_stats.update({"strategy": "filtered_index", "selectivity": round(selectivity, 4), "partial": False})
+        if len(hits) < limit and local_stats.get("stop") == "budget":
+            if len(allowed) <= FILTER_EXACT_FALLBACK_LIMIT:
+                hits = self._exact_search_among(session, kind, allowed, query_embedding, limit, min_score)
+                local_stats.update({"strategy": "filtered_index_exact_fallback", "returned": len(hits)})
+            else:
+                local_stats["partial"] = True
+        return hits
+
+    def vector_search_persons(
+        self,
+        query_embedding: List[float],
+        limit: int = 10,
+        min_score: float = 0.5,
+        stats: Optional[dict] = None,
+        allowed_ids=None,
+        exclude_ids=None
+    ) -> List[dict]:
         """
         Search persons menggunakan Neo4j NATIVE Vector Index.
-        Ini yang seharusnya dipakai - jauh lebih cepat!
+        Kandidat diambil adaptive (lihat _adaptive_index_query), baru di-hydrate.
+        Kalau `stats` dikasih, diisi jumlah kandidat & expansions.
+        `allowed_ids`: pre-filter set element_id (lihat _filtered_index_query).
+        """
+        with self.driver.session(database=self.db) as session:
+            hits = self._filtered_index_query(
+                session, "person", query_embedding, limit, min_score, allowed_ids, stats, exclude_ids
+            )
+        return self.hydrate_persons(hits)
+    
+    def vector_search_events(
+        self,
+        query_embedding: List[float],
+        limit: int = 10,
+        min_score: float = 0.5,
+        stats: Optional[dict] = None,
+        allowed_ids=None,
+        exclude_ids=None
+    ) -> List[dict]:
+        """
+        Search events menggunakan Neo4j NATIVE Vector Index.
         """
+        with self.driver.session(database=self.db) as session:
+            hits = self._filtered_index_query(
+                session, "event", query_embedding, limit, min_score, allowed_ids, stats, exclude_ids
+            )
+        return self.hydrate_events(hits)
+    
+    def hybrid_candidates(
+        self,
+        kind: str,
+        fulltext_query: str,
+        query_embedding: List[float],
+        text_candidates: int = 50,
+        vector_candidates: int = 50
+    ) -> dict:
+        """
+        Ambil kandidat dari full-text index dan vector index secara independen,
+        dalam satu query (dua CALL subquery). Return
+        {"text": [{element_id, score}], "vector": [{element_id, score}]}, masing-masing urut desc.
+        Budget kandidat per retriever bisa diatur terpisah (0 = retriever dimatikan).
+        """
+        fulltext_index = FULLTEXT_INDEXES[kind][0]
+        # Retriever yang dimatikan (budget 0 / query kosong) diganti list kosong,
+        # supaya queryNodes tidak dipanggil dengan argumen invalid
+        text_part = """
+                CALL {
+                    CALL db.index.fulltext.queryNodes($fulltext_index, $fulltext_query, {limit: $text_k})
+                    YIELD node, score
+                    RETURN collect({element_id: elementId(node), score: score}) AS text_hits
+                }
+        """ if text_candidates > 0 and fulltext_query else "WITH [] AS text_hits"
+        vector_part = """
+                CALL {
+                    CALL db.index.vector.queryNodes($vector_index, $vector_k, $embedding)
+                    YIELD node, score
+                    RETURN collect({element_id: elementId(node), score: score}) AS vector_hits
+                }
+        """ if vector_candidates > 0 else "WITH text_hits, [] AS vector_hits"
+
+        with self.driver.session(database=self.db) as session:
+            record = session.run(f"""
+                {text_part}
+                {vector_part}
+                RETURN text_hits, vector_hits
+            """, {
+                "fulltext_index": fulltext_index,
+                "fulltext_query": fulltext_query,
+                "text_k": text_candidates,
+                "vector_index": f"{kind}_embedding_index",
+                "vector_k": vector_candidates,
+                "embedding": query_embedding
+            }).single()
+
+        text_hits = sorted(record["text_hits"], key=lambda h: h["score"], reverse=True)
+        vector_hits = sorted(record["vector_hits"], key=lambda h: h["score"], reverse=True)
+        return {"text": text_hits, "vector": vector_hits}
+
+    def batch_vector_search(
+        self,
+        kind: str,
+        query_embeddings: List[List[float]],
+        limit: int = 10,
+        min_score: float = 0.5
+    ) -> List[List[dict]]:
+        """
+        Vector search untuk banyak query sekaligus: tiap round satu UNWIND query
+        untuk semua query yang masih kurang hasil, dengan candidate count per query
+        yang tumbuh seperti _adaptive_index_query (ADAPTIVE_GROWTH sampai
+        ADAPTIVE_MAX_CANDIDATES, stop rule yang sama). Lalu satu hydrate untuk
+        gabungan hasilnya. Return list hasil per query (urutan sama dengan query_embeddings).
+        """
+        if not query_embeddings:
+            return []
+        hits_per_query = [[] for _ in query_embeddings]
+        ks = {qi: max(limit, 1) for qi in range(len(query_embeddings))}
+        with self.driver.session(database=self.db) as session:
+            while ks:
+                result = session.run("""
+                    UNWIND $queries AS q
+                    CALL {
+                        WITH q
+                        CALL db.index.vector.queryNodes($index_name, q.k, $embeddings[q.qi])
+                        YIELD node, score
+                        RETURN collect({element_id: elementId(node), score: score}) AS candidates
+                    }
+                    RETURN q.qi AS qi, candidates
+                """, {
+                    "queries": [{"qi": qi, "k": k} for qi, k in ks.items()],
+                    "embeddings": query_embeddings,
+                    "index_name": f"{kind}_embedding_index"
+                })
+                pending = {}
+                for record in result:
+                    qi, candidates = record["qi"], record["candidates"]
+                    hits = [c for c in candidates if c["score"] >= min_score]
+                    hits_per_query[qi] = hits[:limit]
+                    if not self._adaptive_stop(candidates, hits, ks[qi], limit, min_score, ADAPTIVE_MAX_CANDIDATES):
+                        pending[qi] = min(ks[qi] * ADAPTIVE_GROWTH, ADAPTIVE_MAX_CANDIDATES)
+                ks = pending
+
+        # Hydrate per query dari context-card cache (node yang sama cuma di-fetch sekali)
+        unique_hits = list({h["element_id"]: h for hits in hits_per_query for h in hits}.values())
+        self._hydrate(kind, unique_hits)
+        return [self._hydrate(kind, hits) for hits in hits_per_query]
+
+    def find_similar_persons(self, person_element_id: str, limit: int = 10, min_score: float = 0.5) -> List[dict]:
+        """
+        Find similar persons berdasarkan embedding seseorang.
+        Baca dari SIMILAR_TO kalau sudah di-materialize & fresh, kalau tidak pakai Native Vector Index.
+        """
+        precomputed = self.get_precomputed_similar("person", person_element_id, limit, min_score)
+        if precomputed is not None:
+            source_name = precomputed["name"]
+            hits = precomputed["hits"]
+        else:
+            source = self.get_source_embedding("person", person_element_id)
+            if not source:
+                return []
+            source_name = source["name"]
+
+            with self.driver.session(database=self.db) as session:
+                hits = self._adaptive_index_query(
+                    session, "person_embedding_index", source["embedding"], limit, min_score,
+                    accept=lambda element_id: element_id != person_element_id
+                )
+
+        similar = [
+            {
+                "element_id": p["element_id"],
+                "name": p["name"],
+                "description": p["description"],
+                "image": p["image"],
+                "similarity_score": p["similarity_score"],
+                "positions": p["positions"],
+                "country": p["country"]
+            }
+            for p in self.hydrate_persons(hits)
+        ]
+        return {
+            "source": {"element_id": person_element_id, "name": source_name},
+            "similar": similar,
+            "precomputed": precomputed is not None
+        }
+    
+    def find_similar_events(self, event_element_id: str, limit: int = 10, min_score: float = 0.5) -> List[dict]:
+        """Find similar events berdasarkan embedding (SIMILAR_TO kalau ada, fallback vector index)."""
+        precomputed = self.get_precomputed_similar("event", event_element_id, limit, min_score)
+        if precomputed is not None:
+            source_name = precomputed["name"]
+            hits = precomputed["hits"]
+        else:
+            source = self.get_source_embedding("event", event_element_id)
+            if not source:
+                return []
+            source_name = source["name"]
+
+            with self.driver.session(database=self.db) as session:
+                hits = self._adaptive_index_query(
+                    session, "event_embedding_index", source["embedding"], limit, min_score,
+                    accept=lambda element_id: element_id != event_element_id
+                )
+
+        similar = [
+            {
+                "element_id": e["element_id"],
+                "name": e["name"],
+                "description": e["description"],
+                "image": e["image"],
+                "impact": e["impact"],
+                "similarity_score": e["similarity_score"],
+                "country": e["country"]
+            }
+            for e in self.hydrate_events(hits)
+        ]
+        return {
+            "source": {"element_id": event_element_id, "name": source_name},
+            "similar": similar,
+            "precomputed": precomputed is not None
+        }
+    
+    # ==================== IN-PROCESS ENGINE SUPPORT ====================
+
+    def iter_embeddings(self, kind: str, fetch_size: int = 2000):
+        """
+        Stream (element_id, embedding) untuk semua node yang sudah punya embedding.
+        Dipakai untuk build in-process index (PQ, dll) tanpa load semua record sekaligus.
+        """
+        label = EMBEDDING_LABELS[kind]
+        with self.driver.session(database=self.db, fetch_size=fetch_size) as session:
+            result = session.run(f"""
+                MATCH (n:{label})
+                WHERE n.embedding IS NOT NULL
+                RETURN elementId(n) AS element_id, n.embedding AS embedding
+            """)
+            for record in result:
+                yield record["element_id"], record["embedding"]
+
+    def score_candidates(self, kind: str, element_ids: List[str], query_embedding: List[float], min_score: float = 0.0) -> List[dict]:
+        """
+        Exact re-rank kandidat engine in-process di server (vector.similarity.cosine):
+        cuma element_id + score yang lewat Bolt, bukan float vector kandidat.
+        """
+        if not element_ids:
+            return []
+        with self.driver.session(database=self.db) as session:
+            return self._exact_search_among(session, kind, element_ids, query_embedding, len(element_ids), min_score)
+
+    def get_embedding_snapshot(self, kind: str) -> tuple:
+        """(jumlah node ber-embedding, embedding_updated terbaru) untuk deteksi index in-process stale"""
+        label = EMBEDDING_LABELS[kind]
+        with self.driver.session(database=self.db) as session:
+            record = session.run(f"""
+                MATCH (n:{label})
+                WHERE n.embedding IS NOT NULL
+                RETURN count(n) AS total, max(n.embedding_updated) AS latest
+            """).single()
+            latest = record["latest"]
+            return record["total"], str(latest) if latest is not None else None
+
+    def get_embeddings_by_element_ids(self, kind: str, element_ids: List[str]) -> dict:
+        """Ambil embedding untuk sekumpulan node (untuk exact re-rank). Return {element_id: embedding}"""
+        if not element_ids:
+            return {}
+        label = EMBEDDING_LABELS[kind]
+        with self.driver.session(database=self.db) as session:
+            result = session.run(f"""
+                UNWIND $element_ids AS element_id
+                MATCH (n:{label})
+                WHERE elementId(n) = element_id AND n.embedding IS NOT NULL
+                RETURN element_id, n.embedding AS embedding
+            """, {"element_ids": list(element_ids)})
+            return {r["element_id"]: r["embedding"] for r in result}
+
+    def _fetch_person_cards(self, element_ids: List[str]) -> List[dict]:
+        """Context card Person (data display + positions, birth country, death place)"""
         with self.driver.session(database=self.db) as session:
             result = session.run("""
-                CALL db.index.vector.queryNodes('person_embedding_index', $limit_candidates, $embedding)
-                YIELD node AS p, score
-                WHERE score >= $min_score
-                
-                // Get related data
+                UNWIND $element_ids AS element_id
+                MATCH (p:Person)
+                WHERE elementId(p) = element_id
+
                 OPTIONAL MATCH (p)-[:HELD_POSITION]->(pos:Position)
                 OPTIONAL MATCH (p)-[:BORN_IN]->(city:City)-[:LOCATED_IN]->(country:Country)
                 OPTIONAL MATCH (p)-[:DIED_IN]->(death_city:City)
-                
-                WITH p, score,
+
+                WITH p,
                      collect(DISTINCT coalesce(pos.label, pos.name))[..5] AS positions,
                      collect(DISTINCT country.country)[0] AS birth_country,
-                     death_city.city AS death_place
-                
-                RETURN 
+                     collect(DISTINCT death_city.city)[0] AS death_place
+
+                RETURN
                     elementId(p) AS element_id,
                     p.article_id AS article_id,
                     p.full_name AS name,
@@ -122,36 +589,24 @@ class VectorRepository:
                     p.birth_date AS birth_date,
                     p.death_date AS death_date,
                     death_place,
-                    score AS similarity_score,
                     positions,
                     birth_country AS country
-                ORDER BY score DESC
-                LIMIT $limit
-            """, {
-                "embedding": query_embedding,
-                "limit_candidates": limit * 2,  # Get more candidates for filtering
-                "min_score": min_score,
-                "limit": limit
-            })
-            
+            """, {"element_ids": element_ids})
             return [dict(r) for r in result]
-    
-    def vector_search_events(self, query_embedding: List[float], limit: int = 10, min_score: float = 0.5) -> List[dict]:
-        """
-        Search events menggunakan Neo4j NATIVE Vector Index.
-        """
+
+    def _fetch_event_cards(self, element_ids: List[str]) -> List[dict]:
+        """Context card Event (data display + event country)"""
         with self.driver.session(database=self.db) as session:
             result = session.run("""
-                CALL db.index.vector.queryNodes('event_embedding_index', $limit_candidates, $embedding)
-                YIELD node AS e, score
-                WHERE score >= $min_score
-                
+                UNWIND $element_ids AS element_id
+                MATCH (e:Event)
+                WHERE elementId(e) = element_id
+
                 OPTIONAL MATCH (e)-[:HELD_IN]->(country:Country)
-                
-                WITH e, score,
-                     collect(DISTINCT country.country)[0] AS event_country
-                
-                RETURN 
+
+                WITH e, collect(DISTINCT country.country)[0] AS event_country
+
+                RETURN
                     elementId(e) AS element_id,
                     e.event_id AS event_id,
                     e.name AS name,
@@ -160,123 +615,233 @@ class VectorRepository:
                     e.impact AS impact,
                     e.start_date AS start_date,
                     e.end_date AS end_date,
-                    score AS similarity_score,
                     event_country AS country
-                ORDER BY score DESC
-                LIMIT $limit
-            """, {
-                "embedding": query_embedding,
-                "limit_candidates": limit * 2,
-                "min_score": min_score,
-                "limit": limit
-            })
-            
+            """, {"element_ids": element_ids})
             return [dict(r) for r in result]
-    
-    def find_similar_persons(self, person_element_id: str, limit: int = 10, min_score: float = 0.5) -> List[dict]:
+
+    def _hydrate(self, kind: str, hits: List[dict]) -> List[dict]:
         """
-        Find similar persons berdasarkan embedding seseorang.
-        Pakai Native Vector Index.
+        Gabungkan hits {element_id, score} dengan context card dari cache.
+        Cuma node yang belum ada di cache yang di-query ke Neo4j (satu query).
+        Urutan hits dipertahankan (sudah urut score desc).
         """
+        if not hits:
+            return []
+        cache = get_context_cards()
+        cards, missing = cache.get_many(h["element_id"] for h in hits)
+        if missing:
+            fetch = self._fetch_person_cards if kind == "person" else self._fetch_event_cards
+            fetched = fetch(list(dict.fromkeys(missing)))
+            cache.put_many(kind, fetched)
+            cards.update({card["element_id"]: card for card in fetched})
+
+        return [
+            {**cards[h["element_id"]], "similarity_score": h["score"]}
+            for h in hits if h["element_id"] in cards
+        ]
+
+    def hydrate_persons(self, hits: List[dict]) -> List[dict]:
+        """
+        Lengkapi hits ({element_id, score}) dengan data Person dari context-card cache.
+        Shape hasilnya sama dengan vector_search_persons.
+        """
+        return self._hydrate("person", hits)
+
+    def hydrate_events(self, hits: List[dict]) -> List[dict]:
+        """Lengkapi hits ({element_id, score}) dengan data Event dari context-card cache."""
+        return self._hydrate("event", hits)
+
+    def get_source_embedding(self, kind: str, element_id: str) -> Optional[dict]:
+        """Ambil embedding + nama dari satu node (source untuk /similar)"""
+        label = EMBEDDING_LABELS[kind]
+        name_prop = "full_name" if kind == "person" else "name"
         with self.driver.session(database=self.db) as session:
-            # Get embedding dari source person
-            source = session.run("""
-                MATCH (p:Person)
-                WHERE elementId(p) = $element_id
-                RETURN p.embedding AS embedding, p.full_name AS name
-            """, {"element_id": person_element_id})
-            
-            record = source.single()
+            record = session.run(f"""
+                MATCH (n:{label})
+                WHERE elementId(n) = $element_id
+                RETURN n.embedding AS embedding, n.{name_prop} AS name
+            """, {"element_id": element_id}).single()
             if not record or not record["embedding"]:
-                return []
-            
-            source_embedding = record["embedding"]
-            source_name = record["name"]
-            
-            # Search similar using vector index
-            result = session.run("""
-                CALL db.index.vector.queryNodes('person_embedding_index', $limit_candidates, $embedding)
-                YIELD node AS p, score
-                WHERE elementId(p) <> $exclude_id AND score >= $min_score
-                
-                OPTIONAL MATCH (p)-[:HELD_POSITION]->(pos:Position)
-                OPTIONAL MATCH (p)-[:BORN_IN]->(city:City)-[:LOCATED_IN]->(country:Country)
-                
-                WITH p, score,
-                     collect(DISTINCT coalesce(pos.label, pos.name))[..5] AS positions,
-                     collect(DISTINCT country.country)[0] AS birth_country
-                
-                RETURN 
-                    elementId(p) AS element_id,
-                    p.full_name AS name,
-                    p.description AS description,
-                    p.image_url AS image,
-                    score AS similarity_score,
-                    positions,
-                    birth_country AS country
-                ORDER BY score DESC
-                LIMIT $limit
-            """, {
-                "embedding": source_embedding,
-                "exclude_id": person_element_id,
-                "limit_candidates": limit * 2,
-                "min_score": min_score,
-                "limit": limit
-            })
-            
-            return {
-                "source": {"element_id": person_element_id, "name": source_name},
-                "similar": [dict(r) for r in result]
-            }
-    
-    def find_similar_events(self, event_element_id: str, limit: int = 10, min_score: float = 0.5) -> List[dict]:
-        """Find similar events berdasarkan embedding."""
-        with self.driver.session(database=self.db) as session:
-            source = session.run("""
+                return None
+            return {"embedding": record["embedding"], "name": record["name"]}
+
+    def iter_filter_attributes(self, kind: str, fetch_size: int = 2000):
+        """
+        Stream atribut filter untuk node yang punya embedding:
+        - Person: birth country (BORN_IN/LOCATED_IN), continent, birth_year
+        - Event: country (HELD_IN), continent
+        Nama country/continent sudah lowercase.
+        """
+        if kind == "person":
+            query = """
+                MATCH (p:Person)
+                WHERE p.embedding IS NOT NULL
+                OPTIONAL MATCH (p)-[:BORN_IN]->(:City)-[:LOCATED_IN]->(country:Country)
+                OPTIONAL MATCH (country)-[:LOCATED_IN]->(continent:Continent)
+                RETURN elementId(p) AS element_id,
+                       p.birth_year AS birth_year,
+                       collect(DISTINCT toLower(country.country)) AS countries,
+                       collect(DISTINCT toLower(continent.continent)) AS continents
+            """
+        else:
+            query = """
                 MATCH (e:Event)
-                WHERE elementId(e) = $element_id
-                RETURN e.embedding AS embedding, e.name AS name
-            """, {"element_id": event_element_id})
-            
-            record = source.single()
-            if not record or not record["embedding"]:
-                return []
-            
-            result = session.run("""
-                CALL db.index.vector.queryNodes('event_embedding_index', $limit_candidates, $embedding)
-                YIELD node AS e, score
-                WHERE elementId(e) <> $exclude_id AND score >= $min_score
-                
+                WHERE e.embedding IS NOT NULL
                 OPTIONAL MATCH (e)-[:HELD_IN]->(country:Country)
-                
-                WITH e, score,
-                     collect(DISTINCT country.country)[0] AS event_country
-                
-                RETURN 
-                    elementId(e) AS element_id,
-                    e.name AS name,
-                    e.description AS description,
-                    e.image_url AS image,
-                    e.impact AS impact,
-                    score AS similarity_score,
-                    event_country AS country
-                ORDER BY score DESC
+                OPTIONAL MATCH (country)-[:LOCATED_IN]->(continent:Continent)
+                RETURN elementId(e) AS element_id,
+                       null AS birth_year,
+                       collect(DISTINCT toLower(country.country)) AS countries,
+                       collect(DISTINCT toLower(continent.continent)) AS continents
+            """
+        with self.driver.session(database=self.db, fetch_size=fetch_size) as session:
+            for record in session.run(query):
+                yield dict(record)
+
+    # ==================== PRECOMPUTED SIMILARITY GRAPH ====================
+
+    def reset_similarity_graph(self, kind: str):
+        """Tandai semua node stale supaya refresh berikutnya menghitung ulang semuanya"""
+        label = EMBEDDING_LABELS[kind]
+        with self.driver.session(database=self.db) as session:
+            session.run(f"""
+                MATCH (n:{label})
+                WHERE n.similar_updated IS NOT NULL
+                REMOVE n.similar_updated
+            """)
+
+    def get_stale_similarity_ids(self, kind: str, limit: int = 200) -> List[str]:
+        """Node yang embedding-nya lebih baru dari daftar SIMILAR_TO-nya (atau belum pernah dihitung)"""
+        label = EMBEDDING_LABELS[kind]
+        with self.driver.session(database=self.db) as session:
+            result = session.run(f"""
+                MATCH (n:{label})
+                WHERE n.embedding IS NOT NULL
+                  AND (n.similar_updated IS NULL
+                       OR (n.embedding_updated IS NOT NULL AND n.similar_updated < n.embedding_updated))
+                RETURN elementId(n) AS element_id
                 LIMIT $limit
+            """, {"limit": limit})
+            return [r["element_id"] for r in result]
+
+    def materialize_similar(self, kind: str, element_ids: List[str], k: int = 20) -> int:
+        """
+        Hitung top-k neighbor (pakai vector index) untuk node-node ini dan simpan
+        sebagai relasi (n)-[:SIMILAR_TO {score, rank}]->(neighbor). Relasi lama diganti.
+        """
+        label = EMBEDDING_LABELS[kind]
+        with self.driver.session(database=self.db) as session:
+            result = session.run(f"""
+                UNWIND $element_ids AS element_id
+                MATCH (n:{label})
+                WHERE elementId(n) = element_id AND n.embedding IS NOT NULL
+                OPTIONAL MATCH (n)-[old:SIMILAR_TO]->()
+                DELETE old
+                WITH DISTINCT n
+                CALL {{
+                    WITH n
+                    CALL db.index.vector.queryNodes($index_name, $k_candidates, n.embedding)
+                    YIELD node AS other, score
+                    WITH n, other, score
+                    WHERE other <> n
+                    RETURN collect({{other: other, score: score}})[..$k] AS neighbors
+                }}
+                CALL {{
+                    WITH n, neighbors
+                    UNWIND range(0, size(neighbors) - 1) AS i
+                    WITH n, neighbors[i].other AS other, neighbors[i].score AS score, i
+                    MERGE (n)-[r:SIMILAR_TO]->(other)
+                    SET r.score = score, r.rank = i + 1
+                }}
+                SET n.similar_updated = datetime(), n.similar_k = $k
+                RETURN count(n) AS refreshed
             """, {
-                "embedding": record["embedding"],
-                "exclude_id": event_element_id,
-                "limit_candidates": limit * 2,
-                "min_score": min_score,
-                "limit": limit
+                "element_ids": element_ids,
+                "index_name": f"{kind}_embedding_index",
+                "k_candidates": k + 1,
+                "k": k
             })
-            
-            return {
-                "source": {"element_id": event_element_id, "name": record["name"]},
-                "similar": [dict(r) for r in result]
-            }
-    
+            return result.single()["refreshed"]
+
+    def get_precomputed_similar(self, kind: str, element_id: str, limit: int = 10, min_score: float = 0.5):
+        """
+        Baca neighbor dari SIMILAR_TO. Return None kalau belum ada / stale / k tersimpan
+        kurang dari limit (caller fallback ke live vector search).
+        """
+        label = EMBEDDING_LABELS[kind]
+        name_prop = "full_name" if kind == "person" else "name"
+        with self.driver.session(database=self.db) as session:
+            record = session.run(f"""
+                MATCH (s:{label})
+                WHERE elementId(s) = $element_id
+                  AND s.similar_updated IS NOT NULL
+                  AND (s.embedding_updated IS NULL OR s.similar_updated >= s.embedding_updated)
+                  AND s.similar_k >= $limit
+                OPTIONAL MATCH (s)-[r:SIMILAR_TO]->(n:{label})
+                WHERE r.score >= $min_score
+                WITH s, r, n
+                ORDER BY r.score DESC
+                WITH s, collect({{element_id: elementId(n), score: r.score}})[..$limit] AS hits
+                RETURN s.{name_prop} AS name, hits
+            """, {"element_id": element_id, "limit": limit, "min_score": min_score}).single()
+            if not record:
+                return None
+            return {"name": record["name"], "hits": [h for h in record["hits"] if h["element_id"]]}
+
+    # ==================== EMBEDDING CLUSTERS ====================
+
+    def replace_clusters(self, kind: str, clusters: List[dict], memberships: List[dict], batch_size: int = 5000):
+        """
+        Ganti hasil clustering untuk satu tipe:
+        (:EmbeddingCluster {kind, cluster_id, size, centroid, sample_names})
+        dan (n)-[:IN_CLUSTER {score}]->(cluster). Cluster lama dihapus dulu.
+        memberships: [{element_id, cluster_id, score}]
+        """
+        label = EMBEDDING_LABELS[kind]
+        with self.driver.session(database=self.db) as session:
+            session.run("""
+                MATCH (c:EmbeddingCluster {kind: $kind})
+                DETACH DELETE c
+            """, {"kind": kind})
+            session.run("""
+                UNWIND $clusters AS cluster
+                CREATE (c:EmbeddingCluster {kind: $kind, cluster_id: cluster.cluster_id})
+                SET c.size = cluster.size,
+                    c.centroid = cluster.centroid,
+                    c.sample_names = cluster.sample_names,
+                    c.built_at = datetime()
+            """, {"kind": kind, "clusters": clusters})
+            for start in range(0, len(memberships), batch_size):
+                session.run(f"""
+                    UNWIND $rows AS row
+                    MATCH (n:{label})
+                    WHERE elementId(n) = row.element_id
+                    MATCH (c:EmbeddingCluster {{kind: $kind, cluster_id: row.cluster_id}})
+                    CREATE (n)-[:IN_CLUSTER {{score: row.score}}]->(c)
+                """, {"kind": kind, "rows": memberships[start:start + batch_size]})
+
+    def get_clusters(self, kind: str) -> List[dict]:
+        with self.driver.session(database=self.db) as session:
+            result = session.run("""
+                MATCH (c:EmbeddingCluster {kind: $kind})
+                RETURN c.cluster_id AS cluster_id, c.size AS size,
+                       c.sample_names AS sample_names, toString(c.built_at) AS built_at
+                ORDER BY cluster_id
+            """, {"kind": kind})
+            return [dict(r) for r in result]
+
+    def iter_cluster_memberships(self, kind: str, fetch_size: int = 5000):
+        """Stream (element_id, cluster_id, score) untuk load lookup in-memory"""
+        with self.driver.session(database=self.db, fetch_size=fetch_size) as session:
+            result = session.run("""
+                MATCH (n)-[r:IN_CLUSTER]->(c:EmbeddingCluster {kind: $kind})
+                RETURN elementId(n) AS element_id, c.cluster_id AS cluster_id, r.score AS score
+            """, {"kind": kind})
+            for record in result:
+                yield record["element_id"], record["cluster_id"], record["score"]
+
     # ==================== STORAGE METHODS ====================
-    
+
     def store_person_embedding(self, article_id: int, embedding: List[float], searchable_text: str = None):
         """Store embedding ke Person node"""
         with self.driver.session(database=self.db) as session:
@@ -290,6 +855,8 @@ class VectorRepository:
                 "embedding": embedding,
                 "searchable_text": searchable_text
             })
+        # Vector baru bisa mengubah ranking query mana pun
+        get_semantic_cache().invalidate_all()
     
     def store_event_embedding(self, event_id: int, embedding: List[float], searchable_text: str = None):
         """Store embedding ke Event node"""
@@ -304,6 +871,7 @@ class VectorRepository:
                 "embedding": embedding,
                 "searchable_text": searchable_text
             })
+        get_semantic_cache().invalidate_all()
 
     def get_persons_without_embedding(self, limit: int = 100):
         """Get persons yang belum punya embedding - dengan SEMUA field yang tersedia"""
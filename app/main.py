@@ -10,6 +10,9 @@ from app.routers.feature.infobox import router as infobox_router
 from app.routers.enrichment.country_enrichment import router as country_enrichment_router
 from app.routers.feature.searching import router as searching_router
 from app.routers.feature.vector_search import router as vector_search_router
+from app.db.search_repo import get_search_repo
+from app.services.feature.search_index import bootstrap_search
+import threading
 
 app = FastAPI(title="KG Enrichment Service - Person")
 
@@ -29,3 +32,21 @@ app.include_router(explore_router)
 app.include_router(infobox_router)
 app.include_router(searching_router)
 app.include_router(vector_search_router, prefix="/vector")
+
+
+@app.on_event("startup")
+def bootstrap_search_indexes():
+    """Pastikan full-text index /search ada (tidak menggagalkan startup kalau Neo4j belum siap)"""
+    try:
+        print(f"🔎 Search indexes: {get_search_repo().ensure_search_indexes()}")
+    except Exception as e:
+        print(f"⚠️ Search index bootstrap failed: {e}")
+
+
+@app.on_event("startup")
+def start_search_index_build():
+    """
+    Field search_* yang belum ada di-materialisasi, lalu trigram index /search
+    di-build di background; sampai siap /search pakai full-text Neo4j
+    """
+    threading.Thread(target=bootstrap_search, name="search-index-build", daemon=True).start()
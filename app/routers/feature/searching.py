@@ -1,7 +1,23 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 from app.db.neo4j_repo import get_repo
+from app.db.search_repo import get_search_repo, FULLTEXT_COUNT_CAP
+from app.services.feature.filter_options import get_filter_options_cache, etag_matches
+from app.services.feature.text_folding import fold_name
+from app.services.feature.search_cursor import encode_cursor, decode_cursor
+from app.services.feature.search_index import (
+    get_search_index,
+    get_prefix_index,
+    get_spell_index,
+    get_alias_index,
+    SORT_MODES,
+    build_all_search_indexes,
+    bootstrap_search,
+    get_search_index_status,
+    materialization_progress,
+)
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import re
 
 router = APIRouter()
@@ -14,250 +30,313 @@ class SearchRequest(BaseModel):
     search_type: Optional[str] = "all"  # "person", "event", "all"
     filter_country: Optional[List[str]] = None 
     filter_continent: Optional[List[str]] = None 
+    # Keyset pagination: isi dengan next_cursor dari response sebelumnya
+    # (kalau ada, current_*_count diabaikan)
+    person_cursor: Optional[str] = None
+    event_cursor: Optional[str] = None
+    # "name" (A-Z) atau "popularity" (historical_popularity_index tertinggi dulu)
+    sort: Optional[str] = "name"
+
+
+def format_person_row(record: dict) -> dict:
+    positions = [pos for pos in record["all_positions"] if pos is not None]
+    return {
+        "type": "person",
+        "element_id": record["element_id"],
+        "name": record["name"],
+        "description": record["description"],
+        "image": record["image"],
+        "context": {
+            "positions": positions,
+            "country": record["country"]
+        }
+    }
+
+
+def format_event_row(record: dict) -> dict:
+    return {
+        "type": "event",
+        "element_id": record["element_id"],
+        "name": record["name"],
+        "description": record["description"],
+        "image": record["image"],
+        "context": {
+            "country": record["country"],
+            "impact": record["impact"]
+        }
+    }
+
 
 @router.post("/search")
 def search_historical_data(payload: SearchRequest):
     """
     Universal search untuk Historical Person & Events
-    Mencari berdasarkan nama, deskripsi, dan konteks terkait
+    Mencari berdasarkan nama, deskripsi, dan konteks terkait.
+    Match dijawab dari trigram index in-memory (substring di mana saja, termasuk
+    label/alias Wikidata multibahasa), Neo4j
+    cuma untuk hydrate halaman hasil. Selama index belum siap, fallback ke
+    full-text index Neo4j (lihat /search/setup-indexes).
+    Pagination: kirim persons.next_cursor / events.next_cursor sebagai
+    person_cursor / event_cursor (keyset, tanpa SKIP).
+    sort="popularity": urut historical_popularity_index tertinggi dulu (top-k,
+    tanpa sort semua match); cursor berlaku untuk mode sort yang sama.
+    persons.estimate / events.estimate: perkiraan total match ("sekitar N hasil")
+    dengan error bound, tanpa mengambil semua hasil.
+    Typo: kalau halaman pertama kurang dari limit, query dikoreksi per token
+    (SymSpell, edit distance <= 2) dan sisa slot diisi hasil query koreksi;
+    query koreksinya ada di persons.did_you_mean / events.did_you_mean.
+    persons.facets / events.facets: jumlah match per country & continent untuk
+    checkbox filter (bitmap in-memory, tanpa query Cypher tambahan).
     """
     if len(payload.query.strip()) < 2:
         raise HTTPException(status_code=400, detail="Query minimal 2 karakter")
+    sort = payload.sort or "name"
+    if sort not in SORT_MODES:
+        raise HTTPException(status_code=400, detail=f"sort harus salah satu dari {list(SORT_MODES)}")
     
-    repo = get_repo()
+    repo = get_search_repo()
     query_lower = payload.query.lower().strip()
     
     results = {
         "query": payload.query,
         "persons": {
             "data": [],
-            "total_found": 0
+            "total_found": 0,
+            "next_cursor": None,
+            "estimate": None,
+            "did_you_mean": None,
+            "facets": None
         },
         "events": {
             "data": [],
-            "total_found": 0
+            "total_found": 0,
+            "next_cursor": None,
+            "estimate": None,
+            "did_you_mean": None,
+            "facets": None
         }
     }
-
-    def _build_filter_conditions():
-        """Build filter conditions and return WHERE clauses with parameters"""
-        filter_conditions = []
-        params = {"query": query_lower}
-        
-        # Country filter - support multiple countries
-        if payload.filter_country and len(payload.filter_country) > 0:
-            country_list = [c.lower() for c in payload.filter_country]
-            filter_conditions.append("(country IS NOT NULL AND toLower(country.country) IN $filter_countries)")
-            params["filter_countries"] = country_list
-        
-        # Continent filter - support multiple continents  
-        if payload.filter_continent and len(payload.filter_continent) > 0:
-            continent_list = [c.lower() for c in payload.filter_continent]
-            filter_conditions.append("(continent IS NOT NULL AND toLower(continent.continent) IN $filter_continents)")
-            params["filter_continents"] = continent_list
-            
-        return filter_conditions, params
+    person_after = decode_cursor(payload.person_cursor, sort)
+    event_after = decode_cursor(payload.event_cursor, sort)
+    
+    def page(kind: str, limit: int, offset: int, after: Optional[Tuple], query: str = query_lower):
+        """
+        Return (records, next_cursor, estimate). Cursor: seek langsung ke setelah
+        keyset, tanpa SKIP. estimate: perkiraan total match + error bound.
+        """
+        index = get_search_index(kind)
+        if index is not None:
+            needle, candidates = index.candidates(query, payload.filter_country, payload.filter_continent)
+            page_keys, has_more = index.page(needle, candidates, limit, offset, after, sort=sort)
+            hydrate = repo.hydrate_persons if kind == "person" else repo.hydrate_events
+            records = hydrate([element_id for _, element_id in page_keys])
+            last = page_keys[-1] if page_keys else None
+            estimate = index.estimate_total(needle, candidates)
+        else:
+            search = repo.search_persons if kind == "person" else repo.search_events
+            records = search(
+                query,
+                limit=limit + 1,  # 1 baris ekstra untuk tahu masih ada halaman berikutnya
+                offset=offset,
+                countries=payload.filter_country,
+                continents=payload.filter_continent,
+                after=after,
+                sort=sort
+            )
+            has_more = len(records) > limit
+            records = records[:limit]
+            last = (records[-1]["sort_key"], records[-1]["element_id"]) if records else None
+            # Total cuma dihitung di halaman pertama (halaman cursor pakai estimate sebelumnya),
+            # dan di-cap: count > FULLTEXT_COUNT_CAP dilaporkan sebagai lower bound
+            estimate = None
+            if after is None and not offset:
+                total = repo.count_fulltext_hits(kind, query, payload.filter_country, payload.filter_continent)
+                estimate = {
+                    "estimated_total": min(total, FULLTEXT_COUNT_CAP),
+                    "error_bound": None,
+                    "exact": False,
+                    "lower_bound": total > FULLTEXT_COUNT_CAP,
+                    "method": "fulltext_index"
+                }
+        next_cursor = encode_cursor(*last) if has_more and last else None
+        return records, next_cursor, estimate
+    
+    def facets(kind: str) -> Optional[dict]:
+        """Facet count country/continent dari bitmap in-memory (None selama index belum siap)"""
+        index = get_search_index(kind)
+        if index is None:
+            return None
+        return index.facet_counts(query_lower, payload.filter_country, payload.filter_continent)
+    
+    def page_with_fallback(kind: str, limit: int, offset: int, after: Optional[Tuple]):
+        """
+        page() + stage fuzzy: halaman pertama yang kurang dari limit diisi hasil
+        query koreksi typo (dedup). Return (records, next_cursor, estimate, did_you_mean).
+        """
+        records, next_cursor, estimate = page(kind, limit, offset, after)
+        spell_index = get_spell_index(kind)
+        if len(records) >= limit or after is not None or offset or spell_index is None:
+            return records, next_cursor, estimate, None
+        corrected = spell_index.correct(query_lower)
+        if not corrected:
+            return records, next_cursor, estimate, None
+        seen = {record["element_id"] for record in records}
+        fuzzy_records, _, _ = page(kind, limit - len(records), 0, None, query=corrected)
+        records += [record for record in fuzzy_records if record["element_id"] not in seen]
+        return records, next_cursor, estimate, corrected
     
     try:
-        with repo.driver.session(database=repo.db) as session:
-            
-            filter_conditions, base_params = _build_filter_conditions()
-
-            # PERSON SEARCH - Using elementId() instead of id()
-            if payload.search_type in ["person", "all"]:
-
-                person_cypher = f"""
-                MATCH (p:Person)
-                OPTIONAL MATCH (p)-[:HELD_POSITION]->(pos:Position)  
-                OPTIONAL MATCH (p)-[:BORN_IN]->(c:City)-[:LOCATED_IN]->(country:Country)-[:LOCATED_IN]->(continent:Continent)
-                WITH p, pos, country, continent
-                WHERE (
-                    (p.full_name IS NOT NULL AND toLower(p.full_name) CONTAINS $query) OR
-                    (p.description IS NOT NULL AND toLower(p.description) CONTAINS $query) OR
-                    (pos IS NOT NULL AND pos.label IS NOT NULL AND toLower(pos.label) CONTAINS $query) OR
-                    (pos IS NOT NULL AND pos.name IS NOT NULL AND toLower(pos.name) CONTAINS $query)
-                )
-                """
-                
-                # Add filter conditions if any
-                if filter_conditions:
-                    person_cypher += " AND (" + " AND ".join(filter_conditions) + ")"
-                
-                # Aggregate BOTH positions AND countries per person
-                person_cypher += """
-                WITH p, 
-                     collect(DISTINCT coalesce(pos.label, pos.name)) as all_positions,
-                     collect(DISTINCT country.country) as all_countries
-                RETURN 
-                    elementId(p) AS element_id,
-                    p.full_name AS name,
-                    p.description AS description,
-                    p.image_url AS image,
-                    all_positions,
-                    all_countries[0] AS country
-                ORDER BY p.full_name
-                SKIP $offset
-                LIMIT $limit
-                """
-                
-                person_params = base_params.copy()
-                person_params.update({
-                    "limit": payload.limit,
-                    "offset": payload.current_person_count
-                })
-                
-                person_results = session.run(person_cypher, person_params)
-                
-                for record in person_results:
-                    positions = [pos for pos in record["all_positions"] if pos is not None]
-                    
-                    results["persons"]["data"].append({
-                        "type": "person",
-                        "element_id": record["element_id"],
-                        "name": record["name"],
-                        "description": record["description"],
-                        "image": record["image"],
-                        "context": {
-                            "positions": positions,
-                            "country": record["country"]
-                        }
-                    })
-            
-            person_found = len(results["persons"]["data"])
-            results["persons"]["total_found"] = person_found
+        if payload.search_type in ["person", "all"]:
+            (
+                records,
+                results["persons"]["next_cursor"],
+                results["persons"]["estimate"],
+                results["persons"]["did_you_mean"]
+            ) = page_with_fallback("person", payload.limit, payload.current_person_count, person_after)
+            results["persons"]["facets"] = facets("person")
+            for record in records:
+                results["persons"]["data"].append(format_person_row(record))
+        
+        person_found = len(results["persons"]["data"])
+        results["persons"]["total_found"] = person_found
 
-            event_limit = payload.limit - person_found
+        event_limit = payload.limit - person_found
 
-            # EVENT SEARCH - Using elementId() instead of id()
-            if (event_limit > 0) and (payload.search_type in ["event", "all"]):
-                
-                event_cypher = f"""
-                MATCH (e:Event)
-                OPTIONAL MATCH (e)-[:HELD_IN]->(country:Country)-[:LOCATED_IN]->(continent:Continent)
-                WITH e, country, continent
-                WHERE (
-                    (e.name IS NOT NULL AND toLower(e.name) CONTAINS $query) OR
-                    (e.description IS NOT NULL AND toLower(e.description) CONTAINS $query) OR
-                    (e.impact IS NOT NULL AND toLower(e.impact) CONTAINS $query)
-                )
-                """
-                
-                # Add filter conditions if any
-                if filter_conditions:
-                    event_cypher += " AND (" + " AND ".join(filter_conditions) + ")"
-                
-                # Aggregate countries per event
-                event_cypher += """
-                WITH e,
-                     collect(DISTINCT country.country) as all_countries
-                RETURN 
-                    elementId(e) AS element_id,
-                    e.name AS name,
-                    e.description AS description, 
-                    e.image_url AS image,
-                    e.impact AS impact,
-                    all_countries[0] AS country
-                ORDER BY e.name
-                SKIP $offset
-                LIMIT $limit
-                """
-                
-                event_params = base_params.copy()
-                event_params.update({
-                    "limit": event_limit,
-                    "offset": payload.current_event_count
-                })
-                
-                event_results = session.run(event_cypher, event_params)
-                                
-                for record in event_results:
-                    results["events"]["data"].append({
-                        "type": "event", 
-                        "element_id": record["element_id"],
-                        "name": record["name"],
-                        "description": record["description"],
-                        "image": record["image"], 
-                        "context": {
-                            "country": record["country"],
-                            "impact": record["impact"]
-                        }
-                    })
-                
-            event_found = len(results["events"]["data"])
-            results["events"]["total_found"] = event_found
+        if (event_limit > 0) and (payload.search_type in ["event", "all"]):
+            (
+                records,
+                results["events"]["next_cursor"],
+                results["events"]["estimate"],
+                results["events"]["did_you_mean"]
+            ) = page_with_fallback("event", event_limit, payload.current_event_count, event_after)
+            results["events"]["facets"] = facets("event")
+            for record in records:
+                results["events"]["data"].append(format_event_row(record))
             
-            return results
+        event_found = len(results["events"]["data"])
+        results["events"]["total_found"] = event_found
+        
+        return results
             
     except Exception as e:
+        if "search_index" in str(e) or "fulltext_index" in str(e):
+            raise HTTPException(
+                status_code=503,
+                detail="Search index belum dibuat. Jalankan POST /search/setup-indexes dulu!"
+            )
         raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
 
-# Keep other endpoints unchanged
+
+@router.post("/search/setup-indexes")
+def setup_search_indexes():
+    """Buat full-text indexes untuk /search (idempotent, juga dijalankan saat startup)"""
+    try:
+        return {"status": "ok", "indexes": get_search_repo().ensure_search_indexes()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create search indexes: {str(e)}")
+
+
+@router.post("/search/rebuild-memory-index")
+def rebuild_memory_search_index(background_tasks: BackgroundTasks):
+    """Rebuild trigram index in-memory dari Neo4j (streaming, di background)"""
+    background_tasks.add_task(build_all_search_indexes)
+    return {"status": "started", "current": get_search_index_status()}
+
+
+@router.post("/search/materialize")
+def materialize_search_documents(background_tasks: BackgroundTasks, full: bool = False):
+    """
+    Backfill name_key (fold_name) dan tulis field search_* (position, country,
+    continent) di node Person/Event, lalu rebuild index in-memory.
+    full=true materialisasi ulang semua node.
+    """
+    if materialization_progress["running"]:
+        return {"status": "already_running", "progress": dict(materialization_progress)}
+    background_tasks.add_task(bootstrap_search, full)
+    return {"status": "started", "full": full}
+
+
+@router.get("/search/memory-index/status")
+def memory_search_index_status():
+    return get_search_index_status()
+
+
 @router.get("/search/filters")
-def get_available_filters():
+def get_available_filters(request: Request):
     """
-    Get available filter options (countries, continents)
+    Get available filter options (countries, continents).
+    Dari cache versioned; kirim If-None-Match untuk dapat 304 kalau tidak berubah.
     """
-    repo = get_repo()
-    
     try:
-        with repo.driver.session(database=repo.db) as session:
-            
-            # Get countries
-            countries_cypher = """
-            MATCH (c:Country)
-            WHERE c.country IS NOT NULL
-            RETURN DISTINCT c.country AS name
-            ORDER BY name
-            """
-            
-            countries = []
-            for record in session.run(countries_cypher):
-                countries.append(record["name"])
-            
-            # Get continents  
-            continents_cypher = """
-            MATCH (cont:Continent)
-            WHERE cont.continent IS NOT NULL
-            RETURN DISTINCT cont.continent AS name
-            ORDER BY name
-            """
-            
-            continents = []
-            for record in session.run(continents_cypher):
-                continents.append(record["name"])
-            
-            return {
-                "countries": countries,
-                "continents": continents
-            }
-            
+        value, etag = get_filter_options_cache().get()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Filters error: {str(e)}")
+    
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=value, headers=headers)
 
 @router.get("/search/suggestions")
 def get_search_suggestions(q: str = Query(..., min_length=2)):
     """
-    Auto-complete suggestions untuk search
+    Auto-complete suggestions untuk search.
+    Dijawab dari prefix index in-memory (top-5 person + top-5 event by popularity);
+    kalau kurang dari 5 per tipe, sisanya dari alias Wikidata (label multibahasa,
+    field "alias"), lalu dari prefix hasil koreksi typo (did_you_mean).
+    Fallback ke Neo4j selama index belum siap.
     """
+    person_index, event_index = get_prefix_index("person"), get_prefix_index("event")
+    if person_index is not None and event_index is not None:
+        suggestions, did_you_mean = [], None
+        for kind, prefix_index in (("person", person_index), ("event", event_index)):
+            items = prefix_index.suggest(q)
+            alias_index = get_alias_index(kind)
+            if len(items) < prefix_index.top_k and alias_index is not None:
+                seen = {item["element_id"] for item in items}
+                extra = [item for item in alias_index.suggest(q) if item["element_id"] not in seen]
+                items += extra[:prefix_index.top_k - len(items)]
+            spell_index = get_spell_index(kind)
+            if len(items) < prefix_index.top_k and spell_index is not None:
+                corrected = spell_index.correct(q)
+                if corrected:
+                    seen = {item["element_id"] for item in items}
+                    extra = [item for item in prefix_index.suggest(corrected) if item["element_id"] not in seen]
+                    items += extra[:prefix_index.top_k - len(items)]
+                    did_you_mean = did_you_mean or corrected
+            suggestions += items
+        return {"suggestions": suggestions, "did_you_mean": did_you_mean}
+    
     repo = get_repo()
+    search_repo = get_search_repo()
     
     try:
+        # Selama backfill name_key belum selesai, node tanpa name_key dicari dengan
+        # toLower() seperti dulu (sama dengan PersonRepo.find_person_by_full_name)
+        person_fallback = (
+            "OR (p.name_key IS NULL AND toLower(p.full_name) STARTS WITH $raw_query)"
+            if search_repo.name_key_backfill_pending("person") else ""
+        )
+        event_fallback = (
+            "OR (e.name_key IS NULL AND toLower(e.name) STARTS WITH $raw_query)"
+            if search_repo.name_key_backfill_pending("event") else ""
+        )
         with repo.driver.session(database=repo.db) as session:
-            suggestions_cypher = """
+            suggestions_cypher = f"""
             MATCH (p:Person)
-            WHERE p.full_name IS NOT NULL AND toLower(p.full_name) STARTS WITH $query
+            WHERE p.name_key STARTS WITH $query {person_fallback}
             RETURN elementId(p) AS element_id, p.full_name AS suggestion, "person" AS type
             LIMIT 5
             
             UNION
             
             MATCH (e:Event)
-            WHERE e.name IS NOT NULL AND toLower(e.name) STARTS WITH $query
+            WHERE e.name_key STARTS WITH $query {event_fallback}
             RETURN elementId(e) AS element_id, e.name AS suggestion, "event" AS type
             LIMIT 5
             """
             
-            results = session.run(suggestions_cypher, {"query": q.lower().strip()})
+            results = session.run(suggestions_cypher, {"query": fold_name(q), "raw_query": q.lower()})
             
             suggestions = []
             for record in results:
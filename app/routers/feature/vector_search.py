@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Callable, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import os
 import time
 
 from app.db.vector_repo import get_vector_repo, reset_vector_dimension
@@ -12,17 +14,100 @@ from app.services.feature.vector_service import (
     compute_similarity,
     get_embedding_dimension,
     reset_model,
+    get_model_version,
     DEFAULT_MODEL
 )
+from app.services.feature.vector_engines import (
+    search_vectors,
+    find_similar,
+    build_engine_index,
+    get_engines_status,
+    validate_engine,
+    evaluate_recall,
+    more_like_these,
+    invalidate_engine_indexes,
+)
+from app.services.feature.vector_filters import resolve_allowed_ids, build_filter_index, get_filter_index_status
+from app.services.feature.search_cache import get_semantic_cache, normalize_query
+from app.services.feature.context_cards import get_context_cards
+from app.services.feature.hybrid_fusion import fuse, build_fulltext_query, FUSION_METHODS, RRF_K
+from app.services.feature.similarity_graph import refresh_similarity_graph, similarity_graph_progress, DEFAULT_K
+from app.services.feature.embedding_clusters import (
+    build_clusters,
+    clustering_progress,
+    list_clusters,
+    get_cluster_members,
+    invalidate_cluster_catalogs,
+    DEFAULT_CLUSTERS,
+)
 
 router = APIRouter()
 
+# Pool untuk menjalankan retrieval person & event secara paralel (search_type="all")
+RETRIEVAL_WORKERS = int(os.getenv("SEARCH_RETRIEVAL_WORKERS", "8"))
+_retrieval_pool = ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS, thread_name_prefix="vector-retrieval")
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def _timed(fn: Callable):
+    start = time.perf_counter()
+    out = fn()
+    return out, _elapsed_ms(start)
+
+
+def run_retrievals(tasks: Dict[str, Callable]) -> Tuple[dict, dict]:
+    """
+    Jalankan {nama: callable} secara paralel (masing-masing session Neo4j sendiri).
+    Return ({nama: hasil}, {nama: durasi ms}). Satu task langsung dijalankan di thread ini.
+    """
+    if len(tasks) <= 1:
+        results, timings = {}, {}
+        for name, fn in tasks.items():
+            results[name], timings[name] = _timed(fn)
+        return results, timings
+
+    futures = {name: _retrieval_pool.submit(_timed, fn) for name, fn in tasks.items()}
+    results, timings = {}, {}
+    for name, future in futures.items():
+        results[name], timings[name] = future.result()
+    return results, timings
+
 
 class SemanticSearchRequest(BaseModel):
     query: str
     limit: Optional[int] = 20
     min_score: Optional[float] = 0.3
     search_type: Optional[str] = "all"  # "person", "event", "all"
+    engine: Optional[str] = "native"  # "native" (Neo4j vector index), "pq", "binary"
+    filter_country: Optional[List[str]] = None
+    filter_continent: Optional[List[str]] = None
+    birth_year_from: Optional[int] = None  # hanya untuk person
+    birth_year_to: Optional[int] = None
+    debug: Optional[bool] = False  # sertakan timing per stage di response
+
+
+class BatchSemanticSearchRequest(BaseModel):
+    queries: List[str]
+    limit: Optional[int] = 10
+    min_score: Optional[float] = 0.3
+    search_type: Optional[str] = "all"  # "person", "event", "all"
+
+
+# Maksimal query per request batch
+MAX_BATCH_QUERIES = 100
+
+
+class MoreLikeTheseRequest(BaseModel):
+    element_ids: List[str]
+    weights: Optional[List[float]] = None
+    search_type: Optional[str] = "person"  # "person" atau "event"
+    limit: Optional[int] = 10
+    min_score: Optional[float] = 0.5
+    strategy: Optional[str] = "centroid"  # "centroid", "max_sim"
+    engine: Optional[str] = "native"
 
 
 class HybridSearchRequest(BaseModel):
@@ -31,6 +116,48 @@ class HybridSearchRequest(BaseModel):
     keyword_weight: Optional[float] = 0.4
     semantic_weight: Optional[float] = 0.6
     search_type: Optional[str] = "all"
+    fusion: Optional[str] = "rrf"  # "rrf" (reciprocal rank fusion) atau "weighted" (min-max normalized)
+    text_candidates: Optional[int] = 50  # budget kandidat full-text index (0 = matikan)
+    vector_candidates: Optional[int] = 50  # budget kandidat vector index (0 = matikan)
+    rrf_k: Optional[int] = RRF_K
+    debug: Optional[bool] = False
+
+
+# Budget kandidat maksimal per retriever di hybrid search
+MAX_HYBRID_CANDIDATES = 500
+
+
+def format_person_result(p: dict) -> dict:
+    return {
+        "type": "person",
+        "element_id": p["element_id"],
+        "name": p["name"],
+        "description": p["description"],
+        "image": p["image"],
+        "similarity_score": round(p["similarity_score"], 4),
+        "context": {
+            "positions": p.get("positions", []),
+            "country": p.get("country"),
+            "death_date": p.get("death_date")
+        }
+    }
+
+
+def format_event_result(e: dict) -> dict:
+    return {
+        "type": "event",
+        "element_id": e["element_id"],
+        "name": e["name"],
+        "description": e["description"],
+        "image": e["image"],
+        "similarity_score": round(e["similarity_score"], 4),
+        "context": {
+            "country": e.get("country"),
+            "impact": e.get("impact"),
+            "start_date": e.get("start_date"),
+            "end_date": e.get("end_date")
+        }
+    }
 
 
 @router.post("/setup-indexes")
@@ -86,6 +213,23 @@ def clear_all_embeddings():
             """)
             events_cleared = result_event.single()["cleared"]
             
+            # Precomputed SIMILAR_TO sudah tidak valid
+            session.run("""
+                MATCH ()-[r:SIMILAR_TO]->()
+                DELETE r
+            """)
+            session.run("""
+                MATCH (n)
+                WHERE n.similar_updated IS NOT NULL
+                REMOVE n.similar_updated, n.similar_k
+            """)
+            
+            # Cluster embedding juga
+            session.run("""
+                MATCH (c:EmbeddingCluster)
+                DETACH DELETE c
+            """)
+            
             # Also clear failed flags
             session.run("""
                 MATCH (p:Person)
@@ -101,6 +245,9 @@ def clear_all_embeddings():
         # Reset model and dimension cache
         reset_model()
         reset_vector_dimension()
+        invalidate_engine_indexes()
+        get_semantic_cache().invalidate_all()
+        invalidate_cluster_catalogs()
         
         return {
             "status": "ok",
@@ -269,74 +416,123 @@ def semantic_search(payload: SemanticSearchRequest):
     """
     🚀 Semantic search menggunakan NEO4J NATIVE VECTOR INDEX.
     Jauh lebih cepat daripada manual calculation!
+    - engine="pq": compressed in-process index (PQ + exact re-rank), hemat memory
+    - engine="binary": Hamming prefilter di seluruh corpus + cosine re-rank
+    - filter_country / filter_continent / birth_year_*: pre-filter saat candidate scoring
+    - search_type="all": person & event di-retrieve paralel
+    - debug=true: response menyertakan "timings" (ms) per stage
     """
     if len(payload.query.strip()) < 2:
         raise HTTPException(status_code=400, detail="Query minimal 2 karakter")
     
-    repo = get_vector_repo()
+    try:
+        engine = validate_engine(payload.engine)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     query_text = payload.query.strip()
+    started = time.perf_counter()
+    
+    cache = get_semantic_cache()
+    cache_key = cache.make_key(
+        normalize_query(query_text),
+        payload.search_type,
+        payload.limit,
+        payload.min_score,
+        engine,
+        sorted(c.lower() for c in payload.filter_country or []),
+        sorted(c.lower() for c in payload.filter_continent or []),
+        payload.birth_year_from,
+        payload.birth_year_to,
+        get_model_version()
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        cached["query"] = query_text
+        cached["cached"] = True
+        if payload.debug:
+            cached["timings"] = {"total_ms": _elapsed_ms(started)}
+        return cached
     
     # Generate embedding untuk query
-    query_embedding = generate_embedding(query_text)
+    query_embedding, embed_ms = _timed(lambda: generate_embedding(query_text))
     
     if not query_embedding:
         raise HTTPException(status_code=500, detail="Failed to generate query embedding")
     
+    # Node yang muncul di hasil, untuk invalidation per node dari enrichment
+    cached_nodes = []
+    
     results = {
         "query": query_text,
-        "search_type": "semantic_native_vector",
+        "search_type": "semantic_native_vector" if engine == "native" else f"semantic_{engine}",
         "persons": [],
-        "events": []
+        "events": [],
+        "retrieval": {}
     }
     
+    def search_persons():
+        stats = {}
+        allowed_ids = resolve_allowed_ids(
+            "person",
+            payload.filter_country,
+            payload.filter_continent,
+            payload.birth_year_from,
+            payload.birth_year_to
+        )
+        hits = search_vectors(
+            "person",
+            query_embedding,
+            limit=payload.limit,
+            min_score=payload.min_score,
+            engine=engine,
+            stats=stats,
+            allowed_ids=allowed_ids
+        )
+        return hits, stats
+    
+    def search_events():
+        stats = {}
+        hits = search_vectors(
+            "event",
+            query_embedding,
+            limit=payload.limit,
+            min_score=payload.min_score,
+            engine=engine,
+            stats=stats,
+            allowed_ids=resolve_allowed_ids("event", payload.filter_country, payload.filter_continent)
+        )
+        return hits, stats
+    
+    tasks = {}
+    if payload.search_type in ["person", "all"]:
+        tasks["persons"] = search_persons
+    if payload.search_type in ["event", "all"]:
+        tasks["events"] = search_events
+    
     try:
-        # Search Persons using NATIVE VECTOR INDEX
-        if payload.search_type in ["person", "all"]:
-            persons = repo.vector_search_persons(
-                query_embedding=query_embedding,
-                limit=payload.limit,
-                min_score=payload.min_score
-            )
-            
+        # Person & event search jalan paralel
+        retrieved, retrieval_ms = run_retrievals(tasks)
+        
+        if "persons" in retrieved:
+            persons, results["retrieval"]["persons"] = retrieved["persons"]
             for p in persons:
-                results["persons"].append({
-                    "type": "person",
-                    "element_id": p["element_id"],
-                    "name": p["name"],
-                    "description": p["description"],
-                    "image": p["image"],
-                    "similarity_score": round(p["similarity_score"], 4),
-                    "context": {
-                        "positions": p.get("positions", []),
-                        "country": p.get("country"),
-                        "death_date": p.get("death_date")
-                    }
-                })
+                cached_nodes.append(("person", p.get("article_id")))
+                results["persons"].append(format_person_result(p))
         
-        # Search Events using NATIVE VECTOR INDEX
-        if payload.search_type in ["event", "all"]:
-            events = repo.vector_search_events(
-                query_embedding=query_embedding,
-                limit=payload.limit,
-                min_score=payload.min_score
-            )
-            
+        if "events" in retrieved:
+            events, results["retrieval"]["events"] = retrieved["events"]
             for e in events:
-                results["events"].append({
-                    "type": "event",
-                    "element_id": e["element_id"],
-                    "name": e["name"],
-                    "description": e["description"],
-                    "image": e["image"],
-                    "similarity_score": round(e["similarity_score"], 4),
-                    "context": {
-                        "country": e.get("country"),
-                        "impact": e.get("impact"),
-                        "start_date": e.get("start_date"),
-                        "end_date": e.get("end_date")
-                    }
-                })
+                cached_nodes.append(("event", e.get("event_id")))
+                results["events"].append(format_event_result(e))
         
+        cache.put(cache_key, results, cached_nodes)
+        if payload.debug:
+            results["timings"] = {
+                "embed_ms": embed_ms,
+                **{f"{name}_ms": ms for name, ms in retrieval_ms.items()},
+                "total_ms": _elapsed_ms(started)
+            }
         return results
         
     except Exception as e:
@@ -349,172 +545,388 @@ def semantic_search(payload: SemanticSearchRequest):
         raise HTTPException(status_code=500, detail=f"Search error: {error_msg}")
 
 
+@router.post("/semantic-search/batch")
+def batch_semantic_search(payload: BatchSemanticSearchRequest):
+    """
+    Semantic search untuk banyak query sekaligus.
+    Semua query di-embed dalam satu encode, index lookup dalam satu UNWIND query.
+    """
+    queries = [q.strip() for q in payload.queries]
+    if not queries:
+        raise HTTPException(status_code=400, detail="queries tidak boleh kosong")
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=400, detail=f"Maksimal {MAX_BATCH_QUERIES} query per batch")
+    if any(len(q) < 2 for q in queries):
+        raise HTTPException(status_code=400, detail="Query minimal 2 karakter")
+    
+    embeddings = generate_embeddings_batch(queries, show_progress_bar=False)
+    if any(not emb for emb in embeddings):
+        raise HTTPException(status_code=500, detail="Failed to generate query embeddings")
+    
+    repo = get_vector_repo()
+    per_query_persons = [[] for _ in queries]
+    per_query_events = [[] for _ in queries]
+    
+    try:
+        if payload.search_type in ["person", "all"]:
+            per_query_persons = repo.batch_vector_search("person", embeddings, payload.limit, payload.min_score)
+        if payload.search_type in ["event", "all"]:
+            per_query_events = repo.batch_vector_search("event", embeddings, payload.limit, payload.min_score)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch search error: {str(e)}")
+    
+    return {
+        "search_type": "semantic_native_vector_batch",
+        "count": len(queries),
+        "results": [
+            {
+                "query": query,
+                "persons": [format_person_result(p) for p in per_query_persons[i]],
+                "events": [format_event_result(e) for e in per_query_events[i]]
+            }
+            for i, query in enumerate(queries)
+        ]
+    }
+
+
 @router.post("/hybrid-search")
 def hybrid_search(payload: HybridSearchRequest):
     """
-    Hybrid search: Neo4j Native Vector + Keyword Boosting.
-    Best of both worlds!
+    Hybrid search: Neo4j Full-text Index + Native Vector Index.
+    Kandidat diambil independen dari dua retriever (satu query per tipe),
+    lalu digabung dengan RRF atau weighted score normalization.
+    - keyword_weight / semantic_weight: bobot retriever full-text / vector
+    - text_candidates / vector_candidates: budget kandidat per retriever
+    Person & event di-retrieve paralel; debug=true menyertakan "timings" (ms).
     """
     if len(payload.query.strip()) < 2:
         raise HTTPException(status_code=400, detail="Query minimal 2 karakter")
+    if payload.fusion not in FUSION_METHODS:
+        raise HTTPException(status_code=400, detail=f"fusion harus salah satu dari: {', '.join(FUSION_METHODS)}")
+    
+    text_k = max(0, min(payload.text_candidates, MAX_HYBRID_CANDIDATES))
+    vector_k = max(0, min(payload.vector_candidates, MAX_HYBRID_CANDIDATES))
+    if text_k == 0 and vector_k == 0:
+        raise HTTPException(status_code=400, detail="Minimal satu retriever harus punya budget kandidat > 0")
     
     repo = get_vector_repo()
     query_text = payload.query.strip()
-    query_lower = query_text.lower()
+    fulltext_query = build_fulltext_query(query_text)
+    started = time.perf_counter()
     
-    query_embedding = generate_embedding(query_text)
-    
-    if not query_embedding:
-        raise HTTPException(status_code=500, detail="Failed to generate query embedding")
+    if vector_k > 0:
+        query_embedding, embed_ms = _timed(lambda: generate_embedding(query_text))
+        if not query_embedding:
+            raise HTTPException(status_code=500, detail="Failed to generate query embedding")
+    else:
+        query_embedding, embed_ms = None, 0.0
     
     results = {
         "query": query_text,
         "search_type": "hybrid",
+        "fusion": payload.fusion,
         "weights": {"keyword": payload.keyword_weight, "semantic": payload.semantic_weight},
         "persons": [],
-        "events": []
+        "events": [],
+        "retrieval": {}
     }
     
+    def retrieve(kind: str):
+        def run():
+            candidates = repo.hybrid_candidates(kind, fulltext_query, query_embedding, text_k, vector_k)
+            fused = fuse(
+                candidates["text"],
+                candidates["vector"],
+                method=payload.fusion,
+                text_weight=payload.keyword_weight,
+                vector_weight=payload.semantic_weight,
+                rrf_k=payload.rrf_k
+            )[:payload.limit]
+            hydrate = repo.hydrate_persons if kind == "person" else repo.hydrate_events
+            rows = hydrate(fused)
+            stats = {
+                "text_candidates": len(candidates["text"]),
+                "vector_candidates": len(candidates["vector"]),
+                "overlap": len(
+                    {h["element_id"] for h in candidates["text"]} & {h["element_id"] for h in candidates["vector"]}
+                ),
+                "returned": len(rows)
+            }
+            return rows, {f["element_id"]: f for f in fused}, stats
+        return run
+    
+    def scores(fused: dict) -> dict:
+        return {
+            "keyword": round(fused["text_score"], 4) if fused["text_score"] is not None else None,
+            "semantic": round(fused["vector_score"], 4) if fused["vector_score"] is not None else None,
+            "hybrid": round(fused["score"], 6),
+            "keyword_rank": fused["text_rank"],
+            "semantic_rank": fused["vector_rank"]
+        }
+    
+    tasks = {}
+    if payload.search_type in ["person", "all"]:
+        tasks["persons"] = retrieve("person")
+    if payload.search_type in ["event", "all"]:
+        tasks["events"] = retrieve("event")
+    
     try:
-        # Get semantic results from Native Vector Index
-        if payload.search_type in ["person", "all"]:
-            persons = repo.vector_search_persons(
-                query_embedding=query_embedding,
-                limit=payload.limit * 2,  # Get more for re-ranking
-                min_score=0.2  # Lower threshold, will filter after
-            )
-            
-            # Re-rank with keyword boost
-            scored_persons = []
+        # Person & event paralel, masing-masing satu query full-text + vector
+        retrieved, retrieval_ms = run_retrievals(tasks)
+        
+        if "persons" in retrieved:
+            persons, fused, results["retrieval"]["persons"] = retrieved["persons"]
             for p in persons:
-                name = p["name"] or ""
-                name_lower = name.lower()
-                desc_lower = (p["description"] or "").lower()
-                
-                # Keyword score
-                keyword_score = 0.0
-                if name_lower == query_lower:
-                    keyword_score = 1.0
-                elif query_lower in name_lower:
-                    keyword_score = 0.8
-                elif any(word in name_lower for word in query_lower.split() if len(word) > 2):
-                    keyword_score = 0.5
-                elif query_lower in desc_lower:
-                    keyword_score = 0.3
-                
-                # Hybrid score
-                semantic_score = p["similarity_score"]
-                hybrid_score = (
-                    payload.keyword_weight * keyword_score +
-                    payload.semantic_weight * semantic_score
-                )
-                
-                scored_persons.append({
-                    **p,
-                    "keyword_score": keyword_score,
-                    "semantic_score": semantic_score,
-                    "hybrid_score": hybrid_score
-                })
-            
-            # Sort by hybrid score and take top N
-            scored_persons.sort(key=lambda x: x["hybrid_score"], reverse=True)
-            
-            for p in scored_persons[:payload.limit]:
                 results["persons"].append({
                     "type": "person",
                     "element_id": p["element_id"],
                     "name": p["name"],
                     "description": p["description"],
                     "image": p["image"],
-                    "scores": {
-                        "keyword": round(p["keyword_score"], 4),
-                        "semantic": round(p["semantic_score"], 4),
-                        "hybrid": round(p["hybrid_score"], 4)
-                    },
+                    "scores": scores(fused[p["element_id"]]),
                     "context": {
                         "positions": p.get("positions", []),
                         "country": p.get("country")
                     }
                 })
         
-        # Events hybrid search
-        if payload.search_type in ["event", "all"]:
-            events = repo.vector_search_events(
-                query_embedding=query_embedding,
-                limit=payload.limit * 2,
-                min_score=0.2
-            )
-            
-            scored_events = []
+        if "events" in retrieved:
+            events, fused, results["retrieval"]["events"] = retrieved["events"]
             for e in events:
-                name = e["name"] or ""
-                name_lower = name.lower()
-                desc_lower = (e["description"] or "").lower()
-                
-                keyword_score = 0.0
-                if name_lower == query_lower:
-                    keyword_score = 1.0
-                elif query_lower in name_lower:
-                    keyword_score = 0.8
-                elif any(word in name_lower for word in query_lower.split() if len(word) > 2):
-                    keyword_score = 0.5
-                elif query_lower in desc_lower:
-                    keyword_score = 0.3
-                
-                semantic_score = e["similarity_score"]
-                hybrid_score = (
-                    payload.keyword_weight * keyword_score +
-                    payload.semantic_weight * semantic_score
-                )
-                
-                scored_events.append({
-                    **e,
-                    "keyword_score": keyword_score,
-                    "semantic_score": semantic_score,
-                    "hybrid_score": hybrid_score
-                })
-            
-            scored_events.sort(key=lambda x: x["hybrid_score"], reverse=True)
-            
-            for e in scored_events[:payload.limit]:
                 results["events"].append({
                     "type": "event",
                     "element_id": e["element_id"],
                     "name": e["name"],
                     "description": e["description"],
                     "image": e["image"],
-                    "scores": {
-                        "keyword": round(e["keyword_score"], 4),
-                        "semantic": round(e["semantic_score"], 4),
-                        "hybrid": round(e["hybrid_score"], 4)
-                    },
+                    "scores": scores(fused[e["element_id"]]),
                     "context": {
                         "country": e.get("country"),
                         "impact": e.get("impact")
                     }
                 })
         
+        if payload.debug:
+            results["timings"] = {
+                "embed_ms": embed_ms,
+                **{f"{name}_ms": ms for name, ms in retrieval_ms.items()},
+                "total_ms": _elapsed_ms(started)
+            }
         return results
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Hybrid search error: {str(e)}")
+        error_msg = str(e)
+        if "fulltext_index" in error_msg or "embedding_index" in error_msg:
+            raise HTTPException(
+                status_code=400,
+                detail="Full-text / vector index belum dibuat. Jalankan POST /vector/setup-indexes dulu!"
+            )
+        raise HTTPException(status_code=500, detail=f"Hybrid search error: {error_msg}")
 
 
 @router.get("/similar/person/{element_id}")
-def find_similar_persons(element_id: str, limit: int = 10, min_score: float = 0.5):
-    """Find similar persons using Native Vector Index"""
+def find_similar_persons(element_id: str, limit: int = 10, min_score: float = 0.5, engine: str = "native"):
+    """Find similar persons (default: Native Vector Index)"""
     try:
-        repo = get_vector_repo()
-        return repo.find_similar_persons(element_id, limit, min_score)
+        engine = validate_engine(engine)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return find_similar("person", element_id, limit, min_score, engine)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/similar/event/{element_id}")
-def find_similar_events(element_id: str, limit: int = 10, min_score: float = 0.5):
-    """Find similar events using Native Vector Index"""
+def find_similar_events(element_id: str, limit: int = 10, min_score: float = 0.5, engine: str = "native"):
+    """Find similar events (default: Native Vector Index)"""
     try:
-        repo = get_vector_repo()
-        return repo.find_similar_events(element_id, limit, min_score)
+        engine = validate_engine(engine)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return find_similar("event", element_id, limit, min_score, engine)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/similar/more-like-these")
+def find_more_like_these(payload: MoreLikeTheseRequest):
+    """
+    "People like the ones you've viewed": satu ranked list dari beberapa seed,
+    dihitung server-side (seed tidak ikut di hasil).
+    """
+    if not payload.element_ids:
+        raise HTTPException(status_code=400, detail="element_ids tidak boleh kosong")
+    if payload.search_type not in ["person", "event"]:
+        raise HTTPException(status_code=400, detail="search_type harus 'person' atau 'event'")
+    try:
+        engine = validate_engine(payload.engine)
+        if payload.strategy == "max_sim" and engine != "native":
+            raise ValueError("Strategy max_sim hanya untuk engine native")
+        result = more_like_these(
+            payload.search_type,
+            payload.element_ids,
+            weights=payload.weights,
+            limit=payload.limit,
+            min_score=payload.min_score,
+            strategy=payload.strategy,
+            engine=engine
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    formatter = format_person_result if payload.search_type == "person" else format_event_result
+    result["similar"] = [formatter(r) for r in result["similar"]]
+    return result
+
+
+@router.post("/similarity-graph/refresh")
+def start_similarity_graph_refresh(
+    background_tasks: BackgroundTasks,
+    search_type: str = "person",
+    k: int = DEFAULT_K,
+    batch_size: int = 200,
+    full: bool = False
+):
+    """
+    Background job: materialize top-k neighbor sebagai relasi SIMILAR_TO.
+    Default incremental (hanya node yang embedding-nya berubah), full=True untuk hitung ulang semua.
+    """
+    if similarity_graph_progress["running"]:
+        return {"status": "already_running", "progress": similarity_graph_progress}
+    if search_type not in ["person", "event"]:
+        raise HTTPException(status_code=400, detail="search_type harus 'person' atau 'event'")
+    
+    background_tasks.add_task(refresh_similarity_graph, search_type, k, batch_size, full)
+    return {
+        "status": "started",
+        "message": "Similarity graph refresh started. Check /vector/similarity-graph/progress for status.",
+        "settings": {"search_type": search_type, "k": k, "batch_size": batch_size, "full": full}
+    }
+
+
+@router.get("/similarity-graph/progress")
+def get_similarity_graph_progress():
+    """Progress job SIMILAR_TO"""
+    return similarity_graph_progress
+
+
+@router.post("/clusters/build")
+def start_cluster_build(
+    background_tasks: BackgroundTasks,
+    search_type: str = "person",
+    k: int = DEFAULT_CLUSTERS,
+    batch_size: int = 1024,
+    iterations: int = 100
+):
+    """
+    Background job: mini-batch k-means di atas embedding, hasil disimpan sebagai
+    (:EmbeddingCluster) + IN_CLUSTER. Jalankan ulang setelah banyak embedding berubah.
+    """
+    if clustering_progress["running"]:
+        return {"status": "already_running", "progress": clustering_progress}
+    if search_type not in ["person", "event"]:
+        raise HTTPException(status_code=400, detail="search_type harus 'person' atau 'event'")
+    if k < 2:
+        raise HTTPException(status_code=400, detail="k minimal 2")
+    
+    background_tasks.add_task(build_clusters, search_type, k, batch_size, iterations)
+    return {
+        "status": "started",
+        "message": "Clustering started. Check /vector/clusters/progress for status.",
+        "settings": {"search_type": search_type, "k": k, "batch_size": batch_size, "iterations": iterations}
+    }
+
+
+@router.get("/clusters/progress")
+def get_clustering_progress():
+    """Progress job clustering"""
+    return clustering_progress
+
+
+@router.get("/clusters")
+def get_clusters(search_type: str = "person"):
+    """Daftar cluster (ukuran + preview nama) dari hasil clustering terakhir"""
+    try:
+        clusters = list_clusters(search_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"search_type": search_type, "count": len(clusters), "clusters": clusters}
+
+
+@router.get("/clusters/{search_type}/{cluster_id}")
+def get_cluster(search_type: str, cluster_id: int, limit: int = Query(20, ge=1, le=200), offset: int = Query(0, ge=0)):
+    """Member satu cluster, urut kedekatan ke centroid"""
+    try:
+        result = get_cluster_members(search_type, cluster_id, limit, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Cluster tidak ditemukan")
+    
+    formatter = format_person_result if search_type == "person" else format_event_result
+    return {**result, "members": [formatter(m) for m in result["members"]]}
+
+
+@router.get("/engines")
+def get_search_engines():
+    """List search engines dan status index in-process yang sudah di-build"""
+    return get_engines_status()
+
+
+@router.post("/engines/{engine}/build")
+def build_search_engine(engine: str, search_type: str = "all"):
+    """
+    (Re)build index in-process untuk engine tertentu dari embeddings di Neo4j.
+    Jalankan ulang setelah generate embeddings supaya node baru ikut ter-index.
+    """
+    kinds = ["person", "event"] if search_type == "all" else [search_type]
+    try:
+        return {"status": "ok", "built": [build_engine_index(engine, kind) for kind in kinds]}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to build {engine} index: {str(e)}")
+
+
+@router.get("/engines/{engine}/recall")
+def check_engine_recall(engine: str, search_type: str = "person", n_queries: int = 50, k: int = 10):
+    """Recall@k engine in-process dibanding exact search (brute force)"""
+    try:
+        return evaluate_recall(engine, search_type, n_queries=n_queries, k=k)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Recall check error: {str(e)}")
+
+
+@router.post("/filters/rebuild")
+def rebuild_vector_filters():
+    """Rebuild attribute filter index (country, continent, birth year) untuk filtered search"""
+    try:
+        return {"status": "ok", "built": [build_filter_index(kind).stats() for kind in ("person", "event")]}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to build filter index: {str(e)}")
+
+
+@router.get("/filters/status")
+def vector_filters_status():
+    """Status attribute filter index"""
+    return get_filter_index_status()
+
+
+@router.get("/cache/stats")
+def semantic_cache_stats():
+    """Hit ratio dan memory footprint semantic search cache + context-card cache"""
+    return {**get_semantic_cache().stats(), "context_cards": get_context_cards().stats()}
+
+
+@router.post("/cache/clear")
+def clear_semantic_cache():
+    """Kosongkan semantic search cache dan context-card cache secara manual"""
+    get_semantic_cache().invalidate_all()
+    get_context_cards().invalidate_all()
+    return {"status": "ok", "stats": semantic_cache_stats()}
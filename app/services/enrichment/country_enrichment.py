@@ -1,5 +1,10 @@
 from app.services.enrichment.sparql_service import get_all_countries_continents
 from app.db.neo4j_repo import get_repo
+from app.services.feature.vector_filters import invalidate_filter_indexes
+from app.services.feature.search_cache import get_semantic_cache
+from app.services.feature.filter_options import invalidate_filter_options
+from app.services.feature.search_index import bootstrap_search
+import threading
 
 def fix_country_continent_relationships():
     """Fix duplicate country-continent relationships using Wikidata"""
@@ -67,6 +72,17 @@ def fix_country_continent_relationships():
                     "status": "not_found_in_wikidata"
                 })
     
+    # Continent mapping berubah -> filter index vector search & /search/filters harus di-rebuild
+    invalidate_filter_indexes()
+    get_semantic_cache().invalidate_all()
+    invalidate_filter_options()
+    # Field search_continents ikut berubah -> materialisasi ulang semua + rebuild index /search
+    # (name_key tidak tergantung geo, jadi tidak di-fold ulang)
+    threading.Thread(
+        target=bootstrap_search, kwargs={"full": True, "refold_names": False},
+        name="search-rematerialize", daemon=True
+    ).start()
+    
     return results
 
 def check_duplicate_country_continents():
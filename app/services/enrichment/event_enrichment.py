@@ -9,19 +9,13 @@ repo = get_event_repo()
 
 # event enrichment
 def enrich_event_by_name(name):
-    # Step A: find event in internal Neo4j
-    events = repo.get_all_events(limit=10000)
-    match = None
-
-    for e in events:
-        internal_name = e.get("name")
-        if internal_name and internal_name.lower() == name.lower():
-            match = e
-            break
+    # Step A: find event in internal Neo4j (lookup name_key, bukan scan semua event)
+    match = repo.find_event_by_name(name)
 
     if not match:
         return {"status": "not_found", "name": name}
 
+    internal_name = match.get("name")
     event_id = match.get("event_id")
 
     # Tambahkan validasi
@@ -44,6 +38,7 @@ def enrich_event_by_name(name):
         qid=qid,
         description=basic.get("description") if basic else None,
         image=basic.get("image") if basic else None,
+        aliases=basic.get("aliases") if basic else None,
     )
 
     return {"status": "ok", "name": name, "qid": qid}
@@ -73,6 +68,7 @@ def enrich_all_events():
             qid=qid,
             description=basic.get("description") if basic else None,
             image=basic.get("image") if basic else None,
+            aliases=basic.get("aliases") if basic else None,
         )
         results.append({"event_id": event_id, "name": name, "qid": qid, "status": "ok"})
     return results
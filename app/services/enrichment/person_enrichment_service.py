@@ -50,6 +50,7 @@ def preview_person_enrichment(name):
         "wikidata_url": f"https://www.wikidata.org/wiki/{qid}",
         "description": basic.get('description') if basic else None,
         "image": basic.get('image') if basic else None,
+        "aliases": basic.get('aliases') if basic else [],
         "positions": positions,
         "dynasties": dynasties,
         "cause_of_death": cod.get('cause'),
@@ -124,6 +125,7 @@ def enrich_person_by_name(name):
         alliances=alliances,
         ranks=ranks,
         orders=orders,
-        crimes=crimes
+        crimes=crimes,
+        aliases=basic.get('aliases') if basic else None
     )
     return {"status":"ok","name":name,"qid":qid}
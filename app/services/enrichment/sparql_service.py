@@ -2,6 +2,8 @@ import requests
 from urllib.parse import urlencode
 import time
 import random
+import re
+from app.services.feature.text_folding import fold_name
 
 WIKIDATA_ENDPOINT = "https://query.wikidata.org/sparql"
 HEADERS = {
@@ -9,6 +11,50 @@ HEADERS = {
     "Accept": "application/sparql-results+json"
 }
 
+# Label (semua bahasa) + alias Wikidata, digabung jadi satu kolom per entity.
+# Tiap entry = "<lang>:<alias>"; separator di dalam label diganti spasi di SPARQL
+# supaya split di parse_aliases tidak pernah memotong alias.
+ALIAS_SEPARATOR = "|"
+ALIAS_LANG_SEPARATOR = ":"
+MAX_ALIASES = 32
+# Urutan bahasa saat alias dipotong ke MAX_ALIASES; bahasa lain menyusul urut kode bahasa
+ALIAS_LANGUAGE_PRIORITY = ("en", "id", "fr", "de", "es", "it", "pt", "nl", "ru", "zh", "ja", "ko", "ar")
+# REPLACE() SPARQL pakai regex, dan backslash perlu di-escape lagi di string literal
+_SEPARATOR_PATTERN = re.escape(ALIAS_SEPARATOR).replace("\\", "\\\\")
+ALIASES_CLAUSE = '''
+      OPTIONAL {
+        SELECT (GROUP_CONCAT(DISTINCT ?entry; separator="''' + ALIAS_SEPARATOR + '''") AS ?aliases) WHERE {
+          { wd:%s rdfs:label ?alias } UNION { wd:%s skos:altLabel ?alias }
+          BIND(CONCAT(LANG(?alias), "''' + ALIAS_LANG_SEPARATOR + '''", REPLACE(STR(?alias), "''' + _SEPARATOR_PATTERN + '''", " ")) AS ?entry)
+        }
+      }
+'''
+
+def _language_rank(lang):
+    try:
+        return (ALIAS_LANGUAGE_PRIORITY.index(lang), "")
+    except ValueError:
+        return (len(ALIAS_LANGUAGE_PRIORITY), lang)
+
+def parse_aliases(value):
+    """
+    Split hasil GROUP_CONCAT (urutannya tidak dijamin), dedup berdasarkan fold_name
+    (varian aksen/case sama; yang dipertahankan varian dari bahasa prioritas tertinggi),
+    lalu urut ALIAS_LANGUAGE_PRIORITY dan dipotong ke MAX_ALIASES. Hasilnya
+    deterministik untuk entity yang sama.
+    """
+    best = {}
+    for entry in (value or "").split(ALIAS_SEPARATOR):
+        lang, _, alias = entry.partition(ALIAS_LANG_SEPARATOR)
+        alias = alias.strip()
+        key = fold_name(alias)
+        if not key:
+            continue
+        candidate = (_language_rank(lang), key, alias)
+        if key not in best or candidate < best[key]:
+            best[key] = candidate
+    return [alias for _, _, alias in sorted(best.values())[:MAX_ALIASES]]
+
 def run_sparql(endpoint, query, timeout=30, retries=5, backoff=2.0):
     """Run SPARQL query with exponential backoff and jitter"""
     params = {"query": query}
@@ -50,12 +96,13 @@ def find_qid_by_label(name, limit=5):
 
 def get_person_basic_by_qid(qid):
     q = '''
-    SELECT ?description ?image WHERE {
+    SELECT ?description ?image ?aliases WHERE {
       BIND(wd:%s AS ?person)
       OPTIONAL { ?person schema:description ?description FILTER(LANG(?description)='en') }
       OPTIONAL { ?person wdt:P18 ?image. }
+      %s
     }
-    ''' % qid
+    ''' % (qid, ALIASES_CLAUSE % (qid, qid))
     data = run_sparql(WIKIDATA_ENDPOINT, q)
     rows = data.get('results', {}).get('bindings', [])
     if not rows:
@@ -64,7 +111,8 @@ def get_person_basic_by_qid(qid):
     return {
         "qid": qid,
         "description": row.get("description", {}).get("value"),
-        "image": row.get("image", {}).get("value")
+        "image": row.get("image", {}).get("value"),
+        "aliases": parse_aliases(row.get("aliases", {}).get("value"))
     }
 
 def get_person_positions(qid):
@@ -158,12 +206,13 @@ def get_event_qid_by_name(name, limit=1):
 
 def get_event_basic_by_qid(qid):
     q = '''
-    SELECT ?description ?image WHERE {
+    SELECT ?description ?image ?aliases WHERE {
       BIND(wd:%s AS ?event)
       OPTIONAL { ?event schema:description ?description FILTER(LANG(?description)='en') }
       OPTIONAL { ?event wdt:P18 ?image. }
+      %s
     }
-    ''' % qid
+    ''' % (qid, ALIASES_CLAUSE % (qid, qid))
     data = run_sparql(WIKIDATA_ENDPOINT, q)
     rows = data.get('results', {}).get('bindings', [])
     if not rows:
@@ -173,7 +222,8 @@ def get_event_basic_by_qid(qid):
     return {
         "qid": qid,
         "description": row.get("description", {}).get("value"),
-        "image": row.get("image", {}).get("value")
+        "image": row.get("image", {}).get("value"),
+        "aliases": parse_aliases(row.get("aliases", {}).get("value"))
     }
 def get_person_death_info(qid):
     """Get death date and place (P570, P20)"""
@@ -0,0 +1,106 @@
+"""
+Context-card cache untuk hydrate hasil vector search.
+
+Satu card per node (key: element_id) berisi data display + konteks yang mahal
+di-expand tiap query: positions[..5], birth country, death place (Person) dan
+event country (Event). Vector query cukup return {element_id, score}, sisanya
+diambil dari sini; yang belum ada di-fetch sekali lalu disimpan.
+
+Invalidation dari enrichment write path lewat invalidate_nodes(("person", article_id))
+/ (("event", event_id)), ditambah TTL sebagai jaring pengaman.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+CONTEXT_CARD_TTL = int(os.getenv("CONTEXT_CARD_TTL", "3600"))
+CONTEXT_CARD_MAX_ENTRIES = int(os.getenv("CONTEXT_CARD_MAX_ENTRIES", "50000"))
+
+# Property yang jadi business key per tipe (dipakai write path untuk invalidation)
+BUSINESS_KEYS = {"person": "article_id", "event": "event_id"}
+
+
+class ContextCardCache:
+    def __init__(self, ttl: int = CONTEXT_CARD_TTL, max_entries: int = CONTEXT_CARD_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cards: "OrderedDict[str, dict]" = OrderedDict()
+        self._by_business_key: Dict[Tuple[str, object], str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _drop(self, element_id: str):
+        entry = self._cards.pop(element_id, None)
+        if entry is not None:
+            self._by_business_key.pop(entry["business_key"], None)
+
+    def get_many(self, element_ids: Iterable[str]) -> Tuple[Dict[str, dict], List[str]]:
+        """Return (cards yang ada, element_id yang belum ada / expired)"""
+        found, missing = {}, []
+        now = time.time()
+        with self._lock:
+            for element_id in element_ids:
+                entry = self._cards.get(element_id)
+                if entry is None or entry["expires_at"] < now:
+                    if entry is not None:
+                        self._drop(element_id)
+                    missing.append(element_id)
+                    continue
+                self._cards.move_to_end(element_id)
+                found[element_id] = entry["card"]
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def put_many(self, kind: str, cards: Iterable[dict]):
+        key_prop = BUSINESS_KEYS[kind]
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            for card in cards:
+                element_id = card["element_id"]
+                business_key = (kind, card.get(key_prop))
+                self._drop(element_id)
+                self._cards[element_id] = {"card": card, "expires_at": expires_at, "business_key": business_key}
+                if business_key[1] is not None:
+                    self._by_business_key[business_key] = element_id
+            while len(self._cards) > self.max_entries:
+                self._drop(next(iter(self._cards)))
+
+    def invalidate_nodes(self, nodes: Iterable[Tuple[str, object]]):
+        """nodes: ("person", article_id) / ("event", event_id)"""
+        with self._lock:
+            for node in nodes:
+                element_id = self._by_business_key.get(node)
+                if element_id is not None:
+                    self._drop(element_id)
+
+    def invalidate_all(self):
+        with self._lock:
+            self._cards.clear()
+            self._by_business_key.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._cards),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Singleton instance
+_context_cards = None
+
+
+def get_context_cards() -> ContextCardCache:
+    global _context_cards
+    if _context_cards is None:
+        _context_cards = ContextCardCache()
+    return _context_cards
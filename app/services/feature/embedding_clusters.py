@@ -0,0 +1,168 @@
+"""
+Offline clustering embedding Person / Event untuk "browse by theme".
+
+Job: mini-batch k-means (spherical) di atas semua embedding yang tersimpan,
+hasilnya di-persist sebagai (:EmbeddingCluster) + relasi IN_CLUSTER {score}.
+Listing cluster & member dilayani dari lookup in-memory (dict per cluster_id,
+member sudah urut score), di-load sekali dari Neo4j setelah build / saat
+pertama dipakai.
+
+Catatan: membership tidak di-update per write; embedding baru / berubah baru
+masuk cluster setelah job dijalankan ulang.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.db.vector_repo import get_vector_repo, EMBEDDING_LABELS
+from app.services.feature.quantization import normalize_rows, minibatch_kmeans, assign_clusters
+from app.services.feature.vector_engines import load_embedding_matrix
+
+DEFAULT_CLUSTERS = 50
+# Jumlah member terdekat ke centroid yang namanya disimpan sebagai preview
+SAMPLE_NAMES = 5
+
+clustering_progress = {
+    "running": False,
+    "type": None,
+    "k": DEFAULT_CLUSTERS,
+    "stage": None,
+    "vectors": 0,
+    "started_at": None,
+    "finished_at": None,
+    "last_error": None
+}
+
+
+class ClusterCatalog:
+    """Lookup in-memory: cluster_id -> info / member list, element_id -> cluster_id"""
+
+    def __init__(self, kind: str, clusters: List[dict], memberships):
+        self.kind = kind
+        self.clusters: Dict[int, dict] = {c["cluster_id"]: c for c in clusters}
+        self.members: Dict[int, List[Tuple[str, float]]] = {cid: [] for cid in self.clusters}
+        self.cluster_of: Dict[str, int] = {}
+        for element_id, cluster_id, score in memberships:
+            self.members.setdefault(cluster_id, []).append((element_id, score))
+            self.cluster_of[element_id] = cluster_id
+        for members in self.members.values():
+            members.sort(key=lambda m: m[1], reverse=True)
+        self.loaded_at = time.time()
+
+    def list(self) -> List[dict]:
+        return [self.clusters[cid] for cid in sorted(self.clusters)]
+
+    def page(self, cluster_id: int, limit: int, offset: int) -> Optional[List[Tuple[str, float]]]:
+        members = self.members.get(cluster_id)
+        if members is None:
+            return None
+        return members[offset:offset + limit]
+
+
+_catalogs: Dict[str, ClusterCatalog] = {}
+_lock = threading.Lock()
+
+
+def load_cluster_catalog(kind: str) -> ClusterCatalog:
+    repo = get_vector_repo()
+    with _lock:
+        catalog = ClusterCatalog(kind, repo.get_clusters(kind), repo.iter_cluster_memberships(kind))
+        _catalogs[kind] = catalog
+        return catalog
+
+
+def get_cluster_catalog(kind: str) -> ClusterCatalog:
+    if kind not in EMBEDDING_LABELS:
+        raise ValueError(f"Tipe '{kind}' tidak dikenal (pilihan: {list(EMBEDDING_LABELS)})")
+    catalog = _catalogs.get(kind)
+    if catalog is None:
+        catalog = load_cluster_catalog(kind)
+    return catalog
+
+
+def invalidate_cluster_catalogs():
+    _catalogs.clear()
+
+
+def build_clusters(kind: str, k: int = DEFAULT_CLUSTERS, batch_size: int = 1024, iterations: int = 100) -> dict:
+    """Jalankan mini-batch k-means, persist cluster + membership, reload lookup"""
+    if kind not in EMBEDDING_LABELS:
+        raise ValueError(f"Tipe '{kind}' tidak dikenal (pilihan: {list(EMBEDDING_LABELS)})")
+
+    repo = get_vector_repo()
+    clustering_progress.update({
+        "running": True,
+        "type": kind,
+        "k": k,
+        "stage": "loading",
+        "vectors": 0,
+        "started_at": time.time(),
+        "finished_at": None,
+        "last_error": None
+    })
+
+    try:
+        element_ids, vectors = load_embedding_matrix(kind)
+        if not element_ids:
+            raise ValueError(f"Belum ada embedding untuk {kind}. Generate embeddings dulu!")
+        vectors = normalize_rows(vectors)
+        clustering_progress.update({"stage": "clustering", "vectors": len(element_ids)})
+
+        centroids = minibatch_kmeans(vectors, k, batch_size=batch_size, iterations=iterations)
+        assignments, scores = assign_clusters(vectors, centroids)
+        del vectors
+
+        # Preview: nama member paling dekat ke centroid
+        clusters = []
+        for cluster_id in range(len(centroids)):
+            positions = np.flatnonzero(assignments == cluster_id)
+            nearest = positions[np.argsort(-scores[positions])][:SAMPLE_NAMES]
+            hits = [{"element_id": element_ids[p], "score": float(scores[p])} for p in nearest]
+            hydrate = repo.hydrate_persons if kind == "person" else repo.hydrate_events
+            clusters.append({
+                "cluster_id": cluster_id,
+                "size": int(len(positions)),
+                "centroid": centroids[cluster_id].tolist(),
+                "sample_names": [row["name"] for row in hydrate(hits) if row.get("name")]
+            })
+
+        clustering_progress["stage"] = "persisting"
+        memberships = [
+            {"element_id": element_id, "cluster_id": int(assignments[i]), "score": float(scores[i])}
+            for i, element_id in enumerate(element_ids)
+        ]
+        repo.replace_clusters(kind, clusters, memberships)
+        load_cluster_catalog(kind)
+        clustering_progress["stage"] = "done"
+        print(f"✅ Built {len(clusters)} clusters for {kind} ({len(element_ids)} vectors)")
+    except Exception as e:
+        clustering_progress["last_error"] = str(e)
+        print(f"❌ Clustering error: {e}")
+    finally:
+        clustering_progress["running"] = False
+        clustering_progress["finished_at"] = time.time()
+
+    return dict(clustering_progress)
+
+
+def list_clusters(kind: str) -> List[dict]:
+    return get_cluster_catalog(kind).list()
+
+
+def get_cluster_members(kind: str, cluster_id: int, limit: int = 20, offset: int = 0) -> Optional[dict]:
+    """Member cluster urut kedekatan ke centroid, di-hydrate dari context-card cache"""
+    catalog = get_cluster_catalog(kind)
+    page = catalog.page(cluster_id, limit, offset)
+    if page is None:
+        return None
+    repo = get_vector_repo()
+    hits = [{"element_id": element_id, "score": score} for element_id, score in page]
+    hydrate = repo.hydrate_persons if kind == "person" else repo.hydrate_events
+    return {
+        "cluster": catalog.clusters[cluster_id],
+        "total": len(catalog.members[cluster_id]),
+        "offset": offset,
+        "members": hydrate(hits)
+    }
@@ -0,0 +1,127 @@
+"""
+Facet engine in-memory untuk filter /search (country, continent).
+
+Per nilai facet disimpan bitmap doc id (Python int sebagai bitset, bit ke-d
+= doc id d dari TrigramIndex). Filter = OR bitmap nilai yang dipilih, lalu
+AND antar facet; facet count = popcount(match & bitmap nilai).
+Python int di-AND / popcount di C per word 64-bit, jadi count semua country
+untuk satu query cukup beberapa ratus operasi bigint.
+
+Set bit satu per satu di bigint = copy seluruh bitmap, jadi add() cuma
+mencatat doc id ke buffer; buffer di-merge (bitmap_from_ids) sekali saat
+bitmap dibaca berikutnya. Buffer & bitmap dijaga lock sendiri, karena
+_flush() (mutasi) juga jalan dari method baca seperti stats().
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+FACET_FIELDS = ("country", "continent")
+
+
+def bitmap_from_ids(ids: Iterable[int]) -> int:
+    """Set doc id -> bitmap (lewat bytearray, bukan OR 1 << d per id)"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray((max(ids) >> 3) + 1)
+    for d in ids:
+        buffer[d >> 3] |= 1 << (d & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def ids_from_bitmap(bitmap: int) -> Set[int]:
+    ids = set()
+    if not bitmap:
+        return ids
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) >> 3, "little")
+    for i, byte in enumerate(data):
+        if not byte:
+            continue
+        base = i << 3
+        for bit in range(8):
+            if byte & (1 << bit):
+                ids.add(base + bit)
+    return ids
+
+
+def intersect_ids(ids: Iterable[int], bitmap: int) -> Set[int]:
+    """
+    Doc id di ids yang bit-nya set di bitmap. AND dengan bitmap kandidat, jadi
+    yang di-expand cuma hasil irisan, bukan seluruh bitmap filter.
+    """
+    return ids_from_bitmap(bitmap & bitmap_from_ids(ids))
+
+
+class FacetBitmaps:
+    def __init__(self, fields: Iterable[str] = FACET_FIELDS):
+        self.bitmaps: Dict[str, Dict[str, int]] = {field: {} for field in fields}
+        self.pending: Dict[str, Dict[str, List[int]]] = {field: {} for field in fields}
+        self.lock = threading.RLock()
+
+    def add(self, doc_id: int, field: str, values: Iterable[str]):
+        with self.lock:
+            pending = self.pending[field]
+            for value in values:
+                pending.setdefault(value, []).append(doc_id)
+
+    def _flush(self):
+        """Caller wajib pegang self.lock"""
+        for field, pending in self.pending.items():
+            if not pending:
+                continue
+            mapping = self.bitmaps[field]
+            for value, ids in pending.items():
+                mapping[value] = mapping.get(value, 0) | bitmap_from_ids(ids)
+            pending.clear()
+
+    def remove(self, doc_id: int, field: str, values: Iterable[str]):
+        with self.lock:
+            self._flush()
+            mask = ~(1 << doc_id)
+            mapping = self.bitmaps[field]
+            for value in values:
+                bitmap = mapping.get(value, 0) & mask
+                if bitmap:
+                    mapping[value] = bitmap
+                else:
+                    mapping.pop(value, None)
+
+    def select(self, field: str, values: Optional[List[str]]) -> Optional[int]:
+        """OR bitmap nilai yang dipilih (lowercase); None kalau facet tidak difilter"""
+        if not values:
+            return None
+        with self.lock:
+            self._flush()
+            mapping = self.bitmaps[field]
+            bitmap = 0
+            for value in values:
+                bitmap |= mapping.get(value.lower(), 0)
+            return bitmap
+
+    def filter(self, selections: Dict[str, Optional[List[str]]]) -> Optional[int]:
+        """AND antar facet yang difilter; None kalau tidak ada filter sama sekali"""
+        result = None
+        for field, values in selections.items():
+            bitmap = self.select(field, values)
+            if bitmap is not None:
+                result = bitmap if result is None else result & bitmap
+        return result
+
+    def counts(self, field: str, match: int) -> Dict[str, int]:
+        """Jumlah match per nilai facet (nilai dengan count 0 tidak ikut)"""
+        with self.lock:
+            self._flush()
+            counts = {}
+            for value, bitmap in self.bitmaps[field].items():
+                count = (bitmap & match).bit_count()
+                if count:
+                    counts[value] = count
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    def stats(self) -> dict:
+        with self.lock:
+            self._flush()
+            return {
+                field: {"values": len(mapping), "bytes": sum((b.bit_length() + 7) >> 3 for b in mapping.values())}
+                for field, mapping in self.bitmaps.items()
+            }
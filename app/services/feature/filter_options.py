@@ -0,0 +1,106 @@
+"""
+Cache versioned untuk /search/filters (daftar country & continent).
+
+- Isi di-load sekali, diberi version + ETag (hash isi) -> client bisa pakai
+  If-None-Match dan dapat 304.
+- Invalidation eksplisit dari write path (fix_country_continent_relationships),
+  plus change check murah tiap FILTER_CHECK_INTERVAL detik: jumlah Country &
+  Continent dibandingkan dengan saat load. FILTER_MAX_AGE jadi batas atas
+  (misalnya untuk rename yang tidak mengubah jumlah).
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+from app.db.search_repo import get_search_repo
+
+FILTER_CHECK_INTERVAL = int(os.getenv("FILTER_CHECK_INTERVAL", "60"))
+FILTER_MAX_AGE = int(os.getenv("FILTER_MAX_AGE", "3600"))
+
+# entity-tag (RFC 9110 8.8.3): opsional prefix weak "W/" + opaque-tag dalam kutip
+_ENTITY_TAG = re.compile(r'(?:W/)?"([^"]*)"')
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """
+    Evaluasi If-None-Match (RFC 9110 13.1.2): "*" cocok dengan representasi apa pun,
+    selain itu list entity-tag dipisah koma dibandingkan secara weak (prefix W/
+    diabaikan di kedua sisi).
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = _ENTITY_TAG.fullmatch(etag.strip())
+    if current is None:
+        return False
+    return current.group(1) in _ENTITY_TAG.findall(if_none_match)
+
+
+class FilterOptionsCache:
+    def __init__(self):
+        self.value: Optional[dict] = None
+        self.etag: Optional[str] = None
+        self.digest: Optional[str] = None   # hash konten (ETag = digest dalam kutip)
+        self.version = 0
+        self.fingerprint = None
+        self.loaded_at = 0.0
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        repo = get_search_repo()
+        fingerprint = repo.get_filter_fingerprint()
+        value = repo.get_filter_options()
+        digest = hashlib.sha1(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        if digest != self.digest:
+            self.version += 1
+        self.value = value
+        self.digest = digest
+        self.etag = f'"{digest}"'
+        self.fingerprint = fingerprint
+        self.loaded_at = self.checked_at = time.time()
+
+    def get(self):
+        """Return (value, etag). Reload kalau invalidated / berubah / kedaluwarsa."""
+        with self._lock:
+            now = time.time()
+            if self.value is None or now - self.loaded_at > FILTER_MAX_AGE:
+                self._load()
+            elif now - self.checked_at > FILTER_CHECK_INTERVAL:
+                self.checked_at = now
+                if get_search_repo().get_filter_fingerprint() != self.fingerprint:
+                    self._load()
+            return self.value, self.etag
+
+    def invalidate(self):
+        with self._lock:
+            self.value = None
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "etag": self.etag,
+            "loaded_at": self.loaded_at,
+            "checked_at": self.checked_at,
+            "fingerprint": self.fingerprint,
+        }
+
+
+# Singleton instance
+_filter_options = None
+
+
+def get_filter_options_cache() -> FilterOptionsCache:
+    global _filter_options
+    if _filter_options is None:
+        _filter_options = FilterOptionsCache()
+    return _filter_options
+
+
+def invalidate_filter_options():
+    get_filter_options_cache().invalidate()
@@ -0,0 +1,175 @@
+"""
+Typo-tolerant matching untuk /search dan /search/suggestions (SymSpell,
+symmetric delete).
+
+Tiap token nama (person / event) disimpan bersama semua variasi "delete"-nya
+sampai MAX_EDIT_DISTANCE karakter. Saat lookup, query juga di-delete dengan
+cara yang sama; kandidat = kata yang punya delete yang sama, lalu di-verify
+dengan edit distance (Damerau-Levenshtein, OSA) yang dibatasi. Tidak ada
+scan kamus, jadi lookup cuma beberapa dict lookup per token.
+
+Delete cuma di-generate dari PREFIX_LENGTH karakter pertama (trik SymSpell)
+supaya jumlah entry tidak meledak untuk token panjang.
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.services.feature.text_folding import fold_name
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+# Token lebih pendek dari ini tidak di-koreksi (terlalu banyak kandidat)
+MIN_TOKEN_LENGTH = 3
+
+
+def tokenize(text: str) -> List[str]:
+    return fold_name(text).split()
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """Semua string hasil menghapus 1..max_distance karakter dari word"""
+    results: Set[str] = set()
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for item in frontier:
+            if len(item) <= 1:
+                continue
+            for i in range(len(item)):
+                deleted = item[:i] + item[i + 1:]
+                if deleted not in results:
+                    results.add(deleted)
+                    next_frontier.add(deleted)
+        frontier = next_frontier
+    return results
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (insert/delete/substitute/transpose).
+    Berhenti lebih awal kalau sudah pasti > max_distance; return max_distance + 1.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous: Optional[List[int]] = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (
+                previous_previous is not None and j > 1
+                and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]
+            ):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+
+class SymSpellIndex:
+    """Kamus token -> frekuensi (jumlah nama yang mengandung token) + delete index"""
+
+    def __init__(self, kind: str, max_distance: int = MAX_EDIT_DISTANCE, prefix_length: int = PREFIX_LENGTH):
+        self.kind = kind
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.words: Dict[str, int] = {}
+        self.deletes: Dict[str, List[str]] = {}
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.words)
+
+    def add_word(self, word: str):
+        with self.lock:
+            if word in self.words:
+                self.words[word] += 1
+                return
+            self.words[word] = 1
+            prefix = word[:self.prefix_length]
+            for deleted in _deletes(prefix, self.max_distance) | {prefix}:
+                self.deletes.setdefault(deleted, []).append(word)
+
+    def add_text(self, text: Optional[str]):
+        for token in tokenize(text or ""):
+            if len(token) >= MIN_TOKEN_LENGTH:
+                self.add_word(token)
+
+    def remove_word(self, word: str):
+        """Kurangi frekuensi; kata yang frekuensinya 0 dibuang dari kamus + delete index"""
+        with self.lock:
+            count = self.words.get(word)
+            if count is None:
+                return
+            if count > 1:
+                self.words[word] = count - 1
+                return
+            del self.words[word]
+            prefix = word[:self.prefix_length]
+            for deleted in _deletes(prefix, self.max_distance) | {prefix}:
+                words = self.deletes.get(deleted)
+                if words is None:
+                    continue
+                if word in words:
+                    words.remove(word)
+                if not words:
+                    del self.deletes[deleted]
+
+    def remove_text(self, text: Optional[str]):
+        """Kebalikan add_text (nama lama saat node di-rename / dihapus)"""
+        for token in tokenize(text or ""):
+            if len(token) >= MIN_TOKEN_LENGTH:
+                self.remove_word(token)
+
+    def lookup(self, term: str, max_distance: Optional[int] = None, limit: int = 5) -> List[Tuple[str, int, int]]:
+        """
+        Koreksi untuk satu token: [(word, distance, frequency)] urut distance
+        lalu frekuensi. Term yang ada di kamus return dirinya sendiri (distance 0).
+        """
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        term = fold_name(term)
+        with self.lock:
+            if term in self.words:
+                return [(term, 0, self.words[term])]
+            prefix = term[:self.prefix_length]
+            found: Dict[str, int] = {}
+            for candidate in _deletes(prefix, max_distance) | {prefix}:
+                for word in self.deletes.get(candidate, ()):
+                    if word in found:
+                        continue
+                    distance = edit_distance(term, word, max_distance)
+                    if distance <= max_distance:
+                        found[word] = distance
+            ranked = sorted(found.items(), key=lambda item: (item[1], -self.words[item[0]]))
+            return [(word, distance, self.words[word]) for word, distance in ranked[:limit]]
+
+    def correct(self, text: str) -> Optional[str]:
+        """
+        Koreksi per token (token pendek / angka dibiarkan). Return query hasil
+        koreksi, atau None kalau tidak ada token yang berubah.
+        """
+        corrected, changed = [], False
+        for token in tokenize(text):
+            if len(token) < MIN_TOKEN_LENGTH or token.isdigit():
+                corrected.append(token)
+                continue
+            suggestions = self.lookup(token, limit=1)
+            if suggestions and suggestions[0][0] != token:
+                corrected.append(suggestions[0][0])
+                changed = True
+            else:
+                corrected.append(token)
+        return " ".join(corrected) if changed else None
+
+    def bulk_load(self, texts: Iterable[Optional[str]]):
+        for text in texts:
+            self.add_text(text)
+
+    def stats(self) -> dict:
+        return {"type": self.kind, "words": len(self.words), "deletes": len(self.deletes)}
@@ -0,0 +1,91 @@
+"""
+Fusion untuk hybrid search: gabungkan ranked list dari full-text index
+dan vector index jadi satu ranking.
+
+- rrf:      Reciprocal Rank Fusion, score = sum(w / (k + rank)). Tidak peduli
+            skala score tiap retriever, cuma posisi.
+- weighted: score tiap retriever di-normalisasi min-max ke [0, 1], lalu
+            dijumlah dengan bobot. Node yang tidak muncul di satu retriever dapat 0.
+"""
+import re
+from typing import Dict, List
+
+FUSION_METHODS = ("rrf", "weighted")
+RRF_K = 60
+
+# Karakter spesial Lucene query syntax
+_LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+
+
+def escape_lucene(text: str) -> str:
+    return _LUCENE_SPECIAL.sub(r"\\\1", text)
+
+
+def build_fulltext_query(query_text: str) -> str:
+    """
+    Phrase match (di-boost) OR per term, supaya exact name match ada di atas
+    tapi match sebagian tetap ikut jadi kandidat.
+    """
+    terms = [escape_lucene(t) for t in query_text.split() if t.strip()]
+    if not terms:
+        return ""
+    if len(terms) == 1:
+        return terms[0]
+    phrase = escape_lucene(" ".join(query_text.split()))
+    return f'"{phrase}"^3 OR ' + " OR ".join(terms)
+
+
+def _min_max(hits: List[dict]) -> Dict[str, float]:
+    if not hits:
+        return {}
+    scores = [h["score"] for h in hits]
+    low, high = min(scores), max(scores)
+    if high == low:
+        return {h["element_id"]: 1.0 for h in hits}
+    return {h["element_id"]: (h["score"] - low) / (high - low) for h in hits}
+
+
+def fuse(
+    text_hits: List[dict],
+    vector_hits: List[dict],
+    method: str = "rrf",
+    text_weight: float = 0.4,
+    vector_weight: float = 0.6,
+    rrf_k: int = RRF_K,
+) -> List[dict]:
+    """
+    text_hits / vector_hits: [{element_id, score}] urut score desc.
+    Return [{element_id, score, text_score, vector_score, text_rank, vector_rank}]
+    urut fused score desc. Rank 1-based, None kalau tidak muncul di retriever itu.
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Fusion '{method}' tidak dikenal. Pilihan: {', '.join(FUSION_METHODS)}")
+
+    fused: Dict[str, dict] = {}
+
+    def entry(element_id: str) -> dict:
+        if element_id not in fused:
+            fused[element_id] = {
+                "element_id": element_id,
+                "score": 0.0,
+                "text_score": None,
+                "vector_score": None,
+                "text_rank": None,
+                "vector_rank": None,
+            }
+        return fused[element_id]
+
+    for source, hits, weight in (("text", text_hits, text_weight), ("vector", vector_hits, vector_weight)):
+        normalized = _min_max(hits) if method == "weighted" else None
+        for rank, hit in enumerate(hits, start=1):
+            item = entry(hit["element_id"])
+            if item[f"{source}_rank"] is not None:
+                continue
+            item[f"{source}_rank"] = rank
+            item[f"{source}_score"] = hit["score"]
+            if method == "rrf":
+                item["score"] += weight / (rrf_k + rank)
+            else:
+                item["score"] += weight * normalized[hit["element_id"]]
+
+    return sorted(fused.values(), key=lambda x: x["score"], reverse=True)
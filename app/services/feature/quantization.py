@@ -0,0 +1,223 @@
+import numpy as np
+from typing import Optional
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize tiap baris supaya inner product == cosine similarity"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def kmeans(data: np.ndarray, k: int, iterations: int = 20, seed: int = 0) -> np.ndarray:
+    """
+    Plain Lloyd k-means (numpy only).
+    Return centroids dengan shape (k, dim). Kalau data < k, k diturunkan.
+    """
+    data = np.asarray(data, dtype=np.float32)
+    n = data.shape[0]
+    k = min(k, n)
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(n, size=k, replace=False)].copy()
+
+    for _ in range(iterations):
+        # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2  (||x||^2 konstan per baris, skip)
+        distances = -2.0 * data @ centroids.T + (centroids ** 2).sum(axis=1)
+        assignments = distances.argmin(axis=1)
+
+        counts = np.bincount(assignments, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, data)
+
+        empty = counts == 0
+        counts[empty] = 1
+        new_centroids = sums / counts[:, None]
+        # Cluster kosong di-reseed dari titik random
+        if empty.any():
+            new_centroids[empty] = data[rng.choice(n, size=int(empty.sum()), replace=False)]
+
+        if np.allclose(new_centroids, centroids, atol=1e-6):
+            centroids = new_centroids
+            break
+        centroids = new_centroids
+
+    return centroids.astype(np.float32)
+
+
+def minibatch_kmeans(
+    data: np.ndarray,
+    k: int,
+    batch_size: int = 1024,
+    iterations: int = 100,
+    seed: int = 0,
+    spherical: bool = True,
+) -> np.ndarray:
+    """
+    Mini-batch k-means (Sculley 2010): tiap iterasi cuma pakai `batch_size` titik
+    random, centroid di-update dengan learning rate 1/count per centroid.
+    spherical=True: centroid di-normalize tiap update (cocok untuk cosine embedding).
+    Return centroids (k, dim).
+    """
+    data = np.asarray(data, dtype=np.float32)
+    n = data.shape[0]
+    k = min(k, n)
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(n, size=k, replace=False)].copy()
+    counts = np.zeros(k, dtype=np.int64)
+
+    for _ in range(iterations):
+        batch = data[rng.choice(n, size=min(batch_size, n), replace=False)]
+        distances = -2.0 * batch @ centroids.T + (centroids ** 2).sum(axis=1)
+        assignments = distances.argmin(axis=1)
+
+        for c in np.unique(assignments):
+            members = batch[assignments == c]
+            counts[c] += len(members)
+            rate = len(members) / counts[c]
+            centroids[c] = (1.0 - rate) * centroids[c] + rate * members.mean(axis=0)
+
+        if spherical:
+            centroids = normalize_rows(centroids)
+
+    return centroids.astype(np.float32)
+
+
+def assign_clusters(data: np.ndarray, centroids: np.ndarray, batch_size: int = 8192):
+    """Nearest centroid (inner product) per baris. Return (assignments, scores)"""
+    data = np.asarray(data, dtype=np.float32)
+    assignments = np.empty(data.shape[0], dtype=np.int64)
+    scores = np.empty(data.shape[0], dtype=np.float32)
+    for start in range(0, data.shape[0], batch_size):
+        sims = data[start:start + batch_size] @ centroids.T
+        best = sims.argmax(axis=1)
+        assignments[start:start + batch_size] = best
+        scores[start:start + batch_size] = sims[np.arange(len(best)), best]
+    return assignments, scores
+
+
+class ProductQuantizer:
+    """
+    Product Quantization (PQ) codec.
+
+    Vector dipecah jadi `m` sub-vector, tiap sub-space punya codebook 256 centroid,
+    jadi satu vector di-encode jadi `m` byte (uint8). Search pakai asymmetric
+    distance computation (ADC): query tetap float, cuma database yang di-compress.
+    """
+
+    def __init__(self, m: int = 48, ks: int = 256, iterations: int = 20, seed: int = 0):
+        if ks > 256:
+            raise ValueError("ks maksimal 256 (codes disimpan sebagai uint8)")
+        self.m = m
+        self.ks = ks
+        self.iterations = iterations
+        self.seed = seed
+        self.dim: Optional[int] = None
+        self.sub_dim: Optional[int] = None
+        self.codebooks: Optional[np.ndarray] = None  # (m, ks, sub_dim)
+
+    def _pad(self, matrix: np.ndarray) -> np.ndarray:
+        """Zero-pad dimensi supaya habis dibagi m (tidak mengubah inner product)"""
+        padded_dim = self.m * self.sub_dim
+        if matrix.shape[-1] == padded_dim:
+            return matrix
+        pad = [(0, 0)] * (matrix.ndim - 1) + [(0, padded_dim - matrix.shape[-1])]
+        return np.pad(matrix, pad)
+
+    def _split(self, matrix: np.ndarray) -> np.ndarray:
+        """(n, dim) -> (n, m, sub_dim)"""
+        return self._pad(matrix).reshape(matrix.shape[0], self.m, self.sub_dim)
+
+    def train(self, vectors: np.ndarray, sample_size: int = 20000) -> "ProductQuantizer":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.dim = vectors.shape[1]
+        self.sub_dim = -(-self.dim // self.m)  # ceil division
+
+        if vectors.shape[0] > sample_size:
+            rng = np.random.default_rng(self.seed)
+            vectors = vectors[rng.choice(vectors.shape[0], size=sample_size, replace=False)]
+
+        subs = self._split(vectors)
+        ks = min(self.ks, vectors.shape[0])
+        codebooks = np.zeros((self.m, ks, self.sub_dim), dtype=np.float32)
+        for j in range(self.m):
+            codebooks[j] = kmeans(subs[:, j, :], ks, self.iterations, self.seed + j)
+        self.codebooks = codebooks
+        return self
+
+    def encode(self, vectors: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+        """Encode vectors ke codes uint8 dengan shape (n, m)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        codes = np.empty((vectors.shape[0], self.m), dtype=np.uint8)
+        norms = (self.codebooks ** 2).sum(axis=2)  # (m, ks)
+
+        for start in range(0, vectors.shape[0], batch_size):
+            subs = self._split(vectors[start:start + batch_size])
+            for j in range(self.m):
+                distances = -2.0 * subs[:, j, :] @ self.codebooks[j].T + norms[j]
+                codes[start:start + batch_size, j] = distances.argmin(axis=1)
+        return codes
+
+    def distance_tables(self, query: np.ndarray) -> np.ndarray:
+        """Inner-product lookup table per sub-space, shape (m, ks)"""
+        subs = self._pad(np.asarray(query, dtype=np.float32)[None, :]).reshape(self.m, self.sub_dim)
+        return np.einsum("md,mkd->mk", subs, self.codebooks)
+
+    def asymmetric_scores(self, tables: np.ndarray, codes: np.ndarray, batch_size: int = 65536) -> np.ndarray:
+        """Approximate inner product query vs semua codes (ADC)"""
+        scores = np.empty(codes.shape[0], dtype=np.float32)
+        rows = np.arange(self.m)
+        for start in range(0, codes.shape[0], batch_size):
+            chunk = codes[start:start + batch_size]
+            scores[start:start + batch_size] = tables[rows, chunk].sum(axis=1)
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if self.codebooks is None else int(self.codebooks.nbytes)
+
+
+# Lookup table popcount per byte (fallback kalau numpy < 2.0 belum punya bitwise_count)
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount_bytes(packed: np.ndarray) -> np.ndarray:
+    """Jumlah bit 1 per baris untuk array uint8 (n, n_bytes)"""
+    if hasattr(np, "bitwise_count"):
+        counts = np.bitwise_count(packed)
+    else:
+        counts = _POPCOUNT_TABLE[packed]
+    return counts.sum(axis=-1, dtype=np.int32)
+
+
+class BinaryQuantizer:
+    """
+    Sign binarization: tiap dimensi -> 1 bit (1 kalau > 0), di-pack jadi uint8.
+    768 dim -> 96 byte per vector. Similarity kasar = Hamming distance (popcount XOR).
+    """
+
+    def __init__(self):
+        self.dim: Optional[int] = None
+
+    def fit(self, vectors: np.ndarray) -> "BinaryQuantizer":
+        """Set dimensi dari data build; encode setelahnya menolak dimensi lain"""
+        self.dim = np.asarray(vectors).shape[-1]
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if self.dim is None:
+            raise ValueError("BinaryQuantizer belum di-fit")
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Dimensi vector {vectors.shape[1]} tidak sama dengan dimensi index {self.dim}")
+        return np.packbits(vectors > 0, axis=1)
+
+    def hamming_distances(self, query_code: np.ndarray, codes: np.ndarray, batch_size: int = 65536) -> np.ndarray:
+        """Hamming distance satu query code (n_bytes,) ke semua codes (n, n_bytes)"""
+        distances = np.empty(codes.shape[0], dtype=np.int32)
+        for start in range(0, codes.shape[0], batch_size):
+            chunk = codes[start:start + batch_size]
+            distances[start:start + batch_size] = popcount_bytes(np.bitwise_xor(chunk, query_code))
+        return distances
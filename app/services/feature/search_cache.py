@@ -0,0 +1,125 @@
+"""
+Response-level cache untuk /vector/semantic-search.
+
+- Key: query yang dinormalisasi + parameter search + versi model embedding
+- TTL + LRU (max entries)
+- Invalidation:
+  * invalidate_all()   -> embedding berubah (store_*_embedding, clear_all_embeddings),
+                          karena vector baru bisa mengubah ranking query mana pun
+  * invalidate_nodes() -> enrichment upsert, cuma entry yang memuat node tsb yang dibuang
+"""
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "300"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+
+# ("person", article_id) / ("event", event_id)
+NodeKey = Tuple[str, object]
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.casefold().split())
+
+
+class SearchResultCache:
+    def __init__(self, ttl: int = SEMANTIC_CACHE_TTL, max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._node_index: Dict[NodeKey, Set[tuple]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.bytes = 0
+
+    def make_key(self, *parts) -> tuple:
+        return tuple(json.dumps(p, sort_keys=True, default=str) if isinstance(p, (list, dict)) else p for p in parts)
+
+    def _drop(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= entry["size"]
+        for node in entry["nodes"]:
+            keys = self._node_index.get(node)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._node_index[node]
+
+    def get(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["expires_at"] < time.time():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry["value"])
+
+    def put(self, key: tuple, value: dict, nodes: Iterable[NodeKey] = ()):
+        nodes = {n for n in nodes if n[1] is not None}
+        size = len(json.dumps(value, default=str))
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = {
+                "value": copy.deepcopy(value),
+                "expires_at": time.time() + self.ttl,
+                "size": size,
+                "nodes": nodes,
+            }
+            self.bytes += size
+            for node in nodes:
+                self._node_index.setdefault(node, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_all(self):
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._node_index.clear()
+            self.bytes = 0
+
+    def invalidate_nodes(self, nodes: Iterable[NodeKey]):
+        with self._lock:
+            for node in nodes:
+                for key in list(self._node_index.get(node, ())):
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "approx_memory_bytes": self.bytes,  # ukuran JSON dari response yang di-cache
+                "tracked_nodes": len(self._node_index),
+            }
+
+
+# Singleton instance
+_semantic_cache = None
+
+
+def get_semantic_cache() -> SearchResultCache:
+    global _semantic_cache
+    if _semantic_cache is None:
+        _semantic_cache = SearchResultCache()
+    return _semantic_cache
@@ -0,0 +1,33 @@
+"""
+Cursor keyset pagination untuk /search.
+
+Token opaque = base64url JSON {k: sort key, id: elementId} baris terakhir
+halaman sebelumnya. Token yang rusak, atau dari mode sort lain, ditolak 400.
+"""
+import base64
+import json
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+
+def encode_cursor(sort_key, element_id: str) -> str:
+    """Opaque token: base64url JSON dari sort key + elementId baris terakhir"""
+    raw = json.dumps({"k": sort_key, "id": element_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: Optional[str], sort: str = "name") -> Optional[Tuple]:
+    """Cursor harus dari mode sort yang sama (nama: string, popularity: angka)"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        key, element_id = data["k"], data["id"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+    expected = (int, float) if sort == "popularity" else str
+    if not isinstance(key, expected) or isinstance(key, bool):
+        raise HTTPException(status_code=400, detail="Cursor tidak valid untuk mode sort ini")
+    return key, element_id
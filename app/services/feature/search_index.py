@@ -0,0 +1,641 @@
+"""
+In-memory trigram inverted index untuk /search (semantics "contains anywhere").
+
+- Tiap node dapat doc id integer (dense, per tipe). Teks yang di-match (nama,
+  deskripsi, position label/name atau impact, alias Wikidata) di-fold (fold_name: aksen, case,
+  tanda baca) dan digabung dengan separator supaya match tidak menyeberang field.
+- Filter & facet country/continent: bitmap doc id per nilai (facets.FacetBitmaps).
+- Posting list: trigram -> set doc id. Query >= 3 karakter: intersect posting
+  list semua trigram query (mulai dari yang terkecil), lalu verify substring
+  di teks kandidat. Query 2 karakter: verify langsung ke semua dokumen.
+  Halaman = top-k terbatas (heap offset + limit + 1) atas kandidat yang lolos
+  verify; total match di-estimasi dari sampel kandidat (estimate_total).
+- Index di-build dari streaming export Neo4j saat startup (background thread)
+  dan di-update incremental dari write path (refresh_search_nodes). Export
+  membaca field search_* yang sudah di-denormalisasi di node (position,
+  country, continent), jadi tidak ada expansion relasi per dokumen.
+  Selama belum siap, /search pakai full-text index Neo4j.
+
+Dari stream yang sama juga di-build PrefixIndex untuk /search/suggestions:
+array nama (folded) yang terurut + bisect untuk range prefix, top-k per prefix
+berdasarkan historical_popularity_index. Token nama juga masuk SymSpellIndex
+(fuzzy_match) untuk koreksi typo saat hasil exact kurang dari limit.
+AliasIndex: label/alias Wikidata multibahasa (property `aliases`) -> node,
+untuk suggestion nama non-Inggris / ejaan alternatif.
+"""
+import heapq
+import math
+import random
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.services.feature.facets import FacetBitmaps, bitmap_from_ids, ids_from_bitmap, intersect_ids
+from app.services.feature.fuzzy_match import SymSpellIndex
+from app.services.feature.text_folding import fold_name
+
+SEARCH_KINDS = ("person", "event")
+FIELD_SEPARATOR = "\x00"
+# Top-k prefix sepanjang <= ini di-precompute (range-nya paling lebar)
+PRECOMPUTED_PREFIX_LENGTH = 3
+SUGGESTION_TOP_K = 5
+# Jumlah kandidat yang di-verify untuk estimasi total match
+ESTIMATE_SAMPLE_SIZE = 400
+# Facet count di-verify exact kalau kandidat <= ini; di atasnya (atau query tanpa trigram)
+# di-verify sampel random FACET_SAMPLE_SIZE kandidat lalu di-scale (approximate)
+FACET_VERIFY_LIMIT = 50000
+FACET_SAMPLE_SIZE = 5000
+# Urutan hasil /search: nama (A-Z) atau historical_popularity_index (tertinggi dulu)
+SORT_MODES = ("name", "popularity")
+
+
+def _default_repo():
+    # Import di sini: struktur index in-memory bisa dipakai (dan di-test) tanpa driver Neo4j;
+    # fungsi yang butuh database menerima `repo` (default SearchRepo)
+    from app.db.search_repo import get_search_repo
+    return get_search_repo()
+
+
+def fold(text: str) -> str:
+    """Folding yang sama dengan name_key (aksen, case, tanda baca)"""
+    return fold_name(text)
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.element_ids: List[Optional[str]] = []   # doc id -> element_id (None = dihapus)
+        self.texts: List[Optional[str]] = []
+        self.sort_keys: List[Optional[str]] = []
+        self.popularity: List[float] = []
+        self.doc_of: Dict[str, int] = {}             # element_id -> doc id
+        self.free_ids: List[int] = []                # doc id yang sudah di-remove, dipakai ulang
+        self.postings: Dict[str, Set[int]] = {}
+        self.facets = FacetBitmaps()
+        self.doc_facets: List[Optional[dict]] = []    # doc id -> {"country": [...], "continent": [...]}
+        self.lock = threading.RLock()
+        self.built_at = 0.0
+
+    def __len__(self):
+        return len(self.doc_of)
+
+    def _remove(self, doc_id: int):
+        text = self.texts[doc_id]
+        for gram in trigrams(text):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self.postings[gram]
+        for field, values in (self.doc_facets[doc_id] or {}).items():
+            self.facets.remove(doc_id, field, values)
+        self.doc_facets[doc_id] = None
+        del self.doc_of[self.element_ids[doc_id]]
+        self.element_ids[doc_id] = None
+        self.texts[doc_id] = None
+        self.sort_keys[doc_id] = None
+        self.popularity[doc_id] = 0.0
+        self.free_ids.append(doc_id)
+
+    def name_of(self, element_id: str) -> Optional[str]:
+        """Nama yang sedang ter-index (None kalau belum ada), dipakai update SymSpellIndex"""
+        with self.lock:
+            doc_id = self.doc_of.get(element_id)
+            return None if doc_id is None else self.sort_keys[doc_id]
+
+    def upsert(self, doc: dict):
+        """
+        doc: row dari SearchRepo.iter_search_documents. Update = remove + insert;
+        doc id yang dibebaskan dipakai ulang, jadi array & bitmap tidak tumbuh terus
+        di proses yang lama hidup dengan banyak write enrichment.
+        """
+        fields = [doc.get("name"), doc.get("description"), *(doc.get("extra") or []), *(doc.get("aliases") or [])]
+        text = FIELD_SEPARATOR.join(fold(f) for f in fields if f)
+        doc_facets = {"country": doc.get("countries") or [], "continent": doc.get("continents") or []}
+        with self.lock:
+            existing = self.doc_of.get(doc["element_id"])
+            if existing is not None:
+                self._remove(existing)
+            if self.free_ids:
+                doc_id = self.free_ids.pop()
+                self.element_ids[doc_id] = doc["element_id"]
+                self.texts[doc_id] = text
+                self.sort_keys[doc_id] = doc.get("name") or ""
+                self.popularity[doc_id] = doc.get("popularity") or 0.0
+                self.doc_facets[doc_id] = doc_facets
+            else:
+                doc_id = len(self.element_ids)
+                self.element_ids.append(doc["element_id"])
+                self.texts.append(text)
+                self.sort_keys.append(doc.get("name") or "")
+                self.popularity.append(doc.get("popularity") or 0.0)
+                self.doc_facets.append(doc_facets)
+            self.doc_of[doc["element_id"]] = doc_id
+            for gram in trigrams(text):
+                self.postings.setdefault(gram, set()).add(doc_id)
+            for field, values in doc_facets.items():
+                self.facets.add(doc_id, field, values)
+
+    def _text_candidates(self, needle: str, allowed: Optional[int] = None) -> Set[int]:
+        """
+        Intersect posting list trigram (mulai dari yang terkecil), lalu AND dengan
+        bitmap filter kalau ada. Bitmap filter tetap int; yang di-expand cuma irisannya.
+        """
+        grams = trigrams(needle)
+        if not grams:
+            return ids_from_bitmap(allowed) if allowed is not None else set(self.doc_of.values())
+        postings = sorted((self.postings.get(g, set()) for g in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates &= posting
+        if allowed is not None and candidates:
+            candidates = intersect_ids(candidates, allowed)
+        return candidates
+
+    def candidates(
+        self,
+        query: str,
+        countries: Optional[List[str]] = None,
+        continents: Optional[List[str]] = None
+    ) -> Tuple[str, Set[int]]:
+        """
+        (needle, doc id kandidat): filter country/continent = AND bitmap facet dulu,
+        hasilnya ikut di-intersect dengan posting list trigram query.
+        Kandidat = superset dari match; substring belum di-verify.
+        """
+        needle = fold(query)
+        if not needle:
+            return needle, set()
+        with self.lock:
+            allowed = self.facets.filter({"country": countries, "continent": continents})
+            if allowed == 0:
+                return needle, set()
+            return needle, self._text_candidates(needle, allowed)
+
+    def facet_counts(
+        self,
+        query: str,
+        countries: Optional[List[str]] = None,
+        continents: Optional[List[str]] = None
+    ) -> dict:
+        """
+        Jumlah match per country / continent untuk query (disjunctive: count country
+        memakai filter continent tapi tidak filter country, dan sebaliknya, supaya
+        checkbox lain tetap punya angka). Match di-verify exact kalau kandidat
+        <= FACET_VERIFY_LIMIT dan query punya trigram; selain itu yang di-verify
+        sampel random FACET_SAMPLE_SIZE kandidat dan count-nya di-scale ke jumlah
+        kandidat (seperti estimate_total), jadi tetap distribusi match query.
+        Key = nilai lowercase, sama dengan nilai filter.
+        """
+        needle = fold(query)
+        if not needle:
+            return {"countries": {}, "continents": {}, "approximate": False}
+        with self.lock:
+            candidates = self._text_candidates(needle)
+            population = len(candidates)
+            approximate = (population > FACET_VERIFY_LIMIT or not trigrams(needle)) and population > FACET_SAMPLE_SIZE
+            if approximate:
+                candidates = random.sample(list(candidates), FACET_SAMPLE_SIZE)
+            match = bitmap_from_ids(d for d in candidates if self._matches(needle, d))
+            by_country = self.facets.select("country", countries)
+            by_continent = self.facets.select("continent", continents)
+            counts = {
+                "countries": self.facets.counts("country", match if by_continent is None else match & by_continent),
+                "continents": self.facets.counts("continent", match if by_country is None else match & by_country),
+            }
+        if approximate:
+            scale = population / FACET_SAMPLE_SIZE
+            counts = {
+                field: {value: int(round(count * scale)) for value, count in values.items()}
+                for field, values in counts.items()
+            }
+        return {**counts, "approximate": approximate}
+
+    def _matches(self, needle: str, doc_id: int) -> bool:
+        text = self.texts[doc_id]
+        return text is not None and needle in text
+
+    def _order_key(self, doc_id: int, sort: str) -> tuple:
+        if sort == "popularity":
+            return (-self.popularity[doc_id], self.element_ids[doc_id])
+        return (self.sort_keys[doc_id], self.element_ids[doc_id])
+
+    def page(
+        self,
+        needle: str,
+        candidates: Set[int],
+        limit: int,
+        offset: int = 0,
+        after: Optional[Tuple] = None,
+        sort: str = "name"
+    ) -> Tuple[List[Tuple], bool]:
+        """
+        Satu halaman (sort value, element_id), mulai setelah keyset `after` (cursor)
+        atau `offset`. sort="name": urut nama (seperti ORDER BY full_name);
+        sort="popularity": popularity tertinggi dulu, sort value = popularity.
+        Kandidat di-verify sambil di-stream ke heapq.nsmallest, jadi yang disimpan
+        cuma heap berukuran offset + limit + 1 (bukan semua kandidat), tanpa sort penuh.
+        Return (keys, has_more).
+        """
+        # Sama dengan SearchRepo: kalau ada cursor, offset diabaikan
+        offset = 0 if after is not None else offset
+        if after is not None and sort == "popularity":
+            after = (-after[0], after[1])
+        with self.lock:
+            def verified():
+                for doc_id in candidates:
+                    if not self._matches(needle, doc_id):
+                        continue
+                    key = self._order_key(doc_id, sort)
+                    if after is None or key > after:
+                        yield key
+
+            top = heapq.nsmallest(offset + limit + 1, verified())[offset:]
+        keys = [(-order_value if sort == "popularity" else order_value, element_id) for order_value, element_id in top]
+        return keys[:limit], len(keys) > limit
+
+    def estimate_total(self, needle: str, candidates: Set[int], sample_size: int = ESTIMATE_SAMPLE_SIZE) -> dict:
+        """
+        Perkiraan jumlah match tanpa verify semua kandidat: verify sampel random,
+        total ~= |kandidat| * proporsi match. error_bound = 95% CI (normal approx.
+        + finite population correction). Kandidat <= sample_size dihitung exact.
+        """
+        with self.lock:
+            population = len(candidates)
+            if population <= sample_size:
+                total = sum(1 for d in candidates if self._matches(needle, d))
+                return {"estimated_total": total, "error_bound": 0, "exact": True, "method": "exact"}
+
+            sample = random.sample(list(candidates), sample_size)
+            hits = sum(1 for d in sample if self._matches(needle, d))
+        p = hits / sample_size
+        fpc = math.sqrt((population - sample_size) / (population - 1))
+        error = 1.96 * math.sqrt(p * (1 - p) / sample_size) * fpc * population
+        return {
+            "estimated_total": int(round(p * population)),
+            "error_bound": int(math.ceil(error)),
+            "exact": False,
+            "method": "sampling"
+        }
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "type": self.kind,
+                "documents": len(self),
+                "doc_ids_allocated": len(self.element_ids),
+                "trigrams": len(self.postings),
+                "facets": self.facets.stats(),
+                "built_at": self.built_at,
+            }
+
+
+class PrefixIndex:
+    """
+    Autocomplete: entries (folded name, element_id) terurut, prefix = satu range
+    bisect. Top-k popularity untuk prefix pendek di-precompute, sisanya heap
+    top-k di range (range prefix panjang kecil).
+    """
+
+    def __init__(self, kind: str, top_k: int = SUGGESTION_TOP_K):
+        self.kind = kind
+        self.top_k = top_k
+        self.entries: List[Tuple[str, str]] = []
+        self.names: Dict[str, Tuple[str, str, float]] = {}  # element_id -> (folded, display, popularity)
+        self.precomputed: Dict[str, List[str]] = {}
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        return bisect_left(self.entries, (prefix,)), bisect_left(self.entries, (prefix + "\uffff",))
+
+    def _top(self, prefix: str, k: Optional[int] = None) -> List[str]:
+        low, high = self._range(prefix)
+        return heapq.nlargest(
+            k or self.top_k,
+            (self.entries[i][1] for i in range(low, high)),
+            key=lambda element_id: self.names[element_id][2]
+        )
+
+    def bulk_load(self, docs: Iterable[dict]):
+        """Build sekali (startup): sort sekali, lalu precompute prefix pendek"""
+        with self.lock:
+            for doc in docs:
+                if doc.get("name"):
+                    self.names[doc["element_id"]] = (fold(doc["name"]), doc["name"], doc.get("popularity") or 0.0)
+            self.entries = sorted((folded, element_id) for element_id, (folded, _, _) in self.names.items())
+            self.precomputed = {}
+            prefixes = {folded[:n] for folded, _ in self.entries for n in range(1, PRECOMPUTED_PREFIX_LENGTH + 1)}
+            for prefix in prefixes:
+                self.precomputed[prefix] = self._top(prefix)
+
+    def upsert(self, doc: dict):
+        element_id = doc["element_id"]
+        with self.lock:
+            touched = []
+            old = self.names.pop(element_id, None)
+            if old is not None:
+                i = bisect_left(self.entries, (old[0], element_id))
+                if i < len(self.entries) and self.entries[i] == (old[0], element_id):
+                    del self.entries[i]
+                touched.append(old[0])
+            if doc.get("name"):
+                folded = fold(doc["name"])
+                self.names[element_id] = (folded, doc["name"], doc.get("popularity") or 0.0)
+                insort(self.entries, (folded, element_id))
+                touched.append(folded)
+            for folded in touched:
+                for n in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+                    prefix = folded[:n]
+                    top = self._top(prefix)
+                    if top:
+                        self.precomputed[prefix] = top
+                    else:
+                        self.precomputed.pop(prefix, None)
+
+    def suggest(self, prefix: str, limit: Optional[int] = None) -> List[dict]:
+        limit = limit or self.top_k
+        prefix = fold(prefix)
+        with self.lock:
+            if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH and limit <= self.top_k:
+                element_ids = self.precomputed.get(prefix, [])[:limit]
+            else:
+                element_ids = self._top(prefix, limit)
+            return [
+                {"element_id": element_id, "text": self.names[element_id][1], "type": self.kind}
+                for element_id in element_ids
+            ]
+
+    def stats(self) -> dict:
+        return {"type": self.kind, "names": len(self.entries), "precomputed_prefixes": len(self.precomputed)}
+
+
+materialization_progress = {
+    "running": False,
+    "full": False,
+    "name_keys": {},
+    "updated": {},
+    "started_at": None,
+    "finished_at": None,
+    "last_error": None
+}
+
+class AliasIndex:
+    """
+    Alias -> entity: entries (folded alias, element_id) terurut untuk prefix
+    lookup (bisect), ranking top-k berdasarkan popularity entity.
+    """
+
+    def __init__(self, kind: str, top_k: int = SUGGESTION_TOP_K):
+        self.kind = kind
+        self.top_k = top_k
+        self.entries: List[Tuple[str, str]] = []
+        self.aliases: Dict[str, Dict[str, str]] = {}           # element_id -> {folded: alias}
+        self.entities: Dict[str, Tuple[str, float]] = {}       # element_id -> (display name, popularity)
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _folded_aliases(doc: dict) -> Dict[str, str]:
+        name_key = fold(doc.get("name") or "")
+        folded = {}
+        for alias in doc.get("aliases") or []:
+            key = fold(alias)
+            # Alias yang sama dengan nama sudah dilayani PrefixIndex
+            if key and key != name_key:
+                folded.setdefault(key, alias)
+        return folded
+
+    def bulk_load(self, docs: Iterable[dict]):
+        with self.lock:
+            for doc in docs:
+                folded = self._folded_aliases(doc)
+                if folded:
+                    self.aliases[doc["element_id"]] = folded
+                    self.entities[doc["element_id"]] = (doc.get("name") or "", doc.get("popularity") or 0.0)
+            self.entries = sorted(
+                (key, element_id) for element_id, folded in self.aliases.items() for key in folded
+            )
+
+    def upsert(self, doc: dict):
+        element_id = doc["element_id"]
+        with self.lock:
+            for key in self.aliases.pop(element_id, {}):
+                i = bisect_left(self.entries, (key, element_id))
+                if i < len(self.entries) and self.entries[i] == (key, element_id):
+                    del self.entries[i]
+            self.entities.pop(element_id, None)
+            folded = self._folded_aliases(doc)
+            if folded:
+                self.aliases[element_id] = folded
+                self.entities[element_id] = (doc.get("name") or "", doc.get("popularity") or 0.0)
+                for key in folded:
+                    insort(self.entries, (key, element_id))
+
+    def suggest(self, prefix: str, limit: Optional[int] = None) -> List[dict]:
+        """Entity yang punya alias berawalan prefix; satu entity sekali (alias pertama yang match)"""
+        limit = limit or self.top_k
+        prefix = fold(prefix)
+        if not prefix:
+            return []
+        with self.lock:
+            low = bisect_left(self.entries, (prefix,))
+            high = bisect_left(self.entries, (prefix + "\uffff",))
+            matched: Dict[str, str] = {}
+            for key, element_id in self.entries[low:high]:
+                matched.setdefault(element_id, key)
+            top = heapq.nlargest(limit, matched, key=lambda element_id: self.entities[element_id][1])
+            return [
+                {
+                    "element_id": element_id,
+                    "text": self.entities[element_id][0],
+                    "type": self.kind,
+                    "alias": self.aliases[element_id][matched[element_id]]
+                }
+                for element_id in top
+            ]
+
+    def stats(self) -> dict:
+        return {"type": self.kind, "entities": len(self.aliases), "aliases": len(self.entries)}
+
+
+_indexes: Dict[str, TrigramIndex] = {}
+_prefix_indexes: Dict[str, PrefixIndex] = {}
+_spell_indexes: Dict[str, SymSpellIndex] = {}
+_alias_indexes: Dict[str, AliasIndex] = {}
+_build_lock = threading.Lock()
+# Selama full rebuild satu tipe berjalan, key yang di-refresh incremental dicatat di
+# sini dan di-replay ke index baru setelah swap (export bisa sudah lewat node itu)
+_rebuild_buffers: Dict[str, List] = {}
+_rebuild_buffer_lock = threading.Lock()
+
+
+def build_search_index(kind: str, repo=None) -> TrigramIndex:
+    """Satu streaming export -> trigram index + prefix index"""
+    repo = repo or _default_repo()
+    start = time.time()
+    with _rebuild_buffer_lock:
+        _rebuild_buffers[kind] = []
+    try:
+        index = TrigramIndex(kind)
+        docs = []
+        for doc in repo.iter_search_documents(kind):
+            index.upsert(doc)
+            docs.append({
+                "element_id": doc["element_id"],
+                "name": doc.get("name"),
+                "popularity": doc.get("popularity"),
+                "aliases": doc.get("aliases")
+            })
+        prefix_index = PrefixIndex(kind)
+        prefix_index.bulk_load(docs)
+        spell_index = SymSpellIndex(kind)
+        spell_index.bulk_load(doc["name"] for doc in docs)
+        alias_index = AliasIndex(kind)
+        alias_index.bulk_load(docs)
+        index.built_at = time.time()
+        _indexes[kind] = index
+        _prefix_indexes[kind] = prefix_index
+        _spell_indexes[kind] = spell_index
+        _alias_indexes[kind] = alias_index
+    finally:
+        # Write yang masuk setelah pop ini langsung ke index baru (sudah di-swap)
+        with _rebuild_buffer_lock:
+            buffered = _rebuild_buffers.pop(kind, [])
+    if buffered:
+        _refresh_in_memory(kind, buffered, repo)
+    print(f"✅ Built search index for {kind}: {len(index)} docs in {time.time() - start:.1f}s")
+    return index
+
+
+def build_all_search_indexes(repo=None):
+    """Dipanggil saat startup (background thread)"""
+    with _build_lock:
+        for kind in SEARCH_KINDS:
+            try:
+                build_search_index(kind, repo)
+            except Exception as e:
+                print(f"⚠️ Search index build failed for {kind}: {e}")
+
+
+def get_search_index(kind: str) -> Optional[TrigramIndex]:
+    """None kalau belum di-build (caller fallback ke Neo4j full-text)"""
+    return _indexes.get(kind)
+
+
+def get_prefix_index(kind: str) -> Optional[PrefixIndex]:
+    return _prefix_indexes.get(kind)
+
+
+def get_spell_index(kind: str) -> Optional[SymSpellIndex]:
+    return _spell_indexes.get(kind)
+
+
+def get_alias_index(kind: str) -> Optional[AliasIndex]:
+    return _alias_indexes.get(kind)
+
+
+def materialize_search_fields(full: bool = False, refold_names: Optional[bool] = None, repo=None) -> dict:
+    """
+    Backfill name_key lalu tulis field search_* di semua node Person/Event
+    (lihat SearchRepo). full=False cuma node yang belum pernah di-materialisasi.
+    refold_names (default = full): hitung ulang name_key semua node; False untuk
+    perubahan yang cuma menyentuh field search_* (misalnya mapping country-continent).
+    """
+    refold_names = full if refold_names is None else refold_names
+    repo = repo or _default_repo()
+    materialization_progress.update({
+        "running": True,
+        "full": full,
+        "name_keys": {},
+        "updated": {},
+        "started_at": time.time(),
+        "finished_at": None,
+        "last_error": None
+    })
+    try:
+        for kind in SEARCH_KINDS:
+            materialization_progress["name_keys"][kind] = repo.backfill_name_keys(kind, full=refold_names)
+            materialization_progress["updated"][kind] = repo.materialize_search_fields(kind, full=full)
+        print(
+            f"✅ Materialized search fields: {materialization_progress['updated']}, "
+            f"name keys: {materialization_progress['name_keys']}"
+        )
+    except Exception as e:
+        materialization_progress["last_error"] = str(e)
+        print(f"⚠️ Search field materialization failed: {e}")
+    finally:
+        materialization_progress["running"] = False
+        materialization_progress["finished_at"] = time.time()
+    return dict(materialization_progress)
+
+
+def bootstrap_search(full: bool = False, refold_names: Optional[bool] = None):
+    """Startup / setelah perubahan geo: materialisasi field search_* lalu build index in-memory"""
+    materialize_search_fields(full=full, refold_names=refold_names)
+    build_all_search_indexes()
+
+
+def refresh_search_nodes(kind: str, keys: Iterable, repo=None):
+    """
+    Write path: materialisasi ulang field search_* node yang berubah
+    (by article_id / event_id), lalu update index in-memory kalau sudah di-build.
+    Kalau full rebuild tipe ini sedang jalan, key juga dicatat untuk di-replay ke
+    index baru setelah swap.
+    """
+    keys = [k for k in keys if k is not None]
+    repo = repo or _default_repo()
+    try:
+        repo.sync_search_fields(kind, keys)
+    except Exception as e:
+        print(f"⚠️ Search field sync failed for {kind}: {e}")
+    with _rebuild_buffer_lock:
+        if kind in _rebuild_buffers:
+            _rebuild_buffers[kind].extend(keys)
+    _refresh_in_memory(kind, keys, repo)
+
+
+def _refresh_in_memory(kind: str, keys: List, repo):
+    """Upsert dokumen terbaru ke semua index in-memory tipe ini (kalau sudah di-build)"""
+    index = _indexes.get(kind)
+    if index is None or not keys:
+        return
+    try:
+        prefix_index = _prefix_indexes.get(kind)
+        spell_index = _spell_indexes.get(kind)
+        alias_index = _alias_indexes.get(kind)
+        for doc in repo.get_search_documents(kind, keys):
+            old_name = index.name_of(doc["element_id"])
+            index.upsert(doc)
+            if prefix_index is not None:
+                prefix_index.upsert(doc)
+            if spell_index is not None:
+                # Token nama lama dikeluarkan dulu supaya rename tidak meninggalkan did-you-mean basi
+                spell_index.remove_text(old_name)
+                spell_index.add_text(doc.get("name"))
+            if alias_index is not None:
+                alias_index.upsert(doc)
+    except Exception as e:
+        print(f"⚠️ Search index refresh failed for {kind}: {e}")
+
+
+def get_search_index_status() -> dict:
+    return {
+        "ready": [kind for kind in SEARCH_KINDS if kind in _indexes],
+        "indexes": [index.stats() for index in _indexes.values()],
+        "prefix_indexes": [index.stats() for index in _prefix_indexes.values()],
+        "spell_indexes": [index.stats() for index in _spell_indexes.values()],
+        "alias_indexes": [index.stats() for index in _alias_indexes.values()],
+        "materialization": dict(materialization_progress),
+    }
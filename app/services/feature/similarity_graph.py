@@ -0,0 +1,67 @@
+"""
+Batch job: precompute top-k neighbor untuk setiap Person / Event dan simpan
+sebagai relasi SIMILAR_TO, supaya /vector/similar/* cukup baca relasi.
+
+Refresh incremental: hanya node yang embedding_updated-nya lebih baru dari
+similar_updated yang dihitung ulang. Catatan: daftar neighbor node LAIN yang
+menunjuk ke node yang berubah tidak ikut dihitung ulang (pakai full=True
+untuk rebuild total, misalnya setelah ganti model).
+"""
+import time
+
+from app.db.vector_repo import get_vector_repo, EMBEDDING_LABELS
+
+DEFAULT_K = 20
+
+similarity_graph_progress = {
+    "running": False,
+    "type": None,
+    "k": DEFAULT_K,
+    "refreshed": 0,
+    "batches": 0,
+    "started_at": None,
+    "finished_at": None,
+    "last_error": None
+}
+
+
+def refresh_similarity_graph(kind: str, k: int = DEFAULT_K, batch_size: int = 200, full: bool = False) -> dict:
+    """Hitung ulang SIMILAR_TO untuk node yang stale (atau semua kalau full=True)"""
+    if kind not in EMBEDDING_LABELS:
+        raise ValueError(f"Tipe '{kind}' tidak dikenal (pilihan: {list(EMBEDDING_LABELS)})")
+
+    repo = get_vector_repo()
+    similarity_graph_progress.update({
+        "running": True,
+        "type": kind,
+        "k": k,
+        "refreshed": 0,
+        "batches": 0,
+        "started_at": time.time(),
+        "finished_at": None,
+        "last_error": None
+    })
+
+    try:
+        if full:
+            repo.reset_similarity_graph(kind)
+
+        while similarity_graph_progress["running"]:
+            element_ids = repo.get_stale_similarity_ids(kind, limit=batch_size)
+            if not element_ids:
+                break
+            refreshed = repo.materialize_similar(kind, element_ids, k=k)
+            similarity_graph_progress["refreshed"] += refreshed
+            similarity_graph_progress["batches"] += 1
+            print(f"✅ SIMILAR_TO {kind}: {similarity_graph_progress['refreshed']} nodes refreshed")
+            if refreshed == 0:
+                # Jaga-jaga supaya tidak loop terus kalau batch tidak bisa diproses
+                break
+    except Exception as e:
+        similarity_graph_progress["last_error"] = str(e)
+        print(f"❌ Similarity graph error: {e}")
+    finally:
+        similarity_graph_progress["running"] = False
+        similarity_graph_progress["finished_at"] = time.time()
+
+    return dict(similarity_graph_progress)
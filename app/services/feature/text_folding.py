@@ -0,0 +1,21 @@
+"""
+Normalisasi nama untuk lookup exact dan search.
+
+fold_name: Unicode NFKD, buang combining mark (aksen), casefold, lalu semua
+run non-alfanumerik (tanda baca, spasi ganda) jadi satu spasi. Hasilnya
+disimpan sebagai property `name_key` di Person / Event (range index), jadi
+lookup nama cukup equality match, bukan toLower() di tiap node.
+"""
+import re
+import unicodedata
+from typing import Optional
+
+_NON_ALNUM = re.compile(r"[\W_]+")
+
+
+def fold_name(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", stripped.casefold()).strip()
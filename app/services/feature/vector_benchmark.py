@@ -0,0 +1,308 @@
+"""
+Benchmark recall / latency untuk vector search engines.
+
+Corpus:
+- synthetic: N vector clustered random (--synthetic N --dim D)
+- snapshot : file .npz {element_ids, vectors} hasil --export-snapshot dari Neo4j
+
+Ground truth dihitung exact (brute force NumPy), lalu tiap engine dijalankan
+di beberapa setting. Output JSON (stdout / --output) supaya bisa dibandingkan
+antar release.
+
+Contoh:
+    python -m app.services.feature.vector_benchmark --synthetic 50000 --dim 768
+    python -m app.services.feature.vector_benchmark --export-snapshot person.npz --kind person
+    python -m app.services.feature.vector_benchmark --snapshot person.npz --kind person --native
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.feature.quantization import normalize_rows
+from app.services.feature.vector_engines import (
+    PQVectorIndex,
+    BinaryVectorIndex,
+    PQ_SUBSPACES,
+    load_embedding_matrix,
+)
+
+DEFAULT_K = 10
+DEFAULT_QUERIES = 200
+PQ_RERANK_SETTINGS = (50, 100, 300)
+BINARY_RERANK_SETTINGS = (100, 300, 1000)
+# Native: k kandidat index = limit * multiplier
+NATIVE_CANDIDATE_MULTIPLIERS = (1, 2, 4)
+
+
+# ==================== CORPUS ====================
+
+def synthetic_corpus(n: int, dim: int, n_clusters: int = 100, noise: float = 0.35, seed: int = 0):
+    """Corpus clustered (mirip distribusi embedding asli, bukan uniform random)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    assignments = rng.integers(0, n_clusters, size=n)
+    vectors = centers[assignments] + noise * rng.standard_normal((n, dim)).astype(np.float32)
+    element_ids = [f"synthetic:{i}" for i in range(n)]
+    return element_ids, normalize_rows(vectors)
+
+
+def load_snapshot(path: str) -> Tuple[List[str], np.ndarray]:
+    data = np.load(path, allow_pickle=False)
+    return [str(i) for i in data["element_ids"]], normalize_rows(data["vectors"])
+
+
+def export_snapshot(kind: str, path: str) -> dict:
+    """Dump embeddings dari Neo4j ke .npz (element_ids + float32 vectors)"""
+    element_ids, vectors = load_embedding_matrix(kind)
+    if not element_ids:
+        raise ValueError(f"Belum ada embedding untuk {kind}")
+    np.savez(path, element_ids=np.asarray(element_ids), vectors=vectors.astype(np.float32))
+    return {"type": kind, "path": path, "vectors": len(element_ids), "dim": int(vectors.shape[1])}
+
+
+def make_queries(vectors: np.ndarray, n_queries: int, noise: float = 0.05, seed: int = 1) -> np.ndarray:
+    """Query = vector corpus random + sedikit noise (query asli jarang identik dengan dokumen)"""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(vectors.shape[0], size=min(n_queries, vectors.shape[0]), replace=False)
+    queries = vectors[picks] + noise * rng.standard_normal((len(picks), vectors.shape[1])).astype(np.float32)
+    return normalize_rows(queries)
+
+
+def exact_ground_truth(vectors: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    scores = queries @ vectors.T
+    k = min(k, vectors.shape[0])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [set(row.tolist()) for row in top]
+
+
+# ==================== RUNNER ====================
+
+def summarize(
+    engine: str,
+    settings: dict,
+    latencies_ms: List[float],
+    recalls: List[float],
+    k: int,
+    memory_bytes: Optional[int],
+    build_seconds: float = 0.0,
+) -> dict:
+    latencies = np.asarray(latencies_ms)
+    total_seconds = latencies.sum() / 1000
+    return {
+        "engine": engine,
+        "settings": settings,
+        f"recall@{k}": round(float(np.mean(recalls)), 4),
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 3),
+            "p95": round(float(np.percentile(latencies, 95)), 3),
+            "p99": round(float(np.percentile(latencies, 99)), 3),
+            "mean": round(float(latencies.mean()), 3),
+        },
+        "qps": round(len(latencies) / total_seconds, 1) if total_seconds else None,
+        "memory_bytes": memory_bytes,
+        "build_seconds": round(build_seconds, 3),
+    }
+
+
+def run_queries(
+    search: Callable[[np.ndarray], List[int]],
+    queries: np.ndarray,
+    truth: List[set],
+    k: int,
+) -> Tuple[List[float], List[float]]:
+    """search(query) -> posisi top-k. Return (latencies ms, recall per query)"""
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(set(found[:k]) & expected) / max(len(expected), 1))
+    return latencies, recalls
+
+
+def bench_exact(vectors: np.ndarray, queries: np.ndarray, truth: List[set], k: int) -> dict:
+    def search(query):
+        scores = vectors @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])].tolist()
+
+    latencies, recalls = run_queries(search, queries, truth, k)
+    return summarize("exact", {}, latencies, recalls, k, int(vectors.nbytes))
+
+
+def bench_compressed(
+    engine: str,
+    index,
+    rerank_settings,
+    element_ids: List[str],
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    truth: List[set],
+    k: int,
+    build_seconds: float,
+) -> List[dict]:
+    position_of = {element_id: i for i, element_id in enumerate(element_ids)}
+    lookup = lambda ids: {i: vectors[position_of[i]] for i in ids if i in position_of}
+
+    reports = []
+    for rerank in rerank_settings:
+        def search(query, rerank=rerank):
+            hits = index.search(query, limit=k, vector_lookup=lookup, rerank_candidates=rerank)
+            return [position_of[h["element_id"]] for h in hits]
+
+        latencies, recalls = run_queries(search, queries, truth, k)
+        reports.append(summarize(
+            engine,
+            {"rerank_candidates": rerank, **({"m": index.quantizer.m} if engine == "pq" else {})},
+            latencies, recalls, k, index.nbytes, build_seconds
+        ))
+    return reports
+
+
+def bench_native(kind: str, element_ids: List[str], queries: np.ndarray, truth: List[set], k: int) -> List[dict]:
+    """
+    Neo4j native vector index. Corpus HARUS snapshot dari database yang sama
+    (ground truth dihitung dari snapshot). Latency termasuk round trip Bolt.
+    """
+    from app.db.vector_repo import get_vector_repo
+
+    repo = get_vector_repo()
+    position_of = {element_id: i for i, element_id in enumerate(element_ids)}
+    query_list = [q.tolist() for q in queries]
+
+    reports = []
+    with repo.driver.session(database=repo.db) as session:
+        for multiplier in NATIVE_CANDIDATE_MULTIPLIERS:
+            candidates = k * multiplier
+
+            def search(query, candidates=candidates):
+                result = session.run("""
+                    CALL db.index.vector.queryNodes($index_name, $k, $embedding)
+                    YIELD node, score
+                    RETURN elementId(node) AS element_id, score
+                """, {"index_name": f"{kind}_embedding_index", "k": candidates, "embedding": query})
+                return [position_of[r["element_id"]] for r in result if r["element_id"] in position_of][:k]
+
+            latencies, recalls = run_queries(search, query_list, truth, k)
+            reports.append(summarize("native", {"candidates": candidates}, latencies, recalls, k, None))
+    return reports
+
+
+def run_benchmark(
+    element_ids: List[str],
+    vectors: np.ndarray,
+    k: int = DEFAULT_K,
+    n_queries: int = DEFAULT_QUERIES,
+    engines: Tuple[str, ...] = ("exact", "pq", "binary"),
+    pq_m: Tuple[int, ...] = (PQ_SUBSPACES,),
+    kind: Optional[str] = None,
+    corpus_label: str = "synthetic",
+) -> dict:
+    k = min(k, len(element_ids))
+    queries = make_queries(vectors, n_queries)
+    truth = exact_ground_truth(vectors, queries, k)
+    results = []
+
+    if "exact" in engines:
+        results.append(bench_exact(vectors, queries, truth, k))
+
+    if "pq" in engines:
+        for m in pq_m:
+            start = time.perf_counter()
+            index = PQVectorIndex.build(kind or "benchmark", element_ids, vectors, m=m)
+            build_seconds = time.perf_counter() - start
+            results.extend(bench_compressed(
+                "pq", index, PQ_RERANK_SETTINGS, element_ids, vectors, queries, truth, k, build_seconds
+            ))
+
+    if "binary" in engines:
+        start = time.perf_counter()
+        index = BinaryVectorIndex.build(kind or "benchmark", element_ids, vectors)
+        build_seconds = time.perf_counter() - start
+        results.extend(bench_compressed(
+            "binary", index, BINARY_RERANK_SETTINGS, element_ids, vectors, queries, truth, k, build_seconds
+        ))
+
+    if "native" in engines:
+        if not kind:
+            raise ValueError("Engine native butuh --kind dan snapshot dari Neo4j")
+        results.extend(bench_native(kind, element_ids, queries, truth, k))
+
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "corpus": {
+            "source": corpus_label,
+            "type": kind,
+            "vectors": len(element_ids),
+            "dim": int(vectors.shape[1]),
+            "float32_bytes": int(vectors.nbytes),
+        },
+        "k": k,
+        "queries": int(queries.shape[0]),
+        "environment": {"python": platform.python_version(), "numpy": np.__version__},
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Recall/latency benchmark vector search engines")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--synthetic", type=int, metavar="N", help="corpus synthetic N vectors")
+    source.add_argument("--snapshot", help="file .npz {element_ids, vectors}")
+    source.add_argument("--export-snapshot", metavar="PATH", help="dump embeddings Neo4j (--kind) ke .npz lalu keluar")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--kind", choices=["person", "event"])
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES)
+    parser.add_argument("--engines", default="exact,pq,binary", help="comma separated: exact,pq,binary,native")
+    parser.add_argument("--native", action="store_true", help="ikutkan Neo4j native index (snapshot saja)")
+    parser.add_argument("--pq-m", default=str(PQ_SUBSPACES), help="comma separated jumlah sub-space PQ")
+    parser.add_argument("--output", help="tulis JSON ke file (default stdout)")
+    args = parser.parse_args(argv)
+
+    if args.export_snapshot:
+        if not args.kind:
+            parser.error("--export-snapshot butuh --kind")
+        print(json.dumps(export_snapshot(args.kind, args.export_snapshot), indent=2))
+        return 0
+
+    engines = tuple(e.strip() for e in args.engines.split(",") if e.strip())
+    if args.native and "native" not in engines:
+        engines += ("native",)
+
+    if args.synthetic:
+        if "native" in engines:
+            parser.error("Engine native hanya bisa dengan --snapshot")
+        element_ids, vectors = synthetic_corpus(args.synthetic, args.dim)
+        corpus_label = "synthetic"
+    else:
+        element_ids, vectors = load_snapshot(args.snapshot)
+        corpus_label = args.snapshot
+
+    report = run_benchmark(
+        element_ids,
+        vectors,
+        k=args.k,
+        n_queries=args.queries,
+        engines=engines,
+        pq_m=tuple(int(m) for m in args.pq_m.split(",")),
+        kind=args.kind,
+        corpus_label=corpus_label,
+    )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,564 @@
+"""
+In-process vector search engines (alternatif dari Neo4j native vector index).
+
+Semua engine di sini:
+- di-build dari embedding yang sudah tersimpan di Neo4j (stream, bukan load per record)
+- return hits {element_id, score} dengan skala score yang SAMA dengan Neo4j
+  cosine index, yaitu (1 + cosine) / 2, supaya min_score tetap konsisten
+- di-hydrate lewat VectorRepository.hydrate_* jadi shape response tidak berubah
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from app.db.vector_repo import get_vector_repo, EMBEDDING_LABELS
+from app.services.feature.quantization import ProductQuantizer, BinaryQuantizer, normalize_rows
+
+SEARCH_ENGINES = ("native", "pq", "binary")
+
+# Default PQ: 48 sub-space x 1 byte = 48 byte per vector (vs 3 KB float32 @768 dim)
+PQ_SUBSPACES = 48
+# Berapa kandidat ADC yang di-rerank dengan float exact
+PQ_RERANK_CANDIDATES = 100
+# Binary prefilter kasar, jadi kandidat re-rank lebih banyak
+BINARY_RERANK_CANDIDATES = 300
+
+# Snapshot embedding (count + embedding_updated terbaru) dicek paling sering tiap N detik;
+# kalau beda dengan saat build, index di-rebuild
+ENGINE_CHECK_INTERVAL = int(os.getenv("ENGINE_CHECK_INTERVAL", "60"))
+
+VectorLookup = Callable[[List[str]], Dict[str, List[float]]]
+# element_ids kandidat -> hits {element_id, score} exact, urut desc (re-rank di server)
+CandidateScorer = Callable[[List[str]], List[dict]]
+
+
+def to_index_score(cosine: np.ndarray) -> np.ndarray:
+    """Cosine [-1, 1] -> skala score Neo4j vector index [0, 1]"""
+    return (1.0 + cosine) / 2.0
+
+
+def exact_rerank(query: np.ndarray, candidate_ids: List[str], vector_lookup: VectorLookup) -> List[dict]:
+    """Hitung ulang score exact (float) untuk kandidat, return hits urut desc"""
+    vectors = vector_lookup(candidate_ids)
+    ids = [i for i in candidate_ids if vectors.get(i) is not None and len(vectors[i])]
+    if not ids:
+        return []
+    matrix = normalize_rows(np.asarray([vectors[i] for i in ids], dtype=np.float32))
+    scores = to_index_score(matrix @ query)
+    order = np.argsort(-scores)
+    return [{"element_id": ids[i], "score": float(scores[i])} for i in order]
+
+
+class CompressedVectorIndex:
+    """
+    Base class index in-process: scan semua codes dengan score kasar, lalu
+    re-rank kandidat teratas secara exact (di Neo4j lewat `scorer`, atau lokal
+    lewat `vector_lookup` untuk benchmark / recall check).
+    """
+
+    engine = None
+    default_rerank_candidates = PQ_RERANK_CANDIDATES
+
+    def __init__(self, kind: str, element_ids: List[str], codes: np.ndarray):
+        self.kind = kind
+        self.element_ids = element_ids
+        self.codes = codes
+        self.position_of = {element_id: i for i, element_id in enumerate(element_ids)}
+        self.built_at = time.time()
+        self.snapshot = None
+        self.checked_at = self.built_at
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self.quantizer.dim
+
+    def __len__(self):
+        return len(self.element_ids)
+
+    def coarse_scores(self, query: np.ndarray) -> np.ndarray:
+        """Score kasar query vs semua codes (makin besar makin mirip)"""
+        raise NotImplementedError
+
+    def approximate_scores(self, query: np.ndarray, positions: List[int]) -> np.ndarray:
+        """Estimasi cosine untuk posisi tertentu (dipakai kalau tidak ada float re-rank)"""
+        raise NotImplementedError
+
+    def candidates(self, query: np.ndarray, n_candidates: int, subset: Optional[np.ndarray] = None) -> List[int]:
+        """Top-n posisi berdasarkan coarse score (opsional: hanya di dalam subset posisi)"""
+        if subset is None:
+            coarse = self.coarse_scores(query)
+        else:
+            coarse = self.approximate_scores(query, subset)
+        n_candidates = min(n_candidates, len(coarse))
+        if n_candidates <= 0:
+            return []
+        top = np.argpartition(-coarse, n_candidates - 1)[:n_candidates]
+        top = top[np.argsort(-coarse[top], kind="stable")]
+        return (top if subset is None else subset[top]).tolist()
+
+    def search(
+        self,
+        query_embedding: List[float],
+        limit: int = 10,
+        min_score: float = 0.0,
+        exclude_ids: Optional[Iterable[str]] = None,
+        vector_lookup: Optional[VectorLookup] = None,
+        rerank_candidates: Optional[int] = None,
+        allowed_ids: Optional[Set[str]] = None,
+        scorer: Optional[CandidateScorer] = None,
+    ) -> List[dict]:
+        """
+        allowed_ids: pre-filter, scoring cuma dilakukan di node yang lolos filter
+        (bukan over-fetch lalu buang), jadi benar di selectivity berapa pun.
+        """
+        if not len(self):
+            return []
+        query = normalize_rows(np.asarray(query_embedding, dtype=np.float32)[None, :])[0]
+        exclude = set(exclude_ids or ())
+        rerank_candidates = rerank_candidates or self.default_rerank_candidates
+
+        subset = None
+        if allowed_ids is not None:
+            subset = np.fromiter(
+                sorted(self.position_of[i] for i in allowed_ids if i in self.position_of), dtype=np.int64
+            )
+            if not len(subset):
+                return []
+
+        positions = self.candidates(query, max(rerank_candidates, limit) + len(exclude), subset)
+        positions = [p for p in positions if self.element_ids[p] not in exclude]
+
+        if scorer is not None:
+            hits = scorer([self.element_ids[p] for p in positions])
+        elif vector_lookup is not None:
+            hits = exact_rerank(query, [self.element_ids[p] for p in positions], vector_lookup)
+        else:
+            scores = to_index_score(self.approximate_scores(query, positions))
+            order = np.argsort(-scores, kind="stable")
+            hits = [{"element_id": self.element_ids[positions[i]], "score": float(scores[i])} for i in order]
+
+        return [h for h in hits if h["score"] >= min_score][:limit]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes)
+
+    def stats(self) -> dict:
+        return {
+            "engine": self.engine,
+            "type": self.kind,
+            "vectors": len(self),
+            "bytes_per_vector": int(self.codes.shape[1]) if self.codes.ndim == 2 else 0,
+            "memory_bytes": self.nbytes,
+            "built_at": self.built_at,
+        }
+
+
+class PQVectorIndex(CompressedVectorIndex):
+    """Compressed index: cuma simpan codes uint8 + codebooks, tanpa float vectors."""
+
+    engine = "pq"
+    default_rerank_candidates = PQ_RERANK_CANDIDATES
+
+    def __init__(self, kind: str, element_ids: List[str], quantizer: ProductQuantizer, codes: np.ndarray):
+        super().__init__(kind, element_ids, codes)
+        self.quantizer = quantizer
+
+    @classmethod
+    def build(cls, kind: str, element_ids: List[str], vectors: np.ndarray, m: int = PQ_SUBSPACES) -> "PQVectorIndex":
+        vectors = normalize_rows(vectors)
+        quantizer = ProductQuantizer(m=m).train(vectors)
+        codes = quantizer.encode(vectors)
+        return cls(kind, list(element_ids), quantizer, codes)
+
+    def coarse_scores(self, query: np.ndarray) -> np.ndarray:
+        tables = self.quantizer.distance_tables(query)
+        return self.quantizer.asymmetric_scores(tables, self.codes)
+
+    def approximate_scores(self, query: np.ndarray, positions: List[int]) -> np.ndarray:
+        tables = self.quantizer.distance_tables(query)
+        return self.quantizer.asymmetric_scores(tables, self.codes[positions])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes) + self.quantizer.nbytes
+
+
+class BinaryVectorIndex(CompressedVectorIndex):
+    """
+    Binary prefilter: sign bits + popcount Hamming distance ke seluruh corpus,
+    lalu top-N di-rescore dengan cosine full.
+    """
+
+    engine = "binary"
+    default_rerank_candidates = BINARY_RERANK_CANDIDATES
+
+    def __init__(self, kind: str, element_ids: List[str], quantizer: BinaryQuantizer, codes: np.ndarray):
+        super().__init__(kind, element_ids, codes)
+        self.quantizer = quantizer
+
+    @classmethod
+    def build(cls, kind: str, element_ids: List[str], vectors: np.ndarray) -> "BinaryVectorIndex":
+        quantizer = BinaryQuantizer().fit(vectors)
+        codes = quantizer.encode(vectors)
+        return cls(kind, list(element_ids), quantizer, codes)
+
+    def coarse_scores(self, query: np.ndarray) -> np.ndarray:
+        query_code = self.quantizer.encode(query)[0]
+        return -self.quantizer.hamming_distances(query_code, self.codes).astype(np.float32)
+
+    def approximate_scores(self, query: np.ndarray, positions: List[int]) -> np.ndarray:
+        # Estimasi cosine dari Hamming distance: cos(pi * h / dim)
+        query_code = self.quantizer.encode(query)[0]
+        distances = self.quantizer.hamming_distances(query_code, self.codes[positions])
+        return np.cos(np.pi * distances / self.quantizer.dim).astype(np.float32)
+
+
+# ==================== REGISTRY ====================
+
+ENGINE_CLASSES = {"pq": PQVectorIndex, "binary": BinaryVectorIndex}
+
+_indexes: Dict[tuple, object] = {}
+_build_lock = threading.Lock()
+# (engine, kind) yang sedang di-cek / di-rebuild di background
+_refreshing: Set[tuple] = set()
+_refresh_lock = threading.Lock()
+# Naik tiap invalidate_engine_indexes(); build yang mulai sebelum invalidate tidak dipasang
+_generation = 0
+
+
+def load_embedding_matrix(kind: str):
+    """Stream embeddings dari Neo4j -> (element_ids, float32 matrix)"""
+    repo = get_vector_repo()
+    element_ids = []
+    rows = []
+    for element_id, embedding in repo.iter_embeddings(kind):
+        element_ids.append(element_id)
+        rows.append(np.asarray(embedding, dtype=np.float32))
+    if not rows:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    return element_ids, np.vstack(rows)
+
+
+def _build(engine: str, kind: str):
+    """Build + pasang index; caller wajib pegang _build_lock"""
+    start = time.time()
+    generation = _generation
+    # Snapshot diambil sebelum load: write di tengah build terdeteksi di check berikutnya
+    snapshot = get_vector_repo().get_embedding_snapshot(kind)
+    element_ids, vectors = load_embedding_matrix(kind)
+    if not element_ids:
+        raise ValueError(f"Belum ada embedding untuk {kind}. Generate embeddings dulu!")
+    index = ENGINE_CLASSES[engine].build(kind, element_ids, vectors)
+    index.snapshot = snapshot
+    del vectors
+    if generation == _generation:
+        _indexes[(engine, kind)] = index
+    print(f"✅ Built {engine} index for {kind}: {len(index)} vectors in {time.time() - start:.1f}s")
+    return index
+
+
+def build_engine_index(engine: str, kind: str):
+    """(Re)build index in-process untuk satu engine + tipe node"""
+    if engine not in ENGINE_CLASSES:
+        raise ValueError(f"Engine '{engine}' tidak perlu di-build (pilihan: {list(ENGINE_CLASSES)})")
+    if kind not in EMBEDDING_LABELS:
+        raise ValueError(f"Tipe '{kind}' tidak dikenal (pilihan: {list(EMBEDDING_LABELS)})")
+
+    with _build_lock:
+        return _build(engine, kind).stats()
+
+
+def _refresh(engine: str, kind: str, force: bool):
+    """Background: cek snapshot embedding, rebuild kalau berubah (atau force)"""
+    try:
+        index = _indexes.get((engine, kind))
+        if (
+            force or index is None
+            or get_vector_repo().get_embedding_snapshot(kind) != index.snapshot
+        ):
+            build_engine_index(engine, kind)
+    except Exception as e:
+        print(f"⚠️ {engine} index refresh failed for {kind}: {e}")
+    finally:
+        with _refresh_lock:
+            _refreshing.discard((engine, kind))
+
+
+def _refresh_in_background(engine: str, kind: str, force: bool = False):
+    """Satu refresh per (engine, kind); request tetap dilayani index lama sampai swap"""
+    with _refresh_lock:
+        if (engine, kind) in _refreshing:
+            return
+        _refreshing.add((engine, kind))
+    threading.Thread(
+        target=_refresh, args=(engine, kind, force),
+        name=f"{engine}-{kind}-index-refresh", daemon=True
+    ).start()
+
+
+def get_engine_index(engine: str, kind: str, dim: Optional[int] = None):
+    """
+    Ambil index. Build sinkron cuma kalau belum ada index sama sekali; snapshot
+    embedding dicek paling sering tiap ENGINE_CHECK_INTERVAL detik di background
+    dan index di-rebuild + di-swap di sana, jadi request tidak pernah menunggu
+    training ulang.
+    """
+    key = (engine, kind)
+    index = _indexes.get(key)
+    if index is None:
+        with _build_lock:
+            index = _indexes.get(key) or _build(engine, kind)
+
+    if dim is not None and index.dim is not None and dim != index.dim:
+        # Model embedding ganti: index lama tidak bisa menjawab query ini
+        _refresh_in_background(engine, kind, force=True)
+        raise ValueError(
+            f"Dimensi query ({dim}) tidak cocok dengan {engine} index {kind} ({index.dim}); "
+            "index sedang di-rebuild, coba lagi nanti"
+        )
+
+    now = time.time()
+    if now - index.checked_at >= ENGINE_CHECK_INTERVAL:
+        index.checked_at = now
+        _refresh_in_background(engine, kind)
+    return index
+
+
+def invalidate_engine_indexes():
+    """Dipanggil saat embedding di-clear / model di-reset"""
+    global _generation
+    _generation += 1
+    _indexes.clear()
+
+
+def get_engines_status() -> dict:
+    with _refresh_lock:
+        refreshing = sorted(_refreshing)
+    return {
+        "engines": list(SEARCH_ENGINES),
+        "built": [index.stats() for index in _indexes.values()],
+        "refreshing": [f"{engine}:{kind}" for engine, kind in refreshing],
+    }
+
+
+def validate_engine(engine: Optional[str]) -> str:
+    engine = engine or "native"
+    if engine not in SEARCH_ENGINES:
+        raise ValueError(f"Engine '{engine}' tidak dikenal (pilihan: {list(SEARCH_ENGINES)})")
+    return engine
+
+
+# ==================== SEARCH ENTRY POINTS ====================
+
+def search_vectors(
+    kind: str,
+    query_embedding: List[float],
+    limit: int = 10,
+    min_score: float = 0.5,
+    engine: str = "native",
+    exclude_ids: Optional[Iterable[str]] = None,
+    stats: Optional[dict] = None,
+    allowed_ids: Optional[Set[str]] = None,
+) -> List[dict]:
+    """
+    Vector search dengan engine pilihan. Return rows dengan shape yang sama
+    dengan VectorRepository.vector_search_persons / vector_search_events.
+    Kalau `stats` dikasih, diisi info retrieval (candidates, expansions, returned).
+    `allowed_ids`: pre-filter dari vector_filters (None = tanpa filter).
+    """
+    repo = get_vector_repo()
+
+    if allowed_ids is not None and not allowed_ids:
+        if stats is not None:
+            stats.update({"candidates": 0, "expansions": 0, "returned": 0})
+        return []
+
+    if engine == "native":
+        if kind == "person":
+            return repo.vector_search_persons(
+                query_embedding, limit=limit, min_score=min_score, stats=stats,
+                allowed_ids=allowed_ids, exclude_ids=exclude_ids
+            )
+        return repo.vector_search_events(
+            query_embedding, limit=limit, min_score=min_score, stats=stats,
+            allowed_ids=allowed_ids, exclude_ids=exclude_ids
+        )
+
+    index = get_engine_index(engine, kind, dim=len(query_embedding))
+    hits = index.search(
+        query_embedding,
+        limit=limit,
+        min_score=min_score,
+        exclude_ids=exclude_ids,
+        scorer=lambda ids: repo.score_candidates(kind, ids, query_embedding, min_score),
+        allowed_ids=allowed_ids,
+    )
+    if stats is not None:
+        # Engine in-process: candidate count tetap (tidak ada expansion)
+        stats.update({
+            "candidates": max(index.default_rerank_candidates, limit),
+            "expansions": 0,
+            "returned": len(hits),
+        })
+    if kind == "person":
+        return repo.hydrate_persons(hits)
+    return repo.hydrate_events(hits)
+
+
+def find_similar(kind: str, element_id: str, limit: int = 10, min_score: float = 0.5, engine: str = "native"):
+    """/similar/* dengan engine pilihan"""
+    repo = get_vector_repo()
+
+    if engine == "native":
+        if kind == "person":
+            return repo.find_similar_persons(element_id, limit, min_score)
+        return repo.find_similar_events(element_id, limit, min_score)
+
+    source = repo.get_source_embedding(kind, element_id)
+    if not source:
+        return []
+
+    similar = search_vectors(
+        kind,
+        source["embedding"],
+        limit=limit,
+        min_score=min_score,
+        engine=engine,
+        exclude_ids=[element_id],
+    )
+    return {
+        "source": {"element_id": element_id, "name": source["name"]},
+        "similar": similar,
+    }
+
+
+# ==================== MULTI-SEED SIMILARITY ====================
+
+MULTI_SEED_STRATEGIES = ("centroid", "max_sim")
+
+
+def more_like_these(
+    kind: str,
+    element_ids: List[str],
+    weights: Optional[List[float]] = None,
+    limit: int = 10,
+    min_score: float = 0.5,
+    strategy: str = "centroid",
+    engine: str = "native",
+) -> dict:
+    """
+    "More like these": satu ranked list untuk beberapa seed sekaligus, seed di-exclude.
+    - centroid: weighted mean dari embedding seed (sudah di-normalize), satu index pass
+    - max_sim : tiap kandidat di-score dengan seed paling mirip, semua seed
+                di-query dalam satu UNWIND (native engine)
+    """
+    if strategy not in MULTI_SEED_STRATEGIES:
+        raise ValueError(f"Strategy '{strategy}' tidak dikenal (pilihan: {list(MULTI_SEED_STRATEGIES)})")
+    if weights is not None and len(weights) != len(element_ids):
+        raise ValueError("Jumlah weights harus sama dengan jumlah element_ids")
+
+    repo = get_vector_repo()
+    seeds = repo.get_embeddings_by_element_ids(kind, element_ids)
+    seed_ids = [i for i in element_ids if i in seeds]
+    if not seed_ids:
+        return {"seeds": [], "missing_seeds": element_ids, "similar": []}
+
+    weight_of = dict(zip(element_ids, weights)) if weights is not None else {}
+    missing = [i for i in element_ids if i not in seeds]
+
+    if strategy == "centroid":
+        matrix = normalize_rows(np.asarray([seeds[i] for i in seed_ids], dtype=np.float32))
+        w = np.asarray([weight_of.get(i, 1.0) for i in seed_ids], dtype=np.float32)
+        centroid = (matrix * w[:, None]).sum(axis=0)
+        if not np.any(centroid):
+            raise ValueError("Weights menghasilkan centroid nol")
+        similar = search_vectors(
+            kind,
+            normalize_rows(centroid[None, :])[0].tolist(),
+            limit=limit,
+            min_score=min_score,
+            engine=engine,
+            exclude_ids=seed_ids,
+        )
+    else:
+        per_seed = repo.batch_vector_search(
+            kind, [seeds[i] for i in seed_ids], limit=limit + len(seed_ids), min_score=min_score
+        )
+        best = {}
+        for seed_id, rows in zip(seed_ids, per_seed):
+            w = weight_of.get(seed_id, 1.0)
+            for row in rows:
+                if row["element_id"] in seeds:
+                    continue
+                score = row["similarity_score"] * w
+                if row["element_id"] not in best or score > best[row["element_id"]]["similarity_score"]:
+                    best[row["element_id"]] = {**row, "similarity_score": score}
+        similar = sorted(best.values(), key=lambda r: r["similarity_score"], reverse=True)[:limit]
+
+    return {
+        "seeds": seed_ids,
+        "missing_seeds": missing,
+        "strategy": strategy,
+        "similar": similar,
+    }
+
+
+# ==================== RECALL CHECK ====================
+
+def evaluate_recall(engine: str, kind: str, n_queries: int = 50, k: int = 10, seed: int = 0) -> dict:
+    """
+    Bandingkan engine in-process dengan exact search (brute force NumPy).
+    Query diambil dari embedding yang tersimpan (node query sendiri di-exclude).
+    Float vectors di-load sementara hanya untuk ground truth + re-rank.
+    """
+    if engine not in ENGINE_CLASSES:
+        raise ValueError(f"Recall hanya untuk engine in-process (pilihan: {list(ENGINE_CLASSES)})")
+
+    element_ids, vectors = load_embedding_matrix(kind)
+    if not element_ids:
+        raise ValueError(f"Belum ada embedding untuk {kind}")
+
+    index = get_engine_index(engine, kind)
+    normalized = normalize_rows(vectors)
+    position_of = {element_id: i for i, element_id in enumerate(element_ids)}
+    lookup = lambda ids: {i: normalized[position_of[i]] for i in ids if i in position_of}
+
+    rng = np.random.default_rng(seed)
+    query_positions = rng.choice(len(element_ids), size=min(n_queries, len(element_ids)), replace=False)
+
+    recalls = []
+    exact_ms = []
+    engine_ms = []
+    for qp in query_positions:
+        query = normalized[qp]
+
+        start = time.perf_counter()
+        scores = normalized @ query
+        scores[qp] = -np.inf
+        top = np.argpartition(-scores, k)[:k] if len(scores) > k else np.arange(len(scores))
+        truth = {element_ids[i] for i in top if i != qp}
+        exact_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        hits = index.search(query, limit=k, exclude_ids=[element_ids[qp]], vector_lookup=lookup)
+        engine_ms.append((time.perf_counter() - start) * 1000)
+
+        found = {h["element_id"] for h in hits}
+        recalls.append(len(found & truth) / max(len(truth), 1))
+
+    return {
+        "engine": engine,
+        "type": kind,
+        "k": k,
+        "queries": len(query_positions),
+        "corpus_size": len(element_ids),
+        f"recall@{k}": round(float(np.mean(recalls)), 4),
+        "avg_exact_ms": round(float(np.mean(exact_ms)), 3),
+        "avg_engine_ms": round(float(np.mean(engine_ms)), 3),
+        "engine_memory_bytes": index.nbytes,
+        "float32_memory_bytes": int(vectors.nbytes),
+    }
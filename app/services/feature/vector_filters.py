@@ -0,0 +1,193 @@
+"""
+Attribute filter index untuk filtered vector search.
+
+Per atribut disimpan set element_id (in-memory):
+- Person: birth country, continent, birth_year (bucket per dekade)
+- Event: country (HELD_IN), continent
+Set ini di-intersect dulu, hasilnya dipakai sebagai pre-filter saat candidate scoring.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+from app.db.vector_repo import get_vector_repo, EMBEDDING_LABELS
+
+# Index di-refresh otomatis kalau umurnya lewat dari ini (detik)
+FILTER_INDEX_TTL = 600
+BIRTH_YEAR_BUCKET = 10
+
+
+def _to_year(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class AttributeFilterIndex:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.by_country: Dict[str, Set[str]] = {}
+        self.by_continent: Dict[str, Set[str]] = {}
+        self.by_birth_bucket: Dict[int, Set[str]] = {}
+        self.birth_year: Dict[str, int] = {}
+        self.size = 0
+        self.built_at = 0.0
+
+    @classmethod
+    def build(cls, kind: str, rows) -> "AttributeFilterIndex":
+        index = cls(kind)
+        for row in rows:
+            element_id = row["element_id"]
+            index.size += 1
+            for country in row.get("countries") or []:
+                index.by_country.setdefault(country, set()).add(element_id)
+            for continent in row.get("continents") or []:
+                index.by_continent.setdefault(continent, set()).add(element_id)
+            year = _to_year(row.get("birth_year"))
+            if year is not None:
+                index.birth_year[element_id] = year
+                index.by_birth_bucket.setdefault(year // BIRTH_YEAR_BUCKET, set()).add(element_id)
+        index.built_at = time.time()
+        return index
+
+    def _union(self, mapping: Dict[str, Set[str]], keys: List[str]) -> Set[str]:
+        out = set()
+        for key in keys:
+            out |= mapping.get(key.lower(), set())
+        return out
+
+    def _birth_year_range(self, year_from: Optional[int], year_to: Optional[int]) -> Set[str]:
+        """Union bucket yang full masuk range, bucket pinggir di-verify per node"""
+        if not self.by_birth_bucket:
+            return set()
+        low = year_from if year_from is not None else min(self.birth_year.values())
+        high = year_to if year_to is not None else max(self.birth_year.values())
+
+        out = set()
+        for bucket in range(low // BIRTH_YEAR_BUCKET, high // BIRTH_YEAR_BUCKET + 1):
+            members = self.by_birth_bucket.get(bucket)
+            if not members:
+                continue
+            bucket_start = bucket * BIRTH_YEAR_BUCKET
+            bucket_end = bucket_start + BIRTH_YEAR_BUCKET - 1
+            if low <= bucket_start and bucket_end <= high:
+                out |= members
+            else:
+                out |= {m for m in members if low <= self.birth_year[m] <= high}
+        return out
+
+    def allowed_ids(
+        self,
+        countries: Optional[List[str]] = None,
+        continents: Optional[List[str]] = None,
+        birth_year_from: Optional[int] = None,
+        birth_year_to: Optional[int] = None,
+    ) -> Optional[Set[str]]:
+        """
+        Intersect semua filter aktif. Return None kalau tidak ada filter
+        (artinya semua node boleh), set kosong kalau tidak ada yang lolos.
+        """
+        sets = []
+        if countries:
+            sets.append(self._union(self.by_country, countries))
+        if continents:
+            sets.append(self._union(self.by_continent, continents))
+        if self.kind == "person" and (birth_year_from is not None or birth_year_to is not None):
+            sets.append(self._birth_year_range(birth_year_from, birth_year_to))
+
+        if not sets:
+            return None
+        sets.sort(key=len)
+        allowed = set(sets[0])
+        for other in sets[1:]:
+            allowed &= other
+        return allowed
+
+    def stats(self) -> dict:
+        return {
+            "type": self.kind,
+            "nodes": self.size,
+            "countries": len(self.by_country),
+            "continents": len(self.by_continent),
+            "birth_year_buckets": len(self.by_birth_bucket),
+            "built_at": self.built_at,
+        }
+
+
+_filter_indexes: Dict[str, AttributeFilterIndex] = {}
+_lock = threading.Lock()
+# Tipe yang sedang di-rebuild di background (TTL lewat)
+_refreshing: Set[str] = set()
+_refresh_lock = threading.Lock()
+# Naik tiap invalidate; build yang mulai sebelum invalidate tidak dipasang
+_generation = 0
+
+
+def _build(kind: str) -> AttributeFilterIndex:
+    """Caller wajib pegang _lock"""
+    generation = _generation
+    index = AttributeFilterIndex.build(kind, get_vector_repo().iter_filter_attributes(kind))
+    if generation == _generation:
+        _filter_indexes[kind] = index
+    return index
+
+
+def build_filter_index(kind: str) -> AttributeFilterIndex:
+    with _lock:
+        return _build(kind)
+
+
+def _refresh(kind: str):
+    try:
+        build_filter_index(kind)
+    except Exception as e:
+        print(f"⚠️ Filter index refresh failed for {kind}: {e}")
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(kind)
+
+
+def get_filter_index(kind: str) -> AttributeFilterIndex:
+    """
+    Build sinkron cuma kalau belum ada index. TTL lewat -> rebuild di background
+    (satu per tipe), request tetap dilayani index lama sampai di-swap.
+    """
+    index = _filter_indexes.get(kind)
+    if index is None:
+        with _lock:
+            index = _filter_indexes.get(kind) or _build(kind)
+    elif time.time() - index.built_at > FILTER_INDEX_TTL:
+        with _refresh_lock:
+            start = kind not in _refreshing
+            _refreshing.add(kind)
+        if start:
+            threading.Thread(target=_refresh, args=(kind,), name=f"{kind}-filter-index-refresh", daemon=True).start()
+    return index
+
+
+def invalidate_filter_indexes():
+    """Dipanggil dari write path yang mengubah country/continent/birth data"""
+    global _generation
+    _generation += 1
+    _filter_indexes.clear()
+
+
+def resolve_allowed_ids(
+    kind: str,
+    countries: Optional[List[str]] = None,
+    continents: Optional[List[str]] = None,
+    birth_year_from: Optional[int] = None,
+    birth_year_to: Optional[int] = None,
+) -> Optional[Set[str]]:
+    """Shortcut: None kalau tidak ada filter aktif (index tidak perlu di-load)"""
+    if kind not in EMBEDDING_LABELS:
+        raise ValueError(f"Tipe '{kind}' tidak dikenal")
+    has_year = kind == "person" and (birth_year_from is not None or birth_year_to is not None)
+    if not countries and not continents and not has_year:
+        return None
+    return get_filter_index(kind).allowed_ids(countries, continents, birth_year_from, birth_year_to)
+
+
+def get_filter_index_status() -> dict:
+    return {"built": [index.stats() for index in _filter_indexes.values()]}
@@ -5,12 +5,13 @@ import os
 import torch
 
 _model = None
+_model_name = None
 DEFAULT_MODEL = "BAAI/bge-base-en-v1.5"  # Recommended for semantic search
 
 
 def get_embedding_model():
     """Load embedding model (singleton pattern)"""
-    global _model
+    global _model, _model_name
     if _model is None:
         model_name = "BAAI/bge-base-en-v1.5"
         device = "cpu"
@@ -19,15 +20,22 @@ def get_embedding_model():
         
         try:
             _model = SentenceTransformer(model_name, device=device)
+            _model_name = model_name
             print(f"✅ Model loaded successfully! Dimension: {_model.get_sentence_embedding_dimension()}")
         except Exception as e:
             print(f"❌ Error loading model {model_name}: {e}")
             print("⚠️ Falling back to all-MiniLM-L6-v2")
             _model = SentenceTransformer("all-MiniLM-L6-v2", device=device)
+            _model_name = "all-MiniLM-L6-v2"
     
     return _model
 
 
+def get_model_version() -> str:
+    """Nama model yang sedang dipakai (untuk cache key). Tidak memaksa load model."""
+    return _model_name or DEFAULT_MODEL
+
+
 def get_embedding_dimension() -> int:
     """Get dimension of current embedding model"""
     model = get_embedding_model()
@@ -48,12 +56,12 @@ def generate_embedding(text: str) -> List[float]:
         return None
 
 
-def generate_embeddings_batch(texts: List[str]) -> List[List[float]]:
+def generate_embeddings_batch(texts: List[str], show_progress_bar: bool = True) -> List[List[float]]:
     """Generate embeddings untuk multiple texts"""
     try:
         model = get_embedding_model()
         valid_texts = [t if t and t.strip() else "" for t in texts]
-        embeddings = model.encode(valid_texts, convert_to_numpy=True, show_progress_bar=True)
+        embeddings = model.encode(valid_texts, convert_to_numpy=True, show_progress_bar=show_progress_bar)
         return [emb.tolist() for emb in embeddings]
     except Exception as e:
         print(f"Error generating batch embeddings: {e}")
@@ -437,6 +445,7 @@ def create_searchable_text_event(event: dict) -> str:
 
 def reset_model():
     """Reset model (untuk reload dengan model berbeda)"""
-    global _model
+    global _model, _model_name
     _model = None
+    _model_name = None
     print("🔄 Model reset. Will reload on next use.")
\ No newline at end of file
@@ -0,0 +1,34 @@
+from app.services.feature.fuzzy_match import SymSpellIndex, edit_distance
+
+
+def test_edit_distance_counts_transposition_once():
+    assert edit_distance("napoleon", "napoelon", 2) == 1
+    assert edit_distance("napoleon", "napoleon", 2) == 0
+
+
+def test_edit_distance_stops_past_max():
+    assert edit_distance("napoleon", "wellington", 2) == 3
+
+
+def test_lookup_prefers_distance_then_frequency():
+    index = SymSpellIndex("person")
+    index.bulk_load(["Napoleon I", "Napoleon III", "Leon Blum", "Nepal King"])
+    word, distance, frequency = index.lookup("napolen")[0]
+    assert (word, distance, frequency) == ("napoleon", 1, 2)
+
+
+def test_correct_keeps_short_and_numeric_tokens():
+    index = SymSpellIndex("person")
+    index.bulk_load(["Louis XIV", "Napoleon Bonaparte"])
+    assert index.correct("louiss xiv 1769") == "louis xiv 1769"
+    assert index.correct("louis") is None
+
+
+def test_remove_text_drops_word_at_zero_frequency():
+    index = SymSpellIndex("person")
+    index.bulk_load(["Napoleon I", "Napoleon II"])
+    index.remove_text("Napoleon I")
+    assert index.lookup("napoleon") == [("napoleon", 0, 1)]
+    index.remove_text("Napoleon II")
+    assert index.lookup("napoleon") == []
+    assert not index.deletes
@@ -0,0 +1,31 @@
+import pytest
+
+from app.services.feature.hybrid_fusion import RRF_K, build_fulltext_query, fuse
+
+
+def test_rrf_rewards_agreement_between_retrievers():
+    text = [{"element_id": "a", "score": 9.0}, {"element_id": "b", "score": 5.0}]
+    vector = [{"element_id": "b", "score": 0.9}, {"element_id": "c", "score": 0.8}]
+    fused = fuse(text, vector, method="rrf", text_weight=1.0, vector_weight=1.0)
+    assert [item["element_id"] for item in fused] == ["b", "a", "c"]
+    assert fused[0]["score"] == pytest.approx(1 / (RRF_K + 2) + 1 / (RRF_K + 1))
+    assert fused[0]["text_rank"] == 2 and fused[0]["vector_rank"] == 1
+    assert fused[2]["text_rank"] is None
+
+
+def test_weighted_normalizes_each_retriever():
+    text = [{"element_id": "a", "score": 20.0}, {"element_id": "b", "score": 10.0}]
+    vector = [{"element_id": "b", "score": 0.9}, {"element_id": "a", "score": 0.7}]
+    fused = {item["element_id"]: item["score"] for item in fuse(text, vector, method="weighted", text_weight=0.4, vector_weight=0.6)}
+    assert fused["a"] == pytest.approx(0.4)
+    assert fused["b"] == pytest.approx(0.6)
+
+
+def test_unknown_method_rejected():
+    with pytest.raises(ValueError):
+        fuse([], [], method="max")
+
+
+def test_fulltext_query_escapes_and_boosts_phrase():
+    assert build_fulltext_query("ali") == "ali"
+    assert build_fulltext_query("jean-paul sartre") == '"jean\\-paul sartre"^3 OR jean\\-paul OR sartre'
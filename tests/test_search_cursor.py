@@ -0,0 +1,36 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services.feature.search_cursor import decode_cursor, encode_cursor
+
+
+def test_round_trip_name_cursor():
+    token = encode_cursor("Napoléon", "4:abc:12")
+    assert "=" not in token
+    assert decode_cursor(token) == ("Napoléon", "4:abc:12")
+
+
+def test_round_trip_popularity_cursor():
+    token = encode_cursor(87.5, "4:abc:13")
+    assert decode_cursor(token, sort="popularity") == (87.5, "4:abc:13")
+
+
+def test_empty_cursor():
+    assert decode_cursor(None) is None
+    assert decode_cursor("") is None
+
+
+@pytest.mark.parametrize("token", ["not-base64!", encode_cursor("x", "y")[:-3], "e30"])
+def test_malformed_cursor_rejected(token):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(token)
+    assert error.value.status_code == 400
+
+
+def test_cursor_from_other_sort_mode_rejected():
+    with pytest.raises(HTTPException):
+        decode_cursor(encode_cursor("Napoleon", "id"), sort="popularity")
+    with pytest.raises(HTTPException):
+        decode_cursor(encode_cursor(True, "id"), sort="popularity")
+    with pytest.raises(HTTPException):
+        decode_cursor(encode_cursor(12.0, "id"), sort="name")
@@ -0,0 +1,127 @@
+import random
+
+from app.services.feature import search_index
+from app.services.feature.search_index import TrigramIndex
+
+
+class FakeSearchRepo:
+    """Pengganti SearchRepo: dokumen search dari dict, bukan Neo4j"""
+
+    def __init__(self, docs):
+        self.docs = {doc["element_id"]: doc for doc in docs}
+
+    def iter_search_documents(self, kind):
+        return list(self.docs.values())
+
+    def get_search_documents(self, kind, keys):
+        return [self.docs[key] for key in keys if key in self.docs]
+
+    def sync_search_fields(self, kind, keys):
+        return len(keys)
+
+
+def build_index():
+    index = TrigramIndex("person")
+    for i, name in enumerate(["Napoleon I", "Napoleon II", "Napoleon III", "Louis Napoleon"]):
+        index.upsert({"element_id": f"id{i}", "name": name, "popularity": float(i)})
+    return index
+
+
+def test_cursor_ignores_offset():
+    index = build_index()
+    needle, candidates = index.candidates("napoleon")
+
+    first, has_more = index.page(needle, candidates, limit=2)
+    assert has_more
+
+    # Client kirim cursor + running count (current_person_count): offset tidak boleh di-skip lagi
+    second, has_more = index.page(needle, candidates, limit=2, offset=2, after=first[-1])
+    assert [key for _, key in second] == ["id1", "id2"]
+    assert not has_more
+    assert not {key for _, key in first} & {key for _, key in second}
+
+
+def test_popularity_cursor_ignores_offset():
+    index = build_index()
+    needle, candidates = index.candidates("napoleon")
+
+    first, _ = index.page(needle, candidates, limit=2, sort="popularity")
+    second, _ = index.page(needle, candidates, limit=2, offset=2, after=first[-1], sort="popularity")
+    assert [key for _, key in first + second] == ["id3", "id2", "id1", "id0"]
+
+
+def test_facet_filter_intersects_candidates():
+    index = TrigramIndex("person")
+    index.upsert({"element_id": "fr", "name": "Napoleon I", "countries": ["france"]})
+    index.upsert({"element_id": "it", "name": "Napoleon Orsini", "countries": ["italy"]})
+    index.upsert({"element_id": "fr2", "name": "Louis XIV", "countries": ["france"]})
+
+    needle, candidates = index.candidates("napoleon", countries=["France"])
+    assert {index.element_ids[d] for d in candidates} == {"fr"}
+
+    # Query < 3 karakter tidak punya trigram: kandidat = semua doc yang lolos filter
+    _, candidates = index.candidates("xi", countries=["france"])
+    assert {index.element_ids[d] for d in candidates} == {"fr", "fr2"}
+
+
+def test_update_reuses_doc_id():
+    index = build_index()
+    allocated = len(index.element_ids)
+    for _ in range(3):
+        index.upsert({"element_id": "id1", "name": "Napoleon II", "popularity": 5.0})
+    assert len(index.element_ids) == allocated
+    needle, candidates = index.candidates("napoleon ii")
+    keys, _ = index.page(needle, candidates, limit=10)
+    assert [key for _, key in keys] == ["id1", "id2"]
+
+
+def test_short_query_facets_follow_matches():
+    index = TrigramIndex("person")
+    for i in range(300):
+        index.upsert({"element_id": f"fr{i}", "name": f"Jean {i}", "countries": ["france"]})
+        index.upsert({"element_id": f"it{i}", "name": f"Marco {i}", "countries": ["italy"]})
+
+    original = search_index.FACET_SAMPLE_SIZE
+    search_index.FACET_SAMPLE_SIZE = 100
+    random.seed(0)
+    try:
+        # "je" tidak punya trigram: kandidat = semua dokumen, count harus dari sampel yang di-verify
+        counts = index.facet_counts("je")
+    finally:
+        search_index.FACET_SAMPLE_SIZE = original
+    assert counts["approximate"]
+    assert "italy" not in counts["countries"]
+    # 300 match sebenarnya; estimasi dari sampel 100 dokumen
+    assert 200 <= counts["countries"]["france"] <= 400
+
+
+def test_estimate_total_exact_for_small_candidate_sets():
+    index = build_index()
+    needle, candidates = index.candidates("napoleon i")
+    estimate = index.estimate_total(needle, candidates)
+    assert estimate == {"estimated_total": 3, "error_bound": 0, "exact": True, "method": "exact"}
+
+
+def test_estimate_total_sampling_bounds_true_count():
+    index = TrigramIndex("person")
+    for i in range(2000):
+        index.upsert({"element_id": f"id{i}", "name": f"Jean {'Paul' if i % 4 == 0 else 'Luc'} {i}"})
+    random.seed(1)
+    needle, candidates = index.candidates("jean paul")
+    estimate = index.estimate_total(needle, candidates, sample_size=200)
+    assert not estimate["exact"]
+    assert abs(estimate["estimated_total"] - 500) <= estimate["error_bound"]
+
+
+def test_refresh_replaces_renamed_spelling():
+    repo = FakeSearchRepo([{"element_id": "p1", "name": "Napoleon Bonaparte", "popularity": 1.0}])
+    search_index.build_search_index("person", repo)
+
+    repo.docs["p1"] = {"element_id": "p1", "name": "Louis Bonaparte", "popularity": 1.0}
+    search_index.refresh_search_nodes("person", ["p1"], repo)
+
+    spell_index = search_index.get_spell_index("person")
+    assert spell_index.correct("napolean") is None
+    assert spell_index.correct("lous") == "louis"
+    needle, candidates = search_index.get_search_index("person").candidates("louis")
+    assert len(candidates) == 1
@@ -0,0 +1,35 @@
+from app.services.enrichment import sparql_service
+from app.services.enrichment.sparql_service import ALIAS_SEPARATOR, MAX_ALIASES, parse_aliases
+
+
+def join(*entries):
+    return ALIAS_SEPARATOR.join(entries)
+
+
+def test_dedupes_folded_variants_keeping_priority_language():
+    value = join("fr:Napoléon Bonaparte", "en:Napoleon Bonaparte", "de:NAPOLEON BONAPARTE")
+    assert parse_aliases(value) == ["Napoleon Bonaparte"]
+
+
+def test_order_independent_of_group_concat_order():
+    entries = ["ru:Наполеон", "en:Napoleon", "zz:Napoleone", "it:Buonaparte", "xx:"]
+    assert parse_aliases(join(*entries)) == parse_aliases(join(*reversed(entries)))
+    assert parse_aliases(join(*entries)) == ["Napoleon", "Buonaparte", "Наполеон", "Napoleone"]
+
+
+def test_cap_keeps_priority_languages():
+    entries = [f"zz{i:02d}:Alias {i}" for i in range(MAX_ALIASES)] + ["en:Main Name"]
+    aliases = parse_aliases(join(*entries))
+    assert len(aliases) == MAX_ALIASES
+    assert aliases[0] == "Main Name"
+
+
+def test_empty_value():
+    assert parse_aliases(None) == []
+    assert parse_aliases("") == []
+
+
+def test_clause_uses_shared_separator():
+    clause = sparql_service.ALIASES_CLAUSE % ("Q517", "Q517")
+    assert f'separator="{ALIAS_SEPARATOR}"' in clause
+    assert "REPLACE(STR(?alias)" in clause
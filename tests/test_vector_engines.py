@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from app.services.feature.quantization import BinaryQuantizer, ProductQuantizer, normalize_rows
+from app.services.feature.vector_engines import BinaryVectorIndex, PQVectorIndex
+
+
+def corpus(n=400, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = normalize_rows(rng.normal(size=(n, dim)).astype(np.float32))
+    return [f"id{i}" for i in range(n)], vectors
+
+
+def lookup_for(ids, vectors):
+    position = {element_id: i for i, element_id in enumerate(ids)}
+    return lambda wanted: {i: vectors[position[i]] for i in wanted if i in position}
+
+
+def test_pq_codes_are_compact_and_decode_close():
+    _, vectors = corpus()
+    quantizer = ProductQuantizer(m=8).train(vectors)
+    codes = quantizer.encode(vectors)
+    assert codes.shape == (len(vectors), 8) and codes.dtype == np.uint8
+    tables = quantizer.distance_tables(vectors[0])
+    scores = quantizer.asymmetric_scores(tables, codes)
+    assert int(np.argmax(scores)) == 0
+
+
+@pytest.mark.parametrize("engine", [PQVectorIndex, BinaryVectorIndex])
+def test_engine_search_finds_query_with_exact_rerank(engine):
+    ids, vectors = corpus()
+    index = engine.build("person", ids, vectors)
+    hits = index.search(vectors[7], limit=5, vector_lookup=lookup_for(ids, vectors), rerank_candidates=100)
+    assert hits[0]["element_id"] == "id7"
+    assert hits[0]["score"] == pytest.approx(1.0, abs=1e-5)
+    assert [h["score"] for h in hits] == sorted((h["score"] for h in hits), reverse=True)
+
+
+@pytest.mark.parametrize("engine", [PQVectorIndex, BinaryVectorIndex])
+def test_engine_search_respects_allowed_and_excluded(engine):
+    ids, vectors = corpus()
+    index = engine.build("person", ids, vectors)
+    allowed = {f"id{i}" for i in range(0, 400, 10)}
+    hits = index.search(
+        vectors[10], limit=5, exclude_ids=["id10"], allowed_ids=allowed,
+        vector_lookup=lookup_for(ids, vectors)
+    )
+    assert hits and all(h["element_id"] in allowed and h["element_id"] != "id10" for h in hits)
+
+
+def test_engine_search_uses_injected_scorer():
+    ids, vectors = corpus()
+    index = PQVectorIndex.build("person", ids, vectors, m=8)
+    seen = []
+
+    def scorer(candidate_ids):
+        seen.extend(candidate_ids)
+        return [{"element_id": i, "score": 0.9} for i in candidate_ids[:3]]
+
+    hits = index.search(vectors[3], limit=2, scorer=scorer, rerank_candidates=20)
+    assert len(seen) == 20
+    assert len(hits) == 2
+
+
+def test_binary_quantizer_dim_fixed_at_fit():
+    _, vectors = corpus(dim=32)
+    quantizer = BinaryQuantizer().fit(vectors)
+    assert quantizer.encode(vectors).shape == (len(vectors), 4)
+    with pytest.raises(ValueError):
+        quantizer.encode(np.ones(16, dtype=np.float32))
+    assert quantizer.dim == 32